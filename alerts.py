@@ -0,0 +1,109 @@
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    from config import ALERTAS_COOLDOWN_MIN, ALERTAS_FLUSH_LOTE, ALERTAS_FLUSH_SEG
+except ImportError:
+    ALERTAS_COOLDOWN_MIN = 240
+    ALERTAS_FLUSH_LOTE = 10
+    ALERTAS_FLUSH_SEG = 300
+
+# Estado por lote: si la condición estaba activa en la evaluación anterior (flanco)
+# y el timestamp (epoch seg) del último disparo de cada tipo.
+COLS_ESTADO = ['Activa_Alta', 'Activa_Baja', 'Ultimo_Alta', 'Ultimo_Baja']
+COLS_DISPAROS = ['Clave', 'Ticker', 'Fecha_Compra', 'Precio_Compra', 'Tipo', 'Precio', 'Timestamp']
+
+
+def estado_vacio():
+    return pd.DataFrame(columns=COLS_ESTADO)
+
+
+def disparos_vacios():
+    return pd.DataFrame(columns=COLS_DISPAROS)
+
+
+def clave_lote(df):
+    """Identificador de lote: Ticker|Fecha_Compra|Precio_Compra (igual criterio que registrar_venta)."""
+    ticker = df['Ticker'].astype(str).str.upper().str.strip()
+    fecha = df['Fecha_Compra'].astype(str).str.strip().str[:10]
+    precio = pd.to_numeric(df['Precio_Compra'], errors='coerce').fillna(0.0).round(2).astype(str)
+    return ticker + '|' + fecha + '|' + precio
+
+
+# --- EVALUACIÓN VECTORIZADA ---
+def evaluar_alertas(df_portafolio, precios_actuales, estado_previo=None, ahora=None, cooldown_seg=None):
+    """
+    Evalúa todos los lotes contra los precios actuales en una sola pasada.
+    Una alerta dispara solo al cruzar el umbral (flanco) y luego queda silenciada
+    durante el cooldown. Devuelve (estado_nuevo, df_disparos).
+    """
+    if df_portafolio.empty or 'Ticker' not in df_portafolio.columns:
+        return (estado_previo if estado_previo is not None else estado_vacio()), disparos_vacios()
+
+    ahora = time.time() if ahora is None else float(ahora)
+    cooldown_seg = ALERTAS_COOLDOWN_MIN * 60 if cooldown_seg is None else cooldown_seg
+
+    claves = clave_lote(df_portafolio)
+    precio = df_portafolio['Ticker'].map(precios_actuales).astype(float).to_numpy()
+
+    def _col(nombre):
+        if nombre not in df_portafolio.columns: return np.zeros(len(df_portafolio))
+        return pd.to_numeric(df_portafolio[nombre], errors='coerce').fillna(0.0).to_numpy()
+
+    alta, baja = _col('Alerta_Alta'), _col('Alerta_Baja')
+
+    with np.errstate(invalid='ignore'):
+        cond_alta = (alta > 0) & (precio >= alta)
+        cond_baja = (baja > 0) & (precio <= baja)
+
+    # Estado previo alineado por clave (lotes nuevos arrancan desarmados)
+    previo = estado_previo if estado_previo is not None else estado_vacio()
+    previo = previo[~previo.index.duplicated(keep='last')].reindex(claves.to_numpy())
+    activa_alta_prev = previo['Activa_Alta'].eq(True).to_numpy()
+    activa_baja_prev = previo['Activa_Baja'].eq(True).to_numpy()
+
+    # El último disparo puede venir de la sesión o de lo persistido en la hoja
+    ultimo_alta = np.nan_to_num(np.fmax(previo['Ultimo_Alta'].astype(float).to_numpy(), _col('CoolDown_Alta')))
+    ultimo_baja = np.nan_to_num(np.fmax(previo['Ultimo_Baja'].astype(float).to_numpy(), _col('CoolDown_Baja')))
+
+    dispara_alta = cond_alta & ~activa_alta_prev & ((ahora - ultimo_alta) >= cooldown_seg)
+    dispara_baja = cond_baja & ~activa_baja_prev & ((ahora - ultimo_baja) >= cooldown_seg)
+
+    estado = pd.DataFrame({
+        'Activa_Alta': cond_alta,
+        'Activa_Baja': cond_baja,
+        'Ultimo_Alta': np.where(dispara_alta, ahora, ultimo_alta),
+        'Ultimo_Baja': np.where(dispara_baja, ahora, ultimo_baja),
+    }, index=claves.to_numpy())
+    estado = estado[~estado.index.duplicated(keep='last')]
+
+    partes = []
+    for mascara, tipo in ((dispara_baja, 'STOP LOSS'), (dispara_alta, 'TAKE PROFIT')):
+        if not mascara.any(): continue
+        sel = df_portafolio.loc[mascara, ['Ticker', 'Fecha_Compra', 'Precio_Compra']].copy()
+        sel.insert(0, 'Clave', claves[mascara].to_numpy())
+        sel['Tipo'] = tipo
+        sel['Precio'] = precio[mascara]
+        sel['Timestamp'] = ahora
+        partes.append(sel)
+
+    df_disparos = pd.concat(partes, ignore_index=True) if partes else disparos_vacios()
+    return estado, df_disparos
+
+
+# --- PERSISTENCIA POR LOTES ---
+def acumular_disparos(pendientes, nuevos):
+    if nuevos.empty: return pendientes
+    if pendientes is None or pendientes.empty: return nuevos.reset_index(drop=True)
+    # Por lote y tipo alcanza con el último timestamp
+    df = pd.concat([pendientes, nuevos], ignore_index=True)
+    return df.drop_duplicates(subset=['Clave', 'Tipo'], keep='last').reset_index(drop=True)
+
+
+def debe_persistir(pendientes, ultimo_flush, ahora=None, forzar=False):
+    if pendientes is None or pendientes.empty: return False
+    if forzar: return True
+    ahora = time.time() if ahora is None else ahora
+    if len(pendientes) >= ALERTAS_FLUSH_LOTE: return True
+    return (ahora - (ultimo_flush or 0)) >= ALERTAS_FLUSH_SEG
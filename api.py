@@ -0,0 +1,426 @@
+"""
+Servicio HTTP de solo lectura con el último snapshot calculado (para bots, planillas y celulares):
+
+    python api.py --puerto 8502                  # al lado de Streamlit: sirve lo que guarda cada refresco
+    python api.py --puerto 8502 --refrescar 60   # en lugar de Streamlit: recalcula él mismo cada 60 s
+
+Endpoints (GET / HEAD):
+    /                       versión, hora del cálculo y rutas disponibles
+    /screener               tabla del screener, ordenada por señal (?panel=Lider filtra por panel de config)
+    /paneles                el screener partido por panel: {panel: [filas]}
+    /mep                    último MEP, variación diaria y serie
+    /alertas                estado de alertas por lote (condición activa y último disparo, epoch)  *
+    /portafolio             valuación por lote (ARS) y totales                                      *
+    /snapshot               todo lo anterior en una sola respuesta                                  *
+    /_stats                 contadores del servicio (sin caché)
+
+* Rutas con datos de la cartera: solo existen si se define API_TOKEN y piden la cabecera
+  Authorization: Bearer <API_TOKEN>. Sin token configurado responden 404.
+
+JSON compacto por defecto; ?formato=arrow (o Accept: application/vnd.apache.arrow.stream) devuelve
+la tabla de la ruta como stream IPC de Arrow (requiere pyarrow). Cada respuesta se serializa una
+sola vez por versión del snapshot y queda en memoria junto con su copia gzip y su ETag (hash del
+cuerpo): un cliente que repite If-None-Match recibe 304 sin cuerpo hasta el próximo refresco.
+Los pedidos no tocan IOL ni Sheets: solo se relee snapshot.pkl cuando cambia su mtime.
+En modo --refrescar las alertas se evalúan pero los disparos no se escriben en Sheets (eso lo
+sigue haciendo la app).
+"""
+import argparse
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import threading
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import pandas as pd
+import snapshot
+
+try:
+    from config import API_HOST, API_PUERTO, API_RECARGA_SEG, API_TOKEN, TICKERS_CONFIG
+except ImportError:
+    API_HOST, API_PUERTO, API_RECARGA_SEG, API_TOKEN = '127.0.0.1', 8502, 1.0, ''
+    TICKERS_CONFIG = {}
+
+GZIP_MIN = 1024  # Cuerpos más chicos se mandan sin comprimir
+TIPO_JSON = 'application/json; charset=utf-8'
+TIPO_ARROW = 'application/vnd.apache.arrow.stream'
+ORDEN_SCREENER = (['Senal', 'Suma_Caidas'], [True, False])  # Igual que screener_state.ORDEN
+COLS_PORTAFOLIO = ['Ticker', 'Fecha_Compra', 'Cantidad', 'Precio_Compra', 'Precio_Actual', 'Inversion_Total',
+                   'Valor_Actual', 'Valor_Salida_Neto', 'Ganancia_Neta_Monto', '%_Ganancia_Neto', 'Senal_Venta']
+
+RUTAS = ['/', '/screener', '/paneles', '/mep', '/alertas', '/portafolio', '/snapshot']
+PRIVADAS = {'/alertas', '/portafolio', '/snapshot'}  # Con token (API_TOKEN); sin token no se sirven
+
+Respuesta = namedtuple('Respuesta', ['cuerpo', 'gz', 'etag', 'tipo'])
+
+
+class ErrorRuta(Exception):
+    """Pedido que no se puede servir (ruta o panel desconocido, formato no disponible)."""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# --- VISTAS (DataFrame del snapshot -> tabla / dict) ---
+def _registros(df):
+    """Filas como lista de dicts (NaN/NaT -> null, fechas ISO)."""
+    if df is None or df.empty: return []
+    return json.loads(df.to_json(orient='records', date_format='iso', double_precision=6))
+
+
+def _screener(datos, panel=None):
+    df = datos.get('screener')
+    if df is None or df.empty: return pd.DataFrame()
+    if panel is not None: df = df[df.index.isin(TICKERS_CONFIG[panel])]
+    df = df.sort_values(by=ORDEN_SCREENER[0], ascending=ORDEN_SCREENER[1], na_position='last')
+    return df.rename_axis('Ticker').reset_index()
+
+
+def _mep(datos):
+    serie = datos.get('mep_serie')
+    if serie is None or serie.empty: return pd.DataFrame()
+    return serie.rename_axis('Fecha').reset_index()
+
+
+def _alertas(datos):
+    estado = datos.get('alertas_estado')
+    if estado is None or estado.empty: return pd.DataFrame()
+    partes = estado.index.to_series().str.split('|', n=2, expand=True)
+    df = pd.DataFrame({'Clave': estado.index, 'Ticker': partes[0].to_numpy(), 'Fecha_Compra': partes[1].to_numpy(),
+                       'Precio_Compra': pd.to_numeric(partes[2], errors='coerce').to_numpy()})
+    for col in estado.columns:
+        # Último disparo en epoch; 0 = nunca disparó (null)
+        df[col] = (estado[col].where(estado[col] != 0) if col.startswith('Ultimo') else estado[col]).to_numpy()
+    return df
+
+
+def _portafolio(datos):
+    df = datos.get('portafolio')
+    if df is None or df.empty: return pd.DataFrame()
+    return df[[c for c in COLS_PORTAFOLIO if c in df.columns]].reset_index(drop=True)
+
+
+def _num(x):
+    return None if x is None or pd.isna(x) else float(x)
+
+
+def _totales(df):
+    if df.empty: return {}
+    suma = lambda col: float(pd.to_numeric(df[col], errors='coerce').sum()) if col in df.columns else 0.0
+    inversion, neto = suma('Inversion_Total'), suma('Ganancia_Neta_Monto')
+    return {'lotes': len(df), 'inversion_total': inversion, 'valor_actual': suma('Valor_Actual'),
+            'valor_salida_neto': suma('Valor_Salida_Neto'), 'ganancia_neta': neto,
+            'ganancia_neta_pct': _num(neto / inversion) if inversion else None}
+
+
+def _mep_resumen(datos):
+    return {'valor': _num(datos.get('mep_valor')), 'variacion': _num(datos.get('mep_var'))}
+
+
+def _vista(datos, ruta, panel):
+    """Devuelve (campos_json, tabla): la tabla es lo que va en 'datos' (JSON) o en el stream Arrow."""
+    if panel is not None and (ruta != '/screener' or panel not in TICKERS_CONFIG):
+        raise ErrorRuta(404, f"Panel desconocido: {panel}")
+    if ruta == '/':
+        return {'rutas': sorted(RUTAS), 'privadas': sorted(PRIVADAS), 'paneles': list(TICKERS_CONFIG)}, None
+    if ruta == '/screener':
+        return ({'panel': panel} if panel else {}), _screener(datos, panel)
+    if ruta == '/paneles':
+        completo = _screener(datos)
+        return {'paneles': {p: _registros(completo[completo['Ticker'].isin(t)]) if not completo.empty else []
+                            for p, t in TICKERS_CONFIG.items()}}, None
+    if ruta == '/mep':
+        return _mep_resumen(datos), _mep(datos)
+    if ruta == '/alertas':
+        return {}, _alertas(datos)
+    if ruta == '/portafolio':
+        tabla = _portafolio(datos)
+        return {'totales': _totales(tabla)}, tabla
+    if ruta == '/snapshot':
+        port = _portafolio(datos)
+        return {'screener': _registros(_screener(datos)), 'mep': {**_mep_resumen(datos), 'serie': _registros(_mep(datos))},
+                'alertas': _registros(_alertas(datos)), 'portafolio': {'totales': _totales(port), 'lotes': _registros(port)}}, None
+    raise ErrorRuta(404, f"Ruta desconocida: {ruta}")
+
+
+# --- SERIALIZACIÓN ---
+def _arrow(tabla, version):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ErrorRuta(406, "pyarrow no está instalado: usar formato=json")
+    try:
+        t = pa.Table.from_pandas(tabla, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas object con tipos mezclados (p. ej. Fecha_Compra str / Timestamp) van como texto
+        mixtas = {c: str for c in tabla.columns if tabla[c].dtype == object}
+        t = pa.Table.from_pandas(tabla.astype(mixtas), preserve_index=False)
+    t = t.replace_schema_metadata({**(t.schema.metadata or {}), b'version': str(version).encode()})
+    destino = io.BytesIO()
+    with pa.ipc.new_stream(destino, t.schema) as escritor: escritor.write_table(t)
+    return destino.getvalue()
+
+
+def construir(datos, version, ruta, panel=None, formato='json'):
+    """Serializa una ruta una vez: cuerpo, copia gzip (si vale la pena) y ETag fuerte."""
+    campos, tabla = _vista(datos, ruta, panel)
+    if formato == 'arrow':
+        if tabla is None: raise ErrorRuta(406, f"{ruta} no es una tabla: usar formato=json")
+        cuerpo, tipo = _arrow(tabla, version), TIPO_ARROW
+    else:
+        actualizado = datos.get('last_update')
+        carga = {'version': str(version), 'actualizado': None if actualizado is None else pd.Timestamp(actualizado).isoformat(),
+                 **campos}
+        if tabla is not None: carga['datos'] = _registros(tabla)
+        cuerpo, tipo = json.dumps(carga, separators=(',', ':'), ensure_ascii=False).encode(), TIPO_JSON
+    # mtime=0: el mismo cuerpo da siempre los mismos bytes comprimidos
+    gz = gzip.compress(cuerpo, compresslevel=6, mtime=0) if len(cuerpo) >= GZIP_MIN else None
+    etag = f'"{hashlib.sha1(cuerpo).hexdigest()[:20]}"'
+    return Respuesta(cuerpo, gz, etag, tipo)
+
+
+# --- PUBLICADOR (última versión en memoria) ---
+class Publicador:
+    """Guarda el snapshot vigente y las respuestas ya serializadas de esa versión."""
+
+    def __init__(self, directorio=None, recarga_seg=API_RECARGA_SEG):
+        self.directorio = directorio
+        self.recarga_seg = recarga_seg
+        self.lock = threading.Lock()
+        self._datos = None
+        self._version = None
+        self._respuestas = {}
+        self._mirado = 0.0
+        self.stats = {'pedidos': 0, 'no_modificado': 0, 'gzip': 0, 'versiones': 0, 'serializaciones': 0}
+
+    def publicar(self, datos, version=None):
+        """Reemplaza el snapshot vigente (las respuestas de la versión anterior se descartan)."""
+        with self.lock:
+            self._datos = datos
+            self._version = version if version is not None else time.time_ns()
+            self._respuestas = {}
+            self.stats['versiones'] += 1
+
+    def _revisar(self):
+        """Relee snapshot.pkl si cambió su mtime (como mucho una vez cada recarga_seg)."""
+        ahora = time.monotonic()
+        with self.lock:
+            if ahora - self._mirado < self.recarga_seg: return
+            self._mirado = ahora
+        version = snapshot.version(self.directorio)
+        if version is None or version == self._version: return
+        datos = snapshot.cargar(self.directorio)
+        if datos is not None and datos.get('last_update') is not None: self.publicar(datos, version)
+
+    @property
+    def version(self):
+        return self._version
+
+    def respuesta(self, ruta, panel=None, formato='json'):
+        """Respuesta serializada de la versión vigente, o None si todavía no hay snapshot."""
+        self._revisar()
+        with self.lock:
+            datos, version, cache = self._datos, self._version, self._respuestas
+        if datos is None: return None
+        clave = (ruta, panel, formato)
+        r = cache.get(clave)
+        if r is None:
+            r = construir(datos, version, ruta, panel, formato)
+            with self.lock:
+                cache[clave] = r
+                self.stats['serializaciones'] += 1
+        return r
+
+    def contar(self, clave):
+        with self.lock: self.stats[clave] += 1
+
+
+# --- HTTP ---
+def _acepta_gzip(valor):
+    for parte in (valor or '').split(','):
+        nombre, _, q = parte.strip().partition(';')
+        if nombre.strip().lower() in ('gzip', '*') and q.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'): return True
+    return False
+
+
+def _coincide(valor, etags):
+    """If-None-Match: lista de ETags (débiles o fuertes) o '*'."""
+    if not valor: return False
+    if valor.strip() == '*': return True
+    return any(t.strip().removeprefix('W/') in etags for t in valor.split(','))
+
+
+def _autorizado(valor, token):
+    """Authorization: Bearer <token> (comparación en tiempo constante)."""
+    esquema, _, dado = (valor or '').partition(' ')
+    return esquema.lower() == 'bearer' and hmac.compare_digest(dado.strip().encode(), token.encode())
+
+
+def _handler(pub, token=''):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive: un cliente que sondea reutiliza la conexión
+
+        def log_message(self, *args):
+            pass
+
+        def _enviar(self, estado, cuerpo=b'', cabeceras=None, con_cuerpo=True):
+            self.send_response(estado)
+            for k, v in (cabeceras or {}).items(): self.send_header(k, v)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            if con_cuerpo and cuerpo: self.wfile.write(cuerpo)
+
+        def _error(self, estado, mensaje, con_cuerpo=True, extra=None):
+            cuerpo = json.dumps({'error': mensaje}, ensure_ascii=False).encode()
+            self._enviar(estado, cuerpo, {'Content-Type': TIPO_JSON, 'Cache-Control': 'no-store', **(extra or {})}, con_cuerpo)
+
+        def _atender(self, con_cuerpo):
+            partes = urlsplit(self.path)
+            ruta = partes.path.rstrip('/') or '/'
+            params = {k: v[-1] for k, v in parse_qs(partes.query).items()}
+            pub.contar('pedidos')
+
+            if ruta == '/_stats':
+                with pub.lock: stats = {**pub.stats, 'version': pub.version}
+                cuerpo = json.dumps(stats).encode()
+                return self._enviar(200, cuerpo, {'Content-Type': TIPO_JSON, 'Cache-Control': 'no-store'}, con_cuerpo)
+
+            privada = ruta in PRIVADAS
+            if privada and not token: return self._error(404, f"Ruta desconocida: {ruta}", con_cuerpo)
+            if privada and not _autorizado(self.headers.get('Authorization'), token):
+                return self._error(401, "Falta el token (Authorization: Bearer ...)", con_cuerpo, {'WWW-Authenticate': 'Bearer'})
+
+            formato = params.get('formato')
+            if formato is None: formato = 'arrow' if TIPO_ARROW in (self.headers.get('Accept') or '') else 'json'
+            if formato not in ('json', 'arrow'): return self._error(400, f"Formato desconocido: {formato}", con_cuerpo)
+
+            try:
+                r = pub.respuesta(ruta, params.get('panel'), formato)
+            except ErrorRuta as e:
+                return self._error(e.estado, str(e), con_cuerpo)
+            if r is None: return self._error(503, "Todavía no hay un snapshot calculado", con_cuerpo, {'Retry-After': '5'})
+
+            usar_gz = r.gz is not None and _acepta_gzip(self.headers.get('Accept-Encoding'))
+            etag = r.etag[:-1] + '-gz"' if usar_gz else r.etag
+            cabeceras = {'ETag': etag, 'Cache-Control': 'private, no-cache' if privada else 'no-cache',
+                         'Vary': 'Accept, Accept-Encoding, Authorization' if privada else 'Accept, Accept-Encoding',
+                         'X-Snapshot-Version': str(pub.version)}
+            if _coincide(self.headers.get('If-None-Match'), (r.etag, r.etag[:-1] + '-gz"')):
+                pub.contar('no_modificado')
+                return self._enviar(304, b'', cabeceras, con_cuerpo)
+
+            cabeceras['Content-Type'] = r.tipo
+            if usar_gz:
+                pub.contar('gzip')
+                cabeceras['Content-Encoding'] = 'gzip'
+            self._enviar(200, r.gz if usar_gz else r.cuerpo, cabeceras, con_cuerpo)
+
+        def do_GET(self):
+            self._atender(True)
+
+        def do_HEAD(self):
+            self._atender(False)
+
+    return Handler
+
+
+def iniciar(puerto=0, host='127.0.0.1', directorio=None, recarga_seg=API_RECARGA_SEG, token=API_TOKEN):
+    """Levanta el servicio en un hilo daemon. Devuelve (servidor, publicador, base_url)."""
+    pub = Publicador(directorio, recarga_seg)
+    servidor = ThreadingHTTPServer((host, puerto), _handler(pub, token))
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, pub, f"http://{host}:{servidor.server_address[1]}"
+
+
+# --- MODO SIN STREAMLIT (recalcula el snapshot) ---
+class Refrescador:
+    """Mismo ciclo que el auto-refresco de la app (screener, MEP, alertas, valuación), sin sesión."""
+
+    def __init__(self, pub, directorio=None):
+        import config
+        from screener_state import EstadoScreener
+        self.pub = pub
+        self.directorio = directorio
+        self.screener = EstadoScreener(config.TICKERS)
+        self.precios = pd.Series(dtype=float)
+        self.alertas = None
+        previo = snapshot.cargar(directorio)
+        if previo and previo.get('last_update') is not None:
+            self.screener.restaurar(previo.get('screener'))
+            if previo.get('precios_actuales') is not None: self.precios = previo['precios_actuales']
+            self.alertas = previo.get('alertas_estado')
+
+    def ciclo(self):
+        import alerts
+        import config
+        import data_client
+        import database
+        import intradia
+        import market_logic
+
+        df_raw = data_client.get_data(config.TICKERS)
+        if df_raw.empty: return False
+        mep_serie = market_logic.calcular_serie_mep(df_raw)
+        mep, var = market_logic.ultimo_mep(mep_serie)
+        df = intradia.agregar_indicadores(market_logic.calcular_indicadores(df_raw))
+        if df.empty: return False
+        self.screener.aplicar(df)
+        if 'Precio' in df.columns: self.precios = df['Precio'].combine_first(self.precios)
+
+        valuacion = pd.DataFrame()
+        df_port = database.get_portafolio_df()
+        if not df_port.empty:
+            self.alertas, _ = alerts.evaluar_alertas(df_port, self.precios, self.alertas)
+            valuacion = market_logic.analizar_portafolio(df_port, self.precios)
+
+        datos = {'screener': self.screener.datos.copy(), 'precios_actuales': self.precios, 'mep_valor': mep, 'mep_var': var,
+                 'mep_serie': mep_serie, 'last_update': pd.Timestamp.now().to_pydatetime(),
+                 'alertas_estado': self.alertas, 'portafolio': valuacion}
+        snapshot.guardar(datos, self.directorio)
+        # Misma versión que el archivo: el vigilante de mtime no lo vuelve a cargar
+        self.pub.publicar(datos, snapshot.version(self.directorio))
+        return True
+
+    def correr(self, cada, parar):
+        while not parar.is_set():
+            t0 = time.perf_counter()
+            try:
+                ok = self.ciclo()
+                print(f"[refresco] {'ok' if ok else 'sin datos'} en {time.perf_counter() - t0:.1f}s")
+            except Exception as e:
+                print(f"WARN: refresco fallido: {e}")
+            parar.wait(max(0.0, cada - (time.perf_counter() - t0)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP de solo lectura con el último snapshot.")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--puerto', type=int, default=API_PUERTO)
+    parser.add_argument('--directorio', default=None, help="Carpeta de snapshot.pkl (por defecto DIR_COMPARTIDO)")
+    parser.add_argument('--refrescar', type=float, default=0, help="Segundos entre recálculos propios (0 = solo leer el snapshot)")
+    args = parser.parse_args(argv)
+
+    servidor, pub, url = iniciar(args.puerto, args.host, args.directorio)
+    print(f"API de snapshot en {url}" + ("" if API_TOKEN else " (sin API_TOKEN: /alertas, /portafolio y /snapshot deshabilitadas)"))
+    parar = threading.Event()
+    if args.refrescar > 0:
+        refrescador = Refrescador(pub, args.directorio)
+        threading.Thread(target=refrescador.correr, args=(args.refrescar, parar), daemon=True).start()
+    try:
+        while True:
+            time.sleep(60)
+            with pub.lock: print(f"[stats] {pub.stats}")
+    except KeyboardInterrupt:
+        parar.set()
+        servidor.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
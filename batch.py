@@ -0,0 +1,152 @@
+"""
+Screener por lotes, sin Streamlit (para cron):
+
+    python batch.py --salida salidas --screens indicadores,cedears,mep,portafolio --monedas ARS,USD
+
+Carga el histórico, trae cotizaciones IOL, calcula cada screen para cada moneda en el mismo
+proceso (los intermedios se reutilizan vía el memo de market_logic) y escribe una versión nueva
+en <salida>/<version>/ con un Parquet y un CSV por screen, más stats.json con los tiempos.
+<salida>/ultimo.json apunta a la última versión completa (se reemplaza al final, atómico).
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+from datetime import datetime
+import pandas as pd
+
+SCREENS = ['indicadores', 'cedears', 'mep', 'portafolio']
+MONEDAS = ['ARS', 'USD']  # las de market_logic.MONEDAS (importarlo acá cargaría config y streamlit)
+
+
+# --- PIPELINE ---
+def _cronometro(stats, nombre):
+    @contextlib.contextmanager
+    def medir():
+        t0 = time.perf_counter()
+        try: yield
+        finally: stats[nombre] = round(time.perf_counter() - t0, 4)
+    return medir()
+
+
+def correr(screens, monedas, con_iol=True):
+    """Devuelve ({nombre_salida: DataFrame}, stats)."""
+    import config
+    import data_client
+    import database
+    import market_logic
+
+    stats = {}
+    resultados = {}
+
+    with _cronometro(stats, 'historial'):
+        historial = database.get_historical_matrix()
+    with _cronometro(stats, 'cotizaciones'):
+        precios_hoy = data_client.get_current_prices_iol(config.TICKERS) if con_iol else {}
+    with _cronometro(stats, 'union'):
+        df_raw = data_client.unir_historial(historial, precios_hoy)
+    print(f"Cotizaciones IOL: {len(precios_hoy)}")
+
+    with _cronometro(stats, 'mep'):
+        df_mep = market_logic.calcular_serie_mep(df_raw) if not df_raw.empty else pd.DataFrame()
+    if 'mep' in screens: resultados['mep'] = df_mep
+
+    df_cedears = pd.DataFrame()
+    if 'cedears' in screens:
+        with _cronometro(stats, 'historial_cedears'):
+            df_cedears = database.get_historical_prices_df(nombre_hoja="Historial_Cedears_Ext")
+
+    df_port = pd.DataFrame()
+    if 'portafolio' in screens:
+        with _cronometro(stats, 'portafolio_sheets'):
+            df_port = database.get_portafolio_df()
+
+    precios_actuales = pd.Series(precios_hoy, dtype=float)
+    for moneda in monedas:
+        if 'indicadores' in screens:
+            with _cronometro(stats, f'indicadores_{moneda}'):
+                resultados[f'indicadores_{moneda}'] = market_logic.calcular_indicadores(df_raw, moneda=moneda, df_mep=df_mep)
+        if 'cedears' in screens and not df_cedears.empty:
+            with _cronometro(stats, f'cedears_{moneda}'):
+                resultados[f'cedears_{moneda}'] = market_logic.calcular_screen_cedears(df_cedears, moneda=moneda, df_mep=df_mep)
+        if 'portafolio' in screens and not df_port.empty:
+            with _cronometro(stats, f'portafolio_{moneda}'):
+                resultados[f'portafolio_{moneda}'] = market_logic.analizar_portafolio(df_port, precios_actuales, moneda=moneda, df_mep=df_mep)
+
+    return resultados, stats
+
+
+# --- SALIDAS ---
+def escribir(resultados, stats, salida, formatos):
+    # Una carpeta nueva por corrida: con microsegundos y, si dos procesos chocan igual, un sufijo
+    base = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    for intento in range(100):
+        version = base if not intento else f"{base}-{intento}"
+        carpeta = os.path.join(salida, version)
+        try:
+            os.makedirs(carpeta, exist_ok=False)
+            break
+        except FileExistsError:
+            continue
+    else:
+        raise FileExistsError(f"No se pudo crear una carpeta nueva para {base} en {salida}")
+
+    t0 = time.perf_counter()
+    archivos = {}
+    for nombre, df in resultados.items():
+        archivos[nombre] = []
+        if 'parquet' in formatos:
+            ruta = os.path.join(carpeta, f"{nombre}.parquet")
+            # Parquet exige nombres de columna str (el índice va como columna)
+            df.rename(columns=str).to_parquet(ruta)
+            archivos[nombre].append(os.path.basename(ruta))
+        if 'csv' in formatos:
+            ruta = os.path.join(carpeta, f"{nombre}.csv")
+            df.to_csv(ruta)
+            archivos[nombre].append(os.path.basename(ruta))
+    stats['escritura'] = round(time.perf_counter() - t0, 4)
+
+    manifiesto = {'version': version, 'generado': datetime.now().isoformat(timespec='seconds'),
+                  'archivos': archivos, 'filas': {n: len(df) for n, df in resultados.items()}, 'tiempos': stats}
+    with open(os.path.join(carpeta, 'stats.json'), 'w') as f: json.dump(manifiesto, f, indent=2)
+
+    tmp = os.path.join(salida, f"ultimo.json.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f: json.dump({'version': version, 'carpeta': version}, f)
+    os.replace(tmp, os.path.join(salida, 'ultimo.json'))
+    return carpeta, manifiesto
+
+
+def _lista(valor):
+    return [v.strip() for v in valor.split(',') if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screener por lotes (sin Streamlit).")
+    parser.add_argument('--salida', default='salidas', help="Carpeta raíz de las versiones")
+    parser.add_argument('--screens', default=','.join(SCREENS), help=f"Lista separada por comas: {', '.join(SCREENS)}")
+    parser.add_argument('--monedas', default='ARS', help=f"{', '.join(MONEDAS)} o ambas (ARS,USD)")
+    parser.add_argument('--formatos', default='parquet,csv', help="parquet, csv o ambos")
+    parser.add_argument('--sin-iol', action='store_true', help="Solo histórico, sin cotizaciones en vivo")
+    args = parser.parse_args(argv)
+
+    screens = [s for s in _lista(args.screens) if s in SCREENS]
+    if not screens: parser.error(f"--screens debe incluir alguno de: {', '.join(SCREENS)}")
+    # Cada moneda genera sus propias salidas: una desconocida (o 'usd' en minúscula) no se ignora
+    monedas = list(dict.fromkeys(m.upper() for m in _lista(args.monedas)))
+    invalidas = [m for m in monedas if m not in MONEDAS]
+    if invalidas or not monedas: parser.error(f"--monedas acepta {', '.join(MONEDAS)} (recibido: {args.monedas!r})")
+
+    t0 = time.perf_counter()
+    resultados, stats = correr(screens, monedas, con_iol=not args.sin_iol)
+    stats['calculo_total'] = round(time.perf_counter() - t0, 4)
+    carpeta, manifiesto = escribir(resultados, stats, args.salida, _lista(args.formatos))
+
+    print(f"Versión {manifiesto['version']} en {carpeta}")
+    for nombre, filas in manifiesto['filas'].items(): print(f"  {nombre}: {filas} filas")
+    for etapa, seg in stats.items(): print(f"  {etapa}: {seg}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,430 @@
+"""
+Benchmarks reproducibles con datos sintéticos (no llaman a IOL, Sheets ni Yahoo):
+
+    python benchmarks.py                          # tamaños chico y medio, compara contra bench_baseline.json
+    python benchmarks.py --tamanos chico,medio,grande --repeticiones 7
+    python benchmarks.py --guardar-baseline       # fija los resultados actuales como referencia
+    python benchmarks.py --arranque --filtro arranque   # import y primer render de home.py y cada página
+
+Los datos salen de un generador con semilla fija: el mismo tamaño produce siempre la misma matriz.
+Cada caso corre en frío (memos y contextos de indicadores vacíos); se informa la mediana y el
+mínimo, y la comparación contra el baseline usa el mínimo.
+Devuelve código 1 si algún caso quedó más lento que el baseline por encima de la tolerancia.
+
+Con --arranque cada página se corre en un intérprete nuevo (Sheets simulado con fixtures chicos,
+IOL simulado, directorio compartido temporal) y se mide el import de sus módulos, el primer
+render con AppTest y un rerun. La base (streamlit + pandas) se informa aparte; falla si el
+import propio de la página + su primer render supera --presupuesto.
+
+Con --equivalencias no se mide nada: cada camino optimizado (unir_historial,
+EstadoScreener.aplicar, analizar_portafolio) se compara contra su versión anterior sobre los
+mismos datos sintéticos y falla si la salida difiere.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+import data_client
+import database
+import indicators
+import market_logic
+import screener_state
+from price_matrix import MatrizPrecios
+
+# nombre -> (tickers, años, lotes de cartera)
+TAMANOS = {
+    'chico': (75, 1, 50),
+    'medio': (500, 5, 500),
+    'grande': (3000, 10, 5000),
+}
+PARES_MEP = ['AL30.BA', 'AL30D.BA', 'GD30.BA', 'GD30D.BA']
+SEMILLA = 20240601
+
+
+# --- DATOS SINTÉTICOS ---
+def matriz_sintetica(n_tickers, anios, semilla=SEMILLA, huecos=0.02):
+    """Caminatas geométricas en días hábiles con huecos aleatorios y tickers que arrancan tarde."""
+    rng = np.random.default_rng(semilla)
+    n_dias = 252 * anios
+    fechas = pd.bdate_range(end=pd.Timestamp('2024-06-28'), periods=n_dias)
+    tickers = PARES_MEP + [f"T{i:04d}.BA" for i in range(n_tickers - len(PARES_MEP))]
+
+    retornos = rng.normal(0.0004, 0.025, size=(n_dias, len(tickers)))
+    precios = 100 * np.exp(np.cumsum(retornos, axis=0))
+    # Bonos en dólares ~1/1000 del precio en pesos (MEP alrededor de 1000)
+    precios[:, 1] = precios[:, 0] / 1000 * np.exp(rng.normal(0, 0.005, n_dias))
+    precios[:, 3] = precios[:, 2] / 1000 * np.exp(rng.normal(0, 0.005, n_dias))
+
+    precios[rng.random(precios.shape) < huecos] = np.nan
+    inicio_tarde = rng.integers(0, n_dias // 2, size=len(tickers)) * (rng.random(len(tickers)) < 0.1)
+    precios[np.arange(n_dias)[:, None] < inicio_tarde[None, :]] = np.nan
+    return pd.DataFrame(precios.astype(np.float32), index=fechas, columns=tickers)
+
+
+def portafolio_sintetico(df_precios, n_lotes, semilla=SEMILLA):
+    rng = np.random.default_rng(semilla + 1)
+    tickers = rng.choice(df_precios.columns, size=n_lotes)
+    fechas = rng.choice(df_precios.index[:-1], size=n_lotes)
+    return pd.DataFrame({
+        'Ticker': tickers,
+        'Fecha_Compra': pd.DatetimeIndex(fechas).strftime('%Y-%m-%d'),
+        'Cantidad': rng.integers(1, 500, size=n_lotes).astype(float),
+        'Precio_Compra': rng.uniform(50, 500, size=n_lotes).round(2),
+        'Broker': rng.choice(['IOL', 'BULL', 'COCOS', 'VETA'], size=n_lotes),
+        'Alerta_Alta': 0.0, 'Alerta_Baja': 0.0, 'CoolDown_Alta': 0.0, 'CoolDown_Baja': 0.0,
+    })
+
+
+def registros_hoja(n, semilla=SEMILLA):
+    """Celdas como las devuelve get_all_records: números, textos con miles/decimales mixtos, vacíos."""
+    rng = np.random.default_rng(semilla + 2)
+    valores = rng.uniform(0, 2_000_000, size=n)
+    formatos = [lambda v: f"{v:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),  # 1.234,56
+                lambda v: f"$ {v:,.2f}",                                                    # $ 1,234.56
+                lambda v: f"({v:.1f})",                                                     # negativo contable
+                lambda v: round(v, 2),                                                      # número
+                lambda v: ""]
+    elegidos = rng.integers(0, len(formatos), size=n)
+    return [formatos[k](v) for k, v in zip(elegidos, valores)]
+
+
+# --- CASOS ---
+def _en_frio():
+    market_logic._MEMO.clear()
+    indicators._CONTEXTOS.clear()
+
+
+def casos(tamano):
+    n_tickers, anios, n_lotes = TAMANOS[tamano]
+    df = matriz_sintetica(n_tickers, anios)
+    df_mep = market_logic.calcular_serie_mep(df)
+    df_port = portafolio_sintetico(df, n_lotes)
+    precios_actuales = df.ffill().iloc[-1].astype(float)
+    matriz = MatrizPrecios.desde_frame(df)
+    precios_hoy = precios_actuales.to_dict()
+    celdas = registros_hoja(20 * n_lotes)
+
+    return {
+        'calcular_indicadores': lambda: market_logic.calcular_indicadores(df),
+        'calcular_indicadores_usd': lambda: market_logic.calcular_indicadores(df, moneda='USD', df_mep=df_mep),
+        'calcular_screen_cedears': lambda: market_logic.calcular_screen_cedears(df),
+        'calcular_mep': lambda: market_logic.calcular_mep(df),
+        'analizar_portafolio': lambda: market_logic.analizar_portafolio(df_port, precios_actuales),
+        'clean_number_str': lambda: [database._clean_number_str(c) for c in celdas],
+        'merge_get_data': lambda: data_client.unir_historial(matriz, precios_hoy, today=df.index[-1] + pd.offsets.BDay()),
+    }
+
+
+def medir(func, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        _en_frio()
+        t0 = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - t0)
+    return {'mediana_s': float(np.median(tiempos)), 'min_s': float(np.min(tiempos)), 'repeticiones': repeticiones}
+
+
+def correr(tamanos, repeticiones, filtro=None):
+    resultados = {}
+    for tamano in tamanos:
+        for nombre, func in casos(tamano).items():
+            if filtro and filtro not in nombre: continue
+            clave = f"{nombre}[{tamano}]"
+            resultados[clave] = medir(func, repeticiones)
+            print(f"  {clave:45s} {resultados[clave]['mediana_s'] * 1000:10.2f} ms")
+    return resultados
+
+
+# --- COMPARACIÓN ---
+def comparar(resultados, baseline, tolerancia):
+    """Devuelve la lista de casos más lentos que baseline * (1 + tolerancia)."""
+    regresiones = []
+    print(f"\n{'caso':45s} {'baseline':>10s} {'actual':>10s} {'ratio':>7s}")
+    for clave, r in resultados.items():
+        base = baseline.get('resultados', {}).get(clave)
+        if not base: continue
+        # Se compara el mínimo: es la medida menos sensible al ruido de la máquina
+        ratio = r['min_s'] / base['min_s'] if base['min_s'] else np.nan
+        marca = '  <-- REGRESIÓN' if ratio > 1 + tolerancia else ''
+        print(f"{clave:45s} {base['min_s'] * 1000:9.2f}ms {r['min_s'] * 1000:9.2f}ms {ratio:7.2f}{marca}")
+        if marca: regresiones.append(clave)
+    return regresiones
+
+
+# --- EQUIVALENCIAS (caminos optimizados contra su versión anterior) ---
+# Cada referencia es el código previo a la optimización, copiado tal cual: si el camino rápido
+# cambia su salida, --equivalencias falla aunque los tiempos mejoren.
+def _union_reloj(matriz, precios_hoy, hoy):
+    """unir_historial con el corte anterior: DIAS_HISTORIAL contados desde el reloj."""
+    m = matriz.ventana(hasta=hoy).con_fila(hoy, precios_hoy)
+    return m.ffill().ventana(desde=datetime.now() - timedelta(days=data_client.DIAS_HISTORIAL)).a_frame()
+
+
+class _ScreenerLoc(screener_state.EstadoScreener):
+    """EstadoScreener con el aplicar anterior (asignación .loc columna por columna)."""
+
+    def aplicar(self, df_nuevo, ahora=None):
+        if df_nuevo is None or df_nuevo.empty: return 0
+        filas = df_nuevo.index.intersection(self._datos.index)
+        if filas.empty: return 0
+
+        ahora = pd.Timestamp.now() if ahora is None else pd.Timestamp(ahora)
+        for col in self._columnas:
+            if col in df_nuevo.columns:
+                self._datos.loc[filas, col] = df_nuevo.loc[filas, col].to_numpy()
+        self._datos.loc[filas, screener_state.COL_ACTUALIZADO] = ahora
+        self._vista = None
+        return len(filas)
+
+
+def _tandas_screener(df, semilla=SEMILLA):
+    """Lotes de refresco: todo, un subconjunto con precios nuevos y uno con tickers ajenos y columnas faltantes."""
+    rng = np.random.default_rng(semilla + 3)
+    completo = market_logic.calcular_indicadores(df)
+    parcial = completo.sample(frac=0.3, random_state=semilla).copy()
+    parcial['Precio'] *= rng.uniform(0.95, 1.05, len(parcial))
+    ajeno = completo.head(5)[['Precio', 'RSI']].rename(lambda t: t.replace('.BA', '.XX'))
+    mixto = pd.concat([completo.tail(5)[['Precio', 'RSI']], ajeno])
+    return [completo, parcial, mixto, pd.DataFrame()]
+
+
+def _aplicar_tandas(estado, tandas):
+    for i, tanda in enumerate(tandas): estado.aplicar(tanda, ahora=pd.Timestamp('2024-07-01 11:00') + pd.Timedelta(minutes=i))
+    return estado.datos
+
+
+def _comision_fila(monto_bruto, broker, es_bono=False):
+    """calcular_comision_real anterior (escalar, una operación por llamada)."""
+    broker = str(broker).upper().strip()
+    tasa_derechos = market_logic.config.DERECHOS_BONOS if es_bono else market_logic.config.DERECHOS_ACCIONES
+    multiplicador_iva = 1.0 if es_bono else market_logic.config.IVA
+    comisiones = market_logic.config.COMISIONES
+    if broker == 'VETA':
+        comision_base = max(market_logic.config.VETA_MINIMO, monto_bruto * comisiones.get('VETA', 0.0015))
+        return (comision_base * multiplicador_iva) + (monto_bruto * tasa_derechos)
+    comision_base = monto_bruto * comisiones.get(broker, comisiones.get('DEFAULT', 0.0045))
+    costo_derechos = monto_bruto * tasa_derechos
+    return comision_base + costo_derechos if es_bono else (comision_base + costo_derechos) * multiplicador_iva
+
+
+def _portafolio_filas(df_portafolio, series_precios_actuales):
+    """analizar_portafolio (ARS) anterior: df.apply fila por fila."""
+    df = df_portafolio.merge(series_precios_actuales.to_frame(name='Precio_Actual'), left_on='Ticker', right_index=True, how='left')
+
+    def calc_fila(row):
+        if pd.isna(row['Precio_Actual']) or row['Precio_Actual'] == 0.0: return pd.Series([0, 0, 0, 0, 0, 0, 0])
+        es_bono = market_logic._es_bono(row['Ticker'])
+        divisor = 100 if es_bono else 1
+        monto_compra_puro = (float(row['Precio_Compra']) * float(row['Cantidad'])) / divisor
+        valor_bruto_actual = (float(row['Precio_Actual']) * float(row['Cantidad'])) / divisor
+        inversion_total = monto_compra_puro + _comision_fila(monto_compra_puro, row.get('Broker', 'DEFAULT'), es_bono)
+        valor_neto_salida = valor_bruto_actual - _comision_fila(valor_bruto_actual, row.get('Broker', 'DEFAULT'), es_bono)
+        gan_neta_monto = valor_neto_salida - inversion_total
+        pct_bruta = (valor_bruto_actual / monto_compra_puro) - 1 if monto_compra_puro else 0
+        pct_neta = (gan_neta_monto / inversion_total) if inversion_total else 0
+        return pd.Series([inversion_total, valor_bruto_actual, valor_neto_salida,
+                          valor_bruto_actual - monto_compra_puro, gan_neta_monto, pct_bruta, pct_neta])
+
+    cols_calc = ['Inversion_Total', 'Valor_Actual', 'Valor_Salida_Neto', 'Ganancia_Bruta_Monto',
+                 'Ganancia_Neta_Monto', '%_Ganancia_Bruta', '%_Ganancia_Neto']
+    df[cols_calc] = df.apply(calc_fila, axis=1)
+    df['%_Ganancia_Bruta'] = df['%_Ganancia_Bruta'].replace([np.inf, -np.inf], np.nan)
+    df['%_Ganancia_Neto'] = df['%_Ganancia_Neto'].replace([np.inf, -np.inf], np.nan)
+
+    cond_stop_loss = (df['Alerta_Baja'] > 0) & (df['Precio_Actual'] <= df['Alerta_Baja'])
+    cond_take_profit = (df['Alerta_Alta'] > 0) & (df['Precio_Actual'] >= df['Alerta_Alta'])
+    df['Senal_Venta'] = np.select([cond_stop_loss, cond_take_profit], ['STOP LOSS', 'TAKE PROFIT'], default='NEUTRO')
+    df.loc[df['Precio_Actual'].isna(), 'Senal_Venta'] = 'PRECIO FALTANTE'
+    return df
+
+
+def _cartera_equivalencias(df, n_lotes, semilla=SEMILLA):
+    """Cartera y precios con los bordes: brokers en minúscula o vacíos, alertas, precios faltantes o en 0."""
+    rng = np.random.default_rng(semilla + 4)
+    cartera = portafolio_sintetico(df, n_lotes)
+    cartera['Broker'] = np.where(rng.random(n_lotes) < 0.1, ' veta', cartera['Broker'])
+    cartera.loc[rng.random(n_lotes) < 0.05, 'Broker'] = np.nan
+    cartera['Alerta_Alta'] = np.where(rng.random(n_lotes) < 0.3, cartera['Precio_Compra'] * 1.1, 0.0)
+    cartera['Alerta_Baja'] = np.where(rng.random(n_lotes) < 0.3, cartera['Precio_Compra'] * 0.9, 0.0)
+    precios = df.ffill().iloc[-1].astype(float)
+    precios = precios.drop(rng.choice(precios.index, size=max(1, len(precios) // 20), replace=False))
+    precios.iloc[rng.integers(0, len(precios), size=3)] = 0.0
+    return cartera, precios
+
+
+def _diferencia(a, b):
+    """'' si los DataFrames coinciden (tolerancia de float), si no el comienzo del error."""
+    try: pd.testing.assert_frame_equal(a, b, check_exact=False, rtol=1e-9)
+    except AssertionError as e: return ' '.join(str(e).split())[:160]
+    return ''
+
+
+def equivalencias(tamano):
+    """{caso: diferencia}; una diferencia vacía es que coinciden."""
+    n_tickers, anios, n_lotes = TAMANOS[tamano]
+    df = matriz_sintetica(n_tickers, anios)
+    # Corrida al presente: la referencia de unir_historial mira el reloj
+    hoy = pd.Timestamp.now().normalize()
+    df.index = pd.bdate_range(end=hoy - pd.offsets.BDay(), periods=len(df))
+    matriz, precios_hoy = MatrizPrecios.desde_frame(df), df.ffill().iloc[-1].astype(float).to_dict()
+    # Universo con tickers que nunca llegan (quedan PENDIENTE) y tandas con tickers ajenos
+    universo = list(df.columns) + ['SIN_DATOS.BA']
+    tandas = _tandas_screener(df)
+    cartera, precios = _cartera_equivalencias(df, n_lotes)
+    df_mep = market_logic.calcular_serie_mep(df)
+
+    return {
+        'unir_historial': _diferencia(data_client.unir_historial(matriz, precios_hoy, hoy), _union_reloj(matriz, precios_hoy, hoy)),
+        'screener_aplicar': _diferencia(_aplicar_tandas(screener_state.EstadoScreener(universo), tandas),
+                                        _aplicar_tandas(_ScreenerLoc(universo), tandas)),
+        'analizar_portafolio': _diferencia(market_logic.analizar_portafolio(cartera, precios), _portafolio_filas(cartera, precios)),
+        'analizar_portafolio_usd': _diferencia(market_logic.analizar_portafolio(cartera, precios, moneda='USD', df_mep=df_mep),
+                                               market_logic._portafolio_a_usd(_portafolio_filas(cartera, precios), df_mep)),
+    }
+
+
+def correr_equivalencias(tamanos):
+    fallas = []
+    for tamano in tamanos:
+        for nombre, diferencia in equivalencias(tamano).items():
+            clave = f"{nombre}[{tamano}]"
+            print(f"  {clave:45s} {'DIFERENCIA: ' + diferencia if diferencia else 'ok'}")
+            if diferencia: fallas.append(clave)
+    return fallas
+
+
+# --- ARRANQUE (intérprete nuevo por medición) ---
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+PAGINAS = ['home.py'] + sorted(os.path.relpath(p, RAIZ) for p in glob.glob(os.path.join(RAIZ, 'pages', '*.py')))
+
+# En un intérprete nuevo: base (streamlit + pandas, los paga cualquier página), las líneas
+# import/from de nivel módulo de la página, y después primer render y rerun con AppTest.
+_MEDIR_PAGINA = """
+import ast, json, logging, sys, time
+t0 = time.perf_counter()
+import numpy, pandas, streamlit
+t1 = time.perf_counter()
+arbol = ast.parse(open(sys.argv[1], encoding='utf-8').read())
+imports = ast.Module([n for n in arbol.body if isinstance(n, (ast.Import, ast.ImportFrom))], [])
+exec(compile(imports, sys.argv[1], 'exec'), {})
+t2 = time.perf_counter()
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t3 = time.perf_counter(); at.run(); t4 = time.perf_counter(); at.run(); t5 = time.perf_counter()
+print(json.dumps({'base': t1 - t0, 'importar': t2 - t1, 'render': t4 - t3, 'rerun': t5 - t4,
+                  'excepciones': len(at.exception), 'errores': [e.value for e in at.error]}))
+"""
+
+
+def _entorno_arranque(directorio):
+    """Fixtures chicos de Sheets + IOL simulado; nada de la corrida toca .cache_precios real."""
+    import iol_simulado
+    import sheets_simulado
+
+    n_tickers, anios, n_lotes = TAMANOS['chico']
+    sheets_simulado.generar_fixtures(os.path.join(directorio, 'sheets'), lotes=n_lotes, dias=252 * anios, tickers=n_tickers)
+    _, _, url = iol_simulado.iniciar()
+    return dict(os.environ, SHEETS_SIMULADO=os.path.join(directorio, 'sheets'), IOL_BASE_URL=url,
+                DIR_COMPARTIDO=os.path.join(directorio, 'compartido'), PERFILAR='',
+                PYTHONPATH=os.pathsep.join(filter(None, [RAIZ, os.environ.get('PYTHONPATH')])))
+
+
+def _medir_pagina(pagina, entorno):
+    r = subprocess.run([sys.executable, '-c', _MEDIR_PAGINA, pagina], cwd=RAIZ, env=entorno, capture_output=True, text=True, timeout=300)
+    if r.returncode != 0: raise RuntimeError(f"{pagina}: {r.stderr.strip().splitlines()[-1:]}")
+    return json.loads(r.stdout.strip().splitlines()[-1])
+
+
+def correr_arranque(repeticiones, filtro=None):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        entorno = _entorno_arranque(directorio)
+        for pagina in PAGINAS:
+            nombre = os.path.splitext(os.path.basename(pagina))[0]
+            if filtro and filtro not in f"arranque[{nombre}]": continue
+            tiempos = {'base': [], 'importar': [], 'render': [], 'rerun': []}
+            for _ in range(repeticiones):
+                medicion = _medir_pagina(pagina, entorno)
+                if medicion['excepciones']: print(f"  ! {pagina}: la página terminó con excepción")
+                for error in medicion['errores']: print(f"  ! {pagina}: {error}")
+                for etapa in tiempos: tiempos[etapa].append(medicion[etapa])
+            for etapa, valores in tiempos.items():
+                clave = f"arranque_{etapa}[{nombre}]"
+                resultados[clave] = {'mediana_s': float(np.median(valores)), 'min_s': float(np.min(valores)), 'repeticiones': repeticiones}
+                print(f"  {clave:45s} {resultados[clave]['mediana_s'] * 1000:10.2f} ms")
+    return resultados
+
+
+def excedidas(resultados, presupuesto):
+    """Páginas cuyo import propio + primer render (medianas, sin la base streamlit/pandas) supera el presupuesto."""
+    fuera = []
+    for clave, r in resultados.items():
+        if not clave.startswith('arranque_importar['): continue
+        pagina = clave[len('arranque_importar['):-1]
+        render = resultados.get(f"arranque_render[{pagina}]")
+        total = r['mediana_s'] + (render['mediana_s'] if render else 0)
+        if total > presupuesto:
+            print(f"  {pagina}: arranque {total:.2f}s > presupuesto {presupuesto:.2f}s")
+            fuera.append(pagina)
+    return fuera
+
+
+def _meta():
+    return {'fecha': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'maquina': platform.node()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks con datos sintéticos.")
+    parser.add_argument('--tamanos', default='chico,medio', help=f"Lista separada por comas: {', '.join(TAMANOS)}")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--filtro', default=None, help="Solo casos cuyo nombre contenga este texto")
+    parser.add_argument('--salida', default='bench_resultados.json')
+    parser.add_argument('--baseline', default='bench_baseline.json')
+    parser.add_argument('--guardar-baseline', action='store_true')
+    parser.add_argument('--tolerancia', type=float, default=0.20, help="Margen antes de marcar regresión (0.20 = 20%%)")
+    parser.add_argument('--arranque', action='store_true', help="Medir también import y primer render de cada página")
+    parser.add_argument('--presupuesto', type=float, default=1.0, help="Segundos máximos de import propio + primer render por página")
+    parser.add_argument('--equivalencias', action='store_true', help="Solo comparar los caminos optimizados contra su versión anterior")
+    args = parser.parse_args(argv)
+
+    tamanos = [t.strip() for t in args.tamanos.split(',') if t.strip() in TAMANOS]
+    if args.equivalencias: return 1 if correr_equivalencias(tamanos) else 0
+    resultados = correr(tamanos, args.repeticiones, args.filtro)
+    fuera_de_presupuesto = []
+    if args.arranque:
+        resultados.update(correr_arranque(args.repeticiones, args.filtro))
+        fuera_de_presupuesto = excedidas(resultados, args.presupuesto)
+    informe = {'meta': _meta(), 'resultados': resultados}
+
+    with open(args.salida, 'w') as f: json.dump(informe, f, indent=2)
+    if args.guardar_baseline:
+        with open(args.baseline, 'w') as f: json.dump(informe, f, indent=2)
+        print(f"Baseline guardado en {args.baseline}")
+        return 1 if fuera_de_presupuesto else 0
+
+    try:
+        with open(args.baseline) as f: baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"Sin baseline ({args.baseline}); usá --guardar-baseline para crearlo.")
+        return 1 if fuera_de_presupuesto else 0
+    regresiones = comparar(resultados, baseline, args.tolerancia)
+    return 1 if regresiones or fuera_de_presupuesto else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+"""
+Control de calidad del histórico y tabla de ajustes por eventos corporativos:
+
+    python calidad.py --hoja Historial_Yahoo          # detecta, concilia con IOL y guarda la tabla
+
+Una pasada vectorizada sobre toda la matriz marca dos tipos de evento:
+  - tick: salto que se revierte al día siguiente (precio mal cargado) -> se anula al leer.
+  - salto: cambio de nivel que se mantiene (split, amortización de bono, o movimiento real).
+Cada salto nuevo se concilia contra las series 'ajustada' y 'sinAjustar' de IOL: si la ajustada
+no salta y la sin ajustar sí, es un evento corporativo y el factor sale de la diferencia. Sin IOL
+se aceptan solo los saltos con forma de split (2:1, 1:10, ...). Lo que queda sin confirmar se
+guarda con Aplicado=False para revisarlo a mano en el CSV.
+
+La tabla (ajustes_<hoja>.csv en DIR_INGESTA) se aplica recién al leer el histórico
+(database.get_historical_matrix), una vez por generación: la matriz guardada queda sin tocar.
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+import tracing
+from price_matrix import MatrizPrecios
+
+try:
+    from config import DIR_INGESTA
+except ImportError:
+    DIR_INGESTA = '.historial'
+
+UMBRAL_TICK = 0.25    # |log-retorno| de ida y de vuelta para un tick erróneo (~ ±28%)
+UMBRAL_SALTO = 0.35   # |log-retorno| de un cambio de nivel sospechoso (~ -30% / +42%)
+TOLERANCIA_SPLIT = 0.03
+RATIOS_SPLIT = np.array([2, 3, 4, 5, 10, 20, 25, 50, 100], dtype=float)
+COLUMNAS = ['Ticker', 'Fecha', 'Tipo', 'Factor', 'Origen', 'Aplicado']
+
+
+# --- DETECCIÓN (una pasada sobre toda la matriz) ---
+def _vecinos(valores):
+    """Para cada celda válida: último valor válido anterior y siguiente valor válido posterior."""
+    df = pd.DataFrame(valores)
+    return df.ffill().shift(1).to_numpy(), df.bfill().shift(-1).to_numpy()
+
+
+def _ratio_split(ratio):
+    """Ratio 'lindo' más cercano (2, 1/10, ...) si está dentro de la tolerancia; si no, NaN."""
+    invertir = ratio < 1
+    r = np.where(invertir, 1 / ratio, ratio)
+    cercano = RATIOS_SPLIT[np.abs(RATIOS_SPLIT[None, :] - r[:, None]).argmin(axis=1)]
+    ok = np.abs(r / cercano - 1) <= TOLERANCIA_SPLIT
+    return np.where(ok, np.where(invertir, 1 / cercano, cercano), np.nan)
+
+
+def detectar(matriz):
+    """DataFrame con un evento por fila: Ticker, Fecha, Tipo (tick/salto), Ratio (precio / anterior)."""
+    if matriz is None or matriz.empty: return pd.DataFrame(columns=['Ticker', 'Fecha', 'Tipo', 'Ratio'])
+    with tracing.span('calidad.detectar', f"{matriz.shape[1]} tickers"):
+        valores = np.asarray(matriz.valores, dtype=float)
+        anterior, siguiente = _vecinos(valores)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = np.log(valores / anterior)
+            r_sig = np.log(siguiente / valores)
+        # El último precio de cada ticker se clasifica en la próxima sincronización, cuando haya un día más
+        confirmable = ~np.isnan(r_sig)
+        r, r_sig = np.nan_to_num(r), np.nan_to_num(r_sig)
+
+        tick = (np.abs(r) > UMBRAL_TICK) & (np.abs(r_sig) > UMBRAL_TICK) & (np.sign(r) != np.sign(r_sig)) \
+            & (np.abs(r + r_sig) < UMBRAL_TICK / 2)
+        salto = (np.abs(r) > UMBRAL_SALTO) & ~tick
+        # El día siguiente a un tick también "vuelve" de golpe: no es un salto propio
+        salto[1:] &= ~tick[:-1]
+
+        filas, cols = np.nonzero((tick | salto) & confirmable)
+    return pd.DataFrame({
+        'Ticker': np.asarray(matriz.tickers)[cols],
+        'Fecha': matriz.fechas[filas],
+        'Tipo': np.where(tick[filas, cols], 'tick', 'salto'),
+        'Ratio': np.exp(r[filas, cols]),
+    })
+
+
+# --- CONCILIACIÓN ---
+def _retorno_en(serie, fecha):
+    """log(precio en fecha / precio hábil anterior) de una serie de IOL, o NaN si no alcanza."""
+    if serie is None or serie.empty or fecha not in serie.index: return np.nan
+    pos = serie.index.get_loc(fecha)
+    if pos == 0: return np.nan
+    return float(np.log(serie.iloc[pos] / serie.iloc[pos - 1]))
+
+
+def conciliar(eventos, token=None):
+    """
+    Completa Factor/Origen/Aplicado de cada evento. Factor multiplica los precios anteriores a
+    Fecha (para un split 10:1 vale 0.1). Con token se consultan las series de IOL alrededor del salto.
+    """
+    import ingesta
+
+    filas = []
+    splits = _ratio_split(eventos['Ratio'].to_numpy(dtype=float)) if len(eventos) else np.array([])
+    saltos_ba = ((eventos['Tipo'] == 'salto') & eventos['Ticker'].str.upper().str.endswith('.BA')).any()
+    con_iol = token is not None and saltos_ba and bool(token.obtener())
+    for ev, split in zip(eventos.itertuples(index=False), splits):
+        if ev.Tipo == 'tick':
+            filas.append((ev.Ticker, ev.Fecha, 'tick', np.nan, 'detectado', True))
+            continue
+
+        factor, origen = np.nan, 'sin_confirmar'
+        if con_iol and ev.Ticker.upper().endswith('.BA'):
+            desde, hasta = ev.Fecha - pd.Timedelta(days=10), ev.Fecha + pd.Timedelta(days=3)
+            try:
+                r_aj = _retorno_en(ingesta.serie_iol(ev.Ticker, desde, hasta, token, 'ajustada'), ev.Fecha)
+                r_sin = _retorno_en(ingesta.serie_iol(ev.Ticker, desde, hasta, token, 'sinAjustar'), ev.Fecha)
+            except Exception as e:
+                print(f"Conciliación {ev.Ticker} {ev.Fecha:%Y-%m-%d}: {e}")
+                r_aj = r_sin = np.nan
+            if not np.isnan(r_aj) and not np.isnan(r_sin):
+                if abs(r_aj) < UMBRAL_SALTO / 2 and abs(r_sin) > UMBRAL_SALTO:
+                    # La ajustada no salta: evento corporativo; se deja el salto que hubiera tenido la ajustada
+                    factor, origen = float(ev.Ratio / np.exp(r_aj)), 'iol'
+                else:
+                    origen = 'real'
+        if origen == 'sin_confirmar' and not np.isnan(split):
+            factor, origen = float(split), 'inferido'
+        filas.append((ev.Ticker, ev.Fecha, 'salto', factor, origen, not np.isnan(factor)))
+    return pd.DataFrame(filas, columns=COLUMNAS)
+
+
+# --- TABLA DE AJUSTES ---
+def _ruta_tabla(hoja, directorio=None):
+    return os.path.join(directorio or DIR_INGESTA, f"ajustes_{hoja}.csv")
+
+
+def leer_tabla(hoja, directorio=None):
+    try:
+        tabla = pd.read_csv(_ruta_tabla(hoja, directorio), parse_dates=['Fecha'])
+    except (OSError, ValueError):
+        return pd.DataFrame(columns=COLUMNAS)
+    tabla['Aplicado'] = tabla['Aplicado'].astype(str).str.lower().isin(['true', '1', 'si', 'sí'])
+    return tabla
+
+
+def guardar_tabla(tabla, hoja, directorio=None):
+    ruta = _ruta_tabla(hoja, directorio)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    tabla.sort_values(['Ticker', 'Fecha']).to_csv(tmp, index=False, date_format='%Y-%m-%d')
+    os.replace(tmp, ruta)
+
+
+def sincronizar(hoja, matriz, token=None, directorio=None):
+    """
+    Pasada de calidad de una sincronización: detecta sobre toda la matriz y concilia solo los
+    eventos que no estaban en la tabla (las filas existentes, incluso editadas a mano, se respetan).
+    Devuelve (tabla, cantidad de eventos nuevos).
+    """
+    tabla = leer_tabla(hoja, directorio)
+    eventos = detectar(matriz)
+    conocidos = set(zip(tabla['Ticker'], pd.to_datetime(tabla['Fecha'])))
+    nuevos = eventos[[(t, f) not in conocidos for t, f in zip(eventos['Ticker'], eventos['Fecha'])]]
+    if nuevos.empty: return tabla, 0
+    partes = [t for t in (tabla, conciliar(nuevos, token)) if not t.empty]
+    tabla = pd.concat(partes, ignore_index=True)
+    guardar_tabla(tabla, hoja, directorio)
+    return tabla, len(nuevos)
+
+
+# --- APLICACIÓN AL LEER ---
+_AJUSTADAS = {}  # hoja -> (matriz original, mtime de la tabla, matriz ajustada)
+
+
+def aplicar(matriz, tabla):
+    """Copia de la matriz con ticks anulados y precios previos a cada salto multiplicados por su factor."""
+    activos = tabla[tabla['Aplicado']] if not tabla.empty else tabla
+    if matriz.empty or activos.empty: return matriz
+    valores = np.array(matriz.valores, copy=True)
+    columnas = pd.Index(matriz.tickers)
+    fechas = matriz.fechas
+    for ev in activos.itertuples(index=False):
+        col = columnas.get_indexer([ev.Ticker])[0]
+        if col < 0: continue
+        fila = fechas.searchsorted(pd.Timestamp(ev.Fecha))
+        if ev.Tipo == 'tick':
+            if fila < len(fechas) and fechas[fila] == pd.Timestamp(ev.Fecha): valores[fila, col] = np.nan
+        elif not pd.isna(ev.Factor):
+            valores[:fila, col] *= ev.Factor
+    return MatrizPrecios(valores, fechas, list(matriz.tickers))
+
+
+def ajustada(hoja, matriz, directorio=None):
+    """Matriz con la tabla de ajustes aplicada; se recalcula solo si cambió la generación o la tabla."""
+    if matriz is None or matriz.empty: return matriz
+    try: mtime = os.stat(_ruta_tabla(hoja, directorio)).st_mtime_ns
+    except OSError: return matriz
+    previo = _AJUSTADAS.get(hoja)
+    if previo and previo[0] is matriz and previo[1] == mtime: return previo[2]
+    resultado = aplicar(matriz, leer_tabla(hoja, directorio))
+    _AJUSTADAS[hoja] = (matriz, mtime, resultado)
+    return resultado
+
+
+def main(argv=None):
+    import data_client
+    import database
+    import ingesta
+
+    parser = argparse.ArgumentParser(description="Control de calidad y tabla de ajustes del histórico.")
+    parser.add_argument('--hoja', default='Historial_Yahoo')
+    parser.add_argument('--sin-iol', action='store_true', help="No conciliar con IOL (solo splits inferidos)")
+    args = parser.parse_args(argv)
+
+    matriz = ingesta.base_inicial(args.hoja)
+    token = None if args.sin_iol else data_client._TOKEN
+    tabla, nuevos = sincronizar(args.hoja, matriz, token)
+    database.invalidar_historial(args.hoja)
+    print(f"{args.hoja}: {nuevos} eventos nuevos, {len(tabla)} en la tabla ({_ruta_tabla(args.hoja)})")
+    if not tabla.empty: print(tabla.groupby(['Tipo', 'Origen']).size().to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
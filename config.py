@@ -1,91 +1,155 @@
-import streamlit as st
-import os
-import sys
-
-# ----------------------------------------------------
-# --- LÓGICA DE DETECCIÓN DE ENTORNO ---
-# ----------------------------------------------------
-try:
-    GOOGLE_CREDENTIALS_DICT = dict(st.secrets["gcp_service_account"])
-    if "private_key" in GOOGLE_CREDENTIALS_DICT:
-        pk = GOOGLE_CREDENTIALS_DICT["private_key"]
-        GOOGLE_CREDENTIALS_DICT["private_key"] = pk.replace("\\n", "\n")
-        
-    IOL_USER = st.secrets["IOL_USER"]
-    IOL_PASSWORD = st.secrets["IOL_PASSWORD"]
-    SHEET_NAME = st.secrets["SHEET_NAME"]
-    USE_CLOUD_AUTH = True
-    CREDENTIALS_FILE = None 
-except Exception as e:
-    USE_CLOUD_AUTH = False
-    GOOGLE_CREDENTIALS_DICT = None
-    IOL_USER = ""
-    IOL_PASSWORD = ""
-    SHEET_NAME = "para_streamlit" 
-    CREDENTIALS_FILE = "ruta_correcta_a_tu_archivo.json" 
-
-# --- CONFIGURACIÓN GENERAL ---
-DIAS_HISTORIAL = 200
-
-# TASAS E IMPUESTOS
-IVA = 1.21
-VETA_MINIMO = 50
-
-# DERECHOS DE MERCADO DIFERENCIADOS
-DERECHOS_ACCIONES = 0.0005  # 0.05% (Factura GGAL)
-DERECHOS_BONOS = 0.0001     # 0.01% (Factura AL30)
-
-# COMISIONES (Base sin IVA)
-COMISIONES = {
-    'IOL': 0.0045, 
-    'BULL': 0.0045, 
-    'COCOS': 0.0045, 
-    'VETA': 0.0015, 
-    'DEFAULT': 0.0045
-}
-
-# TICKERS Y CATEGORÍAS
-TICKERS_CONFIG = {
-    'Favoritos': ['GGAL.BA', 'YPFD.BA', 'AL30.BA', 'GD30.BA'],
-    
-    # Lider: 20 Merval + BHIP + BPAT
-    'Lider': [
-        'ALUA.BA', 'BBAR.BA', 'BMA.BA', 'BYMA.BA', 'CEPU.BA', 'COME.BA', 
-        'CRES.BA', 'EDN.BA', 'GGAL.BA', 'LOMA.BA', 'MIRG.BA', 'PAMP.BA', 
-        'SUPV.BA', 'TECO2.BA', 'TGNO4.BA', 'TGSU2.BA', 'TRAN.BA', 'TXAR.BA', 
-        'VALO.BA', 'YPFD.BA',
-        # Agregados por solicitud
-        'BHIP.BA', 'BPAT.BA'
-    ],
-    
-    # General: Stocks restantes que no son Merval
-    'General': [
-        'BOLT.BA', 'LEDE.BA', 'MOLI.BA', 'SEMI.BA', 
-        # Si quieres agregar más acciones conocidas del panel general:
-        'DGCU2.BA', 'GARO.BA', 'CADO.BA' 
-    ],
-    
-    # Cedears: Selección de los más líquidos y representativos
-    'Cedears': [
-        # Tech & Growth (Lideres)
-        'AAPL.BA', 'MSFT.BA', 'GOOGL.BA', 'AMZN.BA', 'NVDA.BA', 'AMD.BA', 
-        'TSLA.BA', 'META.BA', 'MELI.BA', 'ADBE.BA',
-        # Consumo / Retail
-        'BABA.BA', 'DIS.BA', 'KO.BA', 'WMT.BA', 'MCD.BA', 'PFE.BA',
-        # Financieras / Industriales
-        'V.BA', 'JPM.BA', 'QCOM.BA', 'BBD.BA', 'X.BA', 
-        # ETFs y Energía
-        'SPY.BA', 'QQQ.BA', 'DIA.BA', 'VIST.BA', 'ARKK.BA'
-    ],
-    
-    # Bonos: Lista completa de AL/GD + Ley Local/Extranjera + Letras
-    'Bonos': [
-        'AL29.BA', 'AL29D.BA', 'AL30.BA', 'AL30D.BA', 'AL35.BA', 'AL35D.BA',
-        'AE38.BA', 'AE38D.BA', 'AL41.BA', 'AL41D.BA',
-        'GD29.BA', 'GD29D.BA', 'GD30.BA', 'GD30D.BA', 'GD35.BA', 'GD35D.BA',
-        'GD38.BA', 'GD38D.BA', 'GD41.BA', 'GD41D.BA', 'GD46.BA', 'GD46D.BA',
-    ]
-}
-
-# La lógica para generar la lista única de tickers (TICKERS) sigue siendo perfecta
+import streamlit as st
+import os
+import sys
+
+# ----------------------------------------------------
+# --- LÓGICA DE DETECCIÓN DE ENTORNO ---
+# ----------------------------------------------------
+# Las credenciales se leen de st.secrets recién cuando alguien las pide (config.IOL_USER,
+# from config import SHEET_NAME, ...), no al importar: una página que no va a Sheets ni a
+# IOL no paga el parseo de secrets.toml.
+_SECRETOS = None
+_NOMBRES_SECRETOS = ('GOOGLE_CREDENTIALS_DICT', 'IOL_USER', 'IOL_PASSWORD', 'SHEET_NAME', 'USE_CLOUD_AUTH', 'CREDENTIALS_FILE')
+
+def _cargar_secretos():
+    global _SECRETOS
+    if _SECRETOS is not None: return _SECRETOS
+    try:
+        GOOGLE_CREDENTIALS_DICT = dict(st.secrets["gcp_service_account"])
+        if "private_key" in GOOGLE_CREDENTIALS_DICT:
+            pk = GOOGLE_CREDENTIALS_DICT["private_key"]
+            GOOGLE_CREDENTIALS_DICT["private_key"] = pk.replace("\\n", "\n")
+
+        _SECRETOS = {
+            'GOOGLE_CREDENTIALS_DICT': GOOGLE_CREDENTIALS_DICT,
+            'IOL_USER': st.secrets["IOL_USER"],
+            'IOL_PASSWORD': st.secrets["IOL_PASSWORD"],
+            'SHEET_NAME': st.secrets["SHEET_NAME"],
+            'USE_CLOUD_AUTH': True,
+            'CREDENTIALS_FILE': None,
+        }
+    except Exception as e:
+        _SECRETOS = {
+            'USE_CLOUD_AUTH': False,
+            'GOOGLE_CREDENTIALS_DICT': None,
+            'IOL_USER': "",
+            'IOL_PASSWORD': "",
+            'SHEET_NAME': "para_streamlit",
+            'CREDENTIALS_FILE': "ruta_correcta_a_tu_archivo.json",
+        }
+    return _SECRETOS
+
+def __getattr__(nombre):
+    if nombre in _NOMBRES_SECRETOS: return _cargar_secretos()[nombre]
+    raise AttributeError(f"module 'config' has no attribute '{nombre}'")
+
+# --- CONFIGURACIÓN GENERAL ---
+DIAS_HISTORIAL = 200
+
+# API DE IOL (IOL_BASE_URL=http://127.0.0.1:8765 apunta al simulador de iol_simulado.py)
+IOL_BASE_URL = os.environ.get("IOL_BASE_URL", "https://api.invertironline.com").rstrip("/")
+
+# SHEETS SIMULADO (directorio de CSV de sheets_simulado.py en lugar de la planilla real)
+SHEETS_SIMULADO = os.environ.get("SHEETS_SIMULADO", "")
+
+# PERFILADO POR RERUN (PERFILAR=1 o ?perfilar=1; ver perfilado.py)
+DIR_PERFILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.perfiles')
+PERFILES_MAX = 50  # Reruns guardados (.pstats + .collapsed); se borran los más viejos
+
+# HISTÓRICO COMPARTIDO (matriz mapeada en memoria por todos los procesos)
+DIR_COMPARTIDO = os.environ.get("DIR_COMPARTIDO") or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_precios')
+HISTORIAL_TTL_SEG = 3600  # Antigüedad máxima antes de releer Sheets
+
+# INGESTA DEL HISTÓRICO (ingesta.py: IOL seriehistorica, Yahoo opcional)
+DIR_INGESTA = os.environ.get("DIR_INGESTA") or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.historial')
+HISTORIAL_LOCAL = os.environ.get("HISTORIAL_LOCAL", "") == "1"  # La app lee el histórico de DIR_INGESTA y no de Sheets
+INGESTA_BACKFILL_DIAS = 3650  # Días hacia atrás para un ticker sin historia
+INGESTA_WORKERS = 8           # Pedidos simultáneos a IOL
+INGESTA_LOTE_SHEETS = 500     # Filas por append_rows
+
+# DIARIO INTRADIARIO (intradia.py: cada cotización de IOL -> velas de 1 / 5 minutos)
+DIR_INTRADIA = os.environ.get("DIR_INTRADIA") or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.intradia')
+INTRADIA_RETENCION_MIN = 600  # Velas de 1 minuto en memoria por ticker (más de una rueda)
+INTRADIA_DIAS = 5             # Archivos diarios que se conservan
+
+# API DE SOLO LECTURA (api.py: último snapshot como JSON / Arrow)
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PUERTO = int(os.environ.get("API_PUERTO", "8502"))
+API_RECARGA_SEG = 1.0  # Cada cuánto se mira si hay un snapshot nuevo en disco
+API_TOKEN = os.environ.get("API_TOKEN", "")  # Vacío = sin /alertas, /portafolio ni /snapshot
+
+# LECTURAS DE SHEETS (portafolio / historial): stale-while-revalidate
+LECTURAS_TTL_SEG = 60          # Pasado este tiempo se relee en segundo plano
+LECTURAS_MAX_EDAD_SEG = 1800   # Más viejo que esto no se sirve: se relee bloqueando
+LECTURAS_BACKOFF_SEG = 30      # Espera inicial tras un error (se duplica en cada fallo)
+
+# TASAS E IMPUESTOS
+IVA = 1.21
+VETA_MINIMO = 50
+
+# DERECHOS DE MERCADO DIFERENCIADOS
+DERECHOS_ACCIONES = 0.0005  # 0.05% (Factura GGAL)
+DERECHOS_BONOS = 0.0001     # 0.01% (Factura AL30)
+
+# COMISIONES (Base sin IVA)
+COMISIONES = {
+    'IOL': 0.0045, 
+    'BULL': 0.0045, 
+    'COCOS': 0.0045, 
+    'VETA': 0.0015, 
+    'DEFAULT': 0.0045
+}
+
+# ALERTAS (CoolDown_Alta / CoolDown_Baja guardan el timestamp del último disparo)
+ALERTAS_COOLDOWN_MIN = 240  # Minutos de silencio tras disparar una alerta
+ALERTAS_FLUSH_LOTE = 10     # Disparos acumulados antes de escribir en Sheets
+ALERTAS_FLUSH_SEG = 300     # Espera máxima (seg) antes de escribir los pendientes
+
+# TICKERS Y CATEGORÍAS
+TICKERS_CONFIG = {
+    'Favoritos': ['GGAL.BA', 'YPFD.BA', 'AL30.BA', 'GD30.BA'],
+    
+    # Lider: 20 Merval + BHIP + BPAT
+    'Lider': [
+        'ALUA.BA', 'BBAR.BA', 'BMA.BA', 'BYMA.BA', 'CEPU.BA', 'COME.BA', 
+        'CRES.BA', 'EDN.BA', 'GGAL.BA', 'LOMA.BA', 'MIRG.BA', 'PAMP.BA', 
+        'SUPV.BA', 'TECO2.BA', 'TGNO4.BA', 'TGSU2.BA', 'TRAN.BA', 'TXAR.BA', 
+        'VALO.BA', 'YPFD.BA',
+        # Agregados por solicitud
+        'BHIP.BA', 'BPAT.BA'
+    ],
+    
+    # General: Stocks restantes que no son Merval
+    'General': [
+        'BOLT.BA', 'LEDE.BA', 'MOLI.BA', 'SEMI.BA', 
+        # Si quieres agregar más acciones conocidas del panel general:
+        'DGCU2.BA', 'GARO.BA', 'CADO.BA' 
+    ],
+    
+    # Cedears: Selección de los más líquidos y representativos
+    'Cedears': [
+        # Tech & Growth (Lideres)
+        'AAPL.BA', 'MSFT.BA', 'GOOGL.BA', 'AMZN.BA', 'NVDA.BA', 'AMD.BA', 
+        'TSLA.BA', 'META.BA', 'MELI.BA', 'ADBE.BA',
+        # Consumo / Retail
+        'BABA.BA', 'DIS.BA', 'KO.BA', 'WMT.BA', 'MCD.BA', 'PFE.BA',
+        # Financieras / Industriales
+        'V.BA', 'JPM.BA', 'QCOM.BA', 'BBD.BA', 'X.BA', 
+        # ETFs y Energía
+        'SPY.BA', 'QQQ.BA', 'DIA.BA', 'VIST.BA', 'ARKK.BA'
+    ],
+    
+    # Bonos: Lista completa de AL/GD + Ley Local/Extranjera + Letras
+    'Bonos': [
+        'AL29.BA', 'AL29D.BA', 'AL30.BA', 'AL30D.BA', 'AL35.BA', 'AL35D.BA',
+        'AE38.BA', 'AE38D.BA', 'AL41.BA', 'AL41D.BA',
+        'GD29.BA', 'GD29D.BA', 'GD30.BA', 'GD30D.BA', 'GD35.BA', 'GD35D.BA',
+        'GD38.BA', 'GD38D.BA', 'GD41.BA', 'GD41D.BA', 'GD46.BA', 'GD46D.BA',
+    ]
+}
+
+# Pares peso/dólar que se cotizan en tiempo real para el MEP (el historial usa todos los pares presentes)
+TICKERS_MEP = ['AL30.BA', 'AL30D.BA', 'GD30.BA', 'GD30D.BA']
+
+# La lógica para generar la lista única de tickers (TICKERS) sigue siendo perfecta
 TICKERS = list(set([t for sublist in TICKERS_CONFIG.values() for t in sublist]))
\ No newline at end of file
@@ -0,0 +1,3 @@
+# test_data.py, test_iol.py y test_check_tickers.py son scripts manuales contra Yahoo/IOL reales
+# (corren al importarse): pytest junta solo las pruebas offline.
+collect_ignore = ['test_data.py', 'test_iol.py', 'test_check_tickers.py']
@@ -1,115 +1,147 @@
-import pandas as pd
-import yfinance as yf
-import requests
-import concurrent.futures
-from datetime import datetime, timedelta
-import numpy as np
-import os
-import json 
-import streamlit as st 
-import time 
-import io
-import random 
-
-# CRÍTICO: Importamos database para leer la nueva fuente de datos histórica
-import database 
-
-pd.options.mode.chained_assignment = None 
-IOL_BASE_URL = "https://api.invertironline.com"
-IOL_TOKEN_URL = f"{IOL_BASE_URL}/token"
-BONOS_SKIP_YAHOO = ['AL30.BA', 'AL30D.BA', 'GD30.BA', 'GD30D.BA', 'AE38.BA', 'AE38D.BA', 'AL29.BA', 'AL29D.BA', 'GD35.BA', 'GD35D.BA']
-
-try:
-    from config import TICKERS, DIAS_HISTORIAL, IOL_USER, IOL_PASSWORD
-except ImportError:
-    TICKERS = []
-    DIAS_HISTORIAL = 200
-    IOL_USER = ""
-    IOL_PASSWORD = ""
-
-# --- CONFIGURACIÓN DE CACHÉ (Mantenido solo por si es usado en otro lado, pero no para historial) ---
-CACHE_FILE = "data_cache/historical_data_v4.json" 
-CACHE_DIR = "data_cache"
-
-# --- TOKEN E IOL (No Modificado) ---
-def _get_iol_token():
-    if not IOL_USER or not IOL_PASSWORD: return None
-    try:
-        data = {"username": IOL_USER, "password": IOL_PASSWORD, "grant_type": "password"}
-        r = requests.post(IOL_TOKEN_URL, data=data, timeout=5)
-        r.raise_for_status()
-        return r.json().get('access_token')
-    except: return None
-
-def _fetch_iol_price(ticker_app, token):
-    iol_symbol = ticker_app.upper().replace('.BA', '').replace('.C', '').replace('.L', '')
-    market = 'bCBA'
-    url = f"{IOL_BASE_URL}/api/v2/{market}/Titulos/{iol_symbol}/Cotizacion"
-    headers = {"Authorization": f"Bearer {token}"}
-    try:
-        r = requests.get(url, headers=headers, timeout=3) 
-        r.raise_for_status()
-        data = r.json()
-        return ticker_app, float(data['ultimoPrecio'])
-    except: return ticker_app, None
-
-def get_current_prices_iol(tickers_list):
-    token = _get_iol_token()
-    if not token: return {}
-    
-    precios_iol = {}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor: 
-        futures = {executor.submit(_fetch_iol_price, t, token): t for t in tickers_list}
-        for future in concurrent.futures.as_completed(futures, timeout=15): 
-            try:
-                t, price = future.result()
-                if price is not None: precios_iol[t] = price
-            except: continue
-    return precios_iol
-
-# --- HISTÓRICO (YAHOO) - ELIMINADO/DEPRECADO (Devuelve vacío) ---
-def get_history_yahoo(tickers_list):
-    # La aplicación ya no debe llamar a Yahoo, lo hacemos en la VM y leemos de Sheets.
-    return pd.DataFrame()
-
-# --- ORQUESTADOR PRINCIPAL (MODIFICADO) ---
-def get_data(lista_tickers=None):
-    tickers_target = lista_tickers if lista_tickers else TICKERS
-    if not tickers_target: return pd.DataFrame()
-    today = pd.Timestamp.now().normalize()
-    
-    # 1. LEER HISTORIAL DESDE GOOGLE SHEETS
-    df_history = database.get_historical_prices_df()
-    
-    if df_history.empty:
-        pass
-    else:
-        st.toast("📂 Historial cargado de Google Sheets.", icon="✅")
-
-    # 2. MERGE IOL (TIEMPO REAL)
-    dict_precios_hoy = get_current_prices_iol(tickers_target)
-    
-    # Lógica de unión: IOL (hoy) + Sheets (histórico)
-    if df_history.empty:
-        if not dict_precios_hoy: return pd.DataFrame()
-        df_final = pd.DataFrame([dict_precios_hoy], index=[today])
-    else:
-        # Aseguramos que el histórico de Sheets no tenga el precio de hoy (si el bot lo incluyó)
-        if df_history.index[-1].normalize() == today: 
-            df_history = df_history.iloc[:-1]
-            
-        if dict_precios_hoy:
-            row_today = pd.DataFrame([dict_precios_hoy], index=[today])
-            df_final = pd.concat([df_history, row_today])
-        else:
-            df_final = df_history
-    
-    if df_final.empty: return pd.DataFrame()
-
-    df_final.sort_index(inplace=True)
-    df_final.ffill(inplace=True) 
-    
-    cutoff = datetime.now() - timedelta(days=DIAS_HISTORIAL)
-    df_final = df_final[df_final.index >= cutoff]
-
-    return df_final
\ No newline at end of file
+import pandas as pd
+import requests
+import concurrent.futures
+from datetime import timedelta
+import numpy as np
+import os
+import json 
+import time 
+import io
+import random 
+import threading
+
+# CRÍTICO: Importamos database para leer la nueva fuente de datos histórica
+import database 
+import intradia
+import tracing
+
+pd.options.mode.chained_assignment = None 
+BONOS_SKIP_YAHOO = ['AL30.BA', 'AL30D.BA', 'GD30.BA', 'GD30D.BA', 'AE38.BA', 'AE38D.BA', 'AL29.BA', 'AL29D.BA', 'GD35.BA', 'GD35D.BA']
+
+try:
+    from config import TICKERS, DIAS_HISTORIAL, IOL_BASE_URL
+except ImportError:
+    IOL_BASE_URL = os.environ.get("IOL_BASE_URL", "https://api.invertironline.com").rstrip("/")
+    TICKERS = []
+    DIAS_HISTORIAL = 200
+IOL_TOKEN_URL = f"{IOL_BASE_URL}/token"
+
+# --- CONFIGURACIÓN DE CACHÉ (Mantenido solo por si es usado en otro lado, pero no para historial) ---
+CACHE_FILE = "data_cache/historical_data_v4.json" 
+CACHE_DIR = "data_cache"
+
+# --- TOKEN E IOL (No Modificado) ---
+def _credenciales_iol():
+    # Se leen al pedir el token: config carga st.secrets recién en ese momento
+    try:
+        import config
+        return config.IOL_USER, config.IOL_PASSWORD
+    except ImportError: return "", ""
+
+def _get_iol_token():
+    usuario, password = _credenciales_iol()
+    if not usuario or not password: return None
+    try:
+        with tracing.span('iol.token'):
+            data = {"username": usuario, "password": password, "grant_type": "password"}
+            r = requests.post(IOL_TOKEN_URL, data=data, timeout=5)
+            r.raise_for_status()
+            return r.json().get('access_token')
+    except: return None
+
+class _Token:
+    """Token de IOL compartido por el proceso; ante un 401 se pide uno nuevo una sola vez por vencimiento."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.valor = None
+
+    def obtener(self, vencido=None):
+        with self.lock:
+            if self.valor is None or self.valor == vencido:
+                self.valor = _get_iol_token()
+            return self.valor
+
+# Lo usan las cotizaciones en vivo, ingesta y calidad: no se pide un token por refresco
+_TOKEN = _Token()
+
+def _fetch_iol_price(ticker_app, token):
+    iol_symbol = ticker_app.upper().replace('.BA', '').replace('.C', '').replace('.L', '')
+    market = 'bCBA'
+    url = f"{IOL_BASE_URL}/api/v2/{market}/Titulos/{iol_symbol}/Cotizacion"
+    try:
+        # El span registra el error (HTTP 429 = throttling, timeouts) aunque acá se devuelva None
+        with tracing.span('iol.cotizacion', ticker_app):
+            r = requests.get(url, headers={"Authorization": f"Bearer {token}"}, timeout=3)
+            if r.status_code == 401:
+                # Vencido: el primer hilo que llega lo renueva, el resto reusa el nuevo
+                token = _TOKEN.obtener(vencido=token)
+                r = requests.get(url, headers={"Authorization": f"Bearer {token}"}, timeout=3)
+            r.raise_for_status()
+            data = r.json()
+            precio = float(data['ultimoPrecio'])
+            intradia.DIARIO.anotar(ticker_app, precio, data.get('volumenNominal'))
+            return ticker_app, precio
+    except: return ticker_app, None
+
+def iter_precios_iol(tickers_list, max_workers=5, timeout=15):
+    """
+    Genera (ticker, precio) a medida que llegan las cotizaciones (precio None si falló).
+    Los tickers repetidos se piden una sola vez; si se agota el timeout se corta sin el resto.
+    Al terminar, las cotizaciones de la tanda se agregan al diario intradiario.
+    """
+    token = _TOKEN.obtener()
+    if not token: return
+    
+    tickers_unicos = list(dict.fromkeys(tickers_list))
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor: 
+            futures = {executor.submit(_fetch_iol_price, t, token): t for t in tickers_unicos}
+            try:
+                for future in concurrent.futures.as_completed(futures, timeout=timeout): 
+                    try: yield future.result()
+                    except Exception: yield futures[future], None
+            except concurrent.futures.TimeoutError:
+                for f in futures: f.cancel()
+    finally:
+        intradia.DIARIO.volcar()
+
+def get_current_prices_iol(tickers_list):
+    return {t: price for t, price in iter_precios_iol(tickers_list) if price is not None}
+
+# --- HISTÓRICO (YAHOO) - ELIMINADO/DEPRECADO (Devuelve vacío) ---
+def get_history_yahoo(tickers_list):
+    # La aplicación ya no debe llamar a Yahoo: el histórico lo carga ingesta.py (IOL, Yahoo de respaldo)
+    return pd.DataFrame()
+
+# --- ORQUESTADOR PRINCIPAL (MODIFICADO) ---
+@tracing.trazar('data.get_data')
+def get_data(lista_tickers=None):
+    tickers_target = lista_tickers if lista_tickers else TICKERS
+    if not tickers_target: return pd.DataFrame()
+    today = pd.Timestamp.now().normalize()
+    
+    # 1. LEER HISTORIAL DESDE GOOGLE SHEETS (el aviso en pantalla lo da manager, no este módulo)
+    historial = database.get_historical_matrix()
+
+    # 2. MERGE IOL (TIEMPO REAL)
+    dict_precios_hoy = get_current_prices_iol(tickers_target)
+    
+    return unir_historial(historial, dict_precios_hoy, today)
+
+def unir_historial(historial, dict_precios_hoy, today=None):
+    """
+    Lógica de unión: IOL (hoy) + Sheets (histórico) sobre la matriz float32 compacta.
+    Devuelve el DataFrame de precios de los últimos DIAS_HISTORIAL días con la fila de hoy.
+    """
+    today = pd.Timestamp.now().normalize() if today is None else today
+    # El histórico de Sheets no debe tener el precio de hoy (si el bot lo incluyó se reemplaza)
+    matriz = historial.ventana(hasta=today)
+    if dict_precios_hoy:
+        matriz = matriz.con_fila(today, dict_precios_hoy)
+    
+    if matriz.empty: return pd.DataFrame()
+
+    # Relativo al día de la fila nueva (no al reloj): replay.py une días pasados. Igual que con
+    # reloj - DIAS_HISTORIAL, el día que cae justo DIAS_HISTORIAL atrás queda afuera.
+    cutoff = today - timedelta(days=DIAS_HISTORIAL - 1)
+    return matriz.ffill().ventana(desde=cutoff).a_frame()
\ No newline at end of file
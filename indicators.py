@@ -0,0 +1,238 @@
+import warnings
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import tracing
+
+# --- REGISTRO DECLARATIVO DE INDICADORES ---
+# Cada nodo es (nombre, parámetros) y declara de qué nodos depende. El ejecutor resuelve el
+# grafo en profundidad y guarda cada resultado intermedio una sola vez por matriz de precios:
+# RSI de distintas longitudes comparten diff/ganancias/pérdidas, las caídas comparten el último
+# precio, etc. Todas las funciones trabajan sobre la matriz completa (filas x tickers).
+#
+# La matriz se "empaqueta": los valores válidos de cada columna se alinean al final, así las
+# ventanas cuentan observaciones reales igual que serie.dropna() por ticker.
+
+_REGISTRO = {}
+_CONTEXTOS = OrderedDict()
+_CONTEXTOS_MAX = 4
+
+
+def nodo(nombre, **params):
+    return (nombre, tuple(sorted(params.items())))
+
+
+def indicador(nombre, entradas=None):
+    """Registra un nodo. entradas(**params) devuelve la lista de nodos que recibe la función."""
+    def deco(func):
+        _REGISTRO[nombre] = (func, entradas or (lambda **p: []))
+        return func
+    return deco
+
+
+# --- NODOS BASE ---
+@indicador('validos', lambda: [nodo('matriz')])
+def _validos(m):
+    return (~np.isnan(m)).sum(axis=0)
+
+
+@indicador('ultimo', lambda: [nodo('matriz')])
+def _ultimo(m):
+    return m[-1] if len(m) else np.array([])
+
+
+@indicador('anterior', lambda: [nodo('matriz')])
+def _anterior(m):
+    return m[-2] if len(m) >= 2 else np.full(m.shape[1], np.nan)
+
+
+@indicador('diff', lambda: [nodo('matriz')])
+def _diff(m):
+    d = np.full_like(m, np.nan)
+    d[1:] = m[1:] - m[:-1]
+    return d
+
+
+@indicador('ganancia', lambda: [nodo('diff')])
+def _ganancia(d):
+    return np.where(d < 0, 0.0, d)
+
+
+@indicador('perdida', lambda: [nodo('diff')])
+def _perdida(d):
+    return np.where(d > 0, 0.0, d)
+
+
+def _rma(m, n):
+    """
+    Media móvil de Wilder como pandas_ta.rma (ewm(alpha=1/n, min_periods=n), adjust=True) en NumPy.
+    Cada columna tiene solo NaN al principio (matriz empaquetada): los NaN no suman peso.
+    La recurrencia num_t = x_t + (1-a) num_(t-1) se resuelve por bloques con sumas acumuladas;
+    el bloque se elige para que (1-a)^-k no desborde.
+    """
+    beta = 1.0 - 1.0 / n
+    validos = ~np.isnan(m)
+    x = np.where(validos, m, 0.0)
+    bloque = max(1, int(30 / -np.log(beta))) if beta > 0 else 1
+    num, den = np.empty_like(x), np.empty_like(x)
+    num_prev, den_prev = np.zeros(m.shape[1]), np.zeros(m.shape[1])
+    for ini in range(0, len(x), bloque):
+        k = np.arange(min(bloque, len(x) - ini))[:, None]
+        pesos, decae = beta ** -k, beta ** k
+        num[ini:ini + len(k)] = decae * (np.cumsum(x[ini:ini + len(k)] * pesos, axis=0) + beta * num_prev)
+        den[ini:ini + len(k)] = decae * (np.cumsum(validos[ini:ini + len(k)] * pesos, axis=0) + beta * den_prev)
+        num_prev, den_prev = num[ini + len(k) - 1], den[ini + len(k) - 1]
+    with np.errstate(invalid='ignore'):
+        rma = num / den
+    rma[np.cumsum(validos, axis=0) < n] = np.nan
+    return rma
+
+
+def _rma_final(m, n):
+    """Última fila de _rma: suma ponderada por (1-a)^(T-1-t), sin recorrer la serie completa."""
+    validos = ~np.isnan(m)
+    pesos = (1.0 - 1.0 / n) ** np.arange(len(m) - 1, -1, -1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rma = (pesos @ np.where(validos, m, 0.0)) / (pesos @ validos)
+    rma[validos.sum(axis=0) < n] = np.nan
+    return rma
+
+
+@indicador('rsi', lambda n: [nodo('ganancia'), nodo('perdida')])
+def _rsi(ganancia, perdida, n):
+    prom_g = _rma(ganancia, n)
+    prom_p = np.abs(_rma(perdida, n))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 * prom_g / (prom_g + prom_p)
+
+
+@indicador('rsi_final', lambda n: [nodo('ganancia'), nodo('perdida')])
+def _rsi_final(ganancia, perdida, n):
+    # Las columnas de screen solo usan el RSI de hoy: no hace falta la serie entera
+    prom_g = _rma_final(ganancia, n)
+    prom_p = np.abs(_rma_final(perdida, n))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 * prom_g / (prom_g + prom_p)
+
+
+@indicador('sma', lambda n: [nodo('matriz')])
+def _sma(m, n):
+    # Promedio móvil simple por diferencia de sumas acumuladas (NaN solo al principio de cada columna)
+    validos = ~np.isnan(m)
+    acum = np.cumsum(np.where(validos, m, 0.0), axis=0)
+    ventana = acum.copy()
+    ventana[n:] -= acum[:-n]
+    sma = ventana / n
+    cantidad = np.cumsum(validos, axis=0)
+    cantidad[n:] -= cantidad[:-n]
+    sma[cantidad < n] = np.nan
+    return sma
+
+
+@indicador('maximo', lambda n: [nodo('matriz')])
+def _maximo(m, n):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        return np.nanmax(m[-n:], axis=0)
+
+
+# --- COLUMNAS DE SCREEN ---
+@indicador('rsi_ultimo', lambda n: [nodo('rsi_final', n=n)])
+def _rsi_ultimo(rsi, n):
+    return rsi
+
+
+@indicador('caida', lambda n: [nodo('ultimo'), nodo('maximo', n=n)])
+def _caida(ultimo, maximo, n):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(maximo > 0, ultimo / maximo - 1, 0.0)
+
+
+@indicador('var_ayer', lambda: [nodo('ultimo'), nodo('anterior')])
+def _var_ayer(ultimo, anterior):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(anterior > 0, ultimo / anterior - 1, 0.0)
+
+
+@indicador('consenso_rsi', lambda desde, hasta, umbral: [nodo('rsi_final', n=n) for n in range(desde, hasta + 1)])
+def _consenso_rsi(*rsis, desde, hasta, umbral):
+    with np.errstate(invalid='ignore'):
+        return np.mean([r < umbral for r in rsis], axis=0)
+
+
+@indicador('sma_ultimo', lambda n: [nodo('sma', n=n)])
+def _sma_ultimo(sma, n):
+    return np.nan_to_num(sma[-1])
+
+
+@indicador('dias_bajo_sma', lambda n: [nodo('matriz'), nodo('sma', n=n)])
+def _dias_bajo_sma(m, sma, n):
+    # Racha desde hoy hacia atrás de cierres por debajo de la SMA (se corta en el primer día arriba)
+    with np.errstate(invalid='ignore'):
+        bajo = (m < sma).astype(np.int64)
+    return np.cumprod(bajo[::-1], axis=0).sum(axis=0)
+
+
+# Columnas de screen -> nodo que las calcula
+COLUMNAS = {
+    'Precio': nodo('ultimo'),
+    'RSI': nodo('rsi_ultimo', n=14),
+    'RSI_14': nodo('rsi_ultimo', n=14),
+    'Caida_30d': nodo('caida', n=30),
+    'Caida_5d': nodo('caida', n=5),
+    'Var_Ayer': nodo('var_ayer'),
+    'Consenso_RSI': nodo('consenso_rsi', desde=2, hasta=8, umbral=30),
+    'SMA_70': nodo('sma_ultimo', n=70),
+    'Dias_Bajo_SMA': nodo('dias_bajo_sma', n=70),
+    # Sobre velas intradiarias (intradia.py); n=0 toma el máximo de todas las velas
+    'RSI_Intradia': nodo('rsi_ultimo', n=14),
+    'Caida_Intradia': nodo('caida', n=0),
+}
+
+
+# --- EJECUTOR ---
+def _empaquetar(valores):
+    vacios = np.isnan(valores)
+    orden = np.argsort(~vacios, axis=0, kind='stable')
+    return np.take_along_axis(valores, orden, axis=0)
+
+
+def _contexto(df_precios, version):
+    if version is not None and version in _CONTEXTOS:
+        _CONTEXTOS.move_to_end(version)
+        return _CONTEXTOS[version]
+    valores = df_precios.to_numpy(dtype=float, na_value=np.nan)
+    ctx = {'tickers': np.asarray(df_precios.columns), 'resultados': {nodo('matriz'): _empaquetar(valores)}}
+    if version is not None:
+        _CONTEXTOS[version] = ctx
+        if len(_CONTEXTOS) > _CONTEXTOS_MAX: _CONTEXTOS.popitem(last=False)
+    return ctx
+
+
+def resolver(ctx, clave):
+    """Evalúa un nodo resolviendo antes sus dependencias; cada nodo se calcula una sola vez por contexto."""
+    resultados = ctx['resultados']
+    if clave in resultados: return resultados[clave]
+    nombre, params = clave
+    func, entradas = _REGISTRO[nombre]
+    kwargs = dict(params)
+    valores = [resolver(ctx, dep) for dep in entradas(**kwargs)]
+    resultados[clave] = func(*valores, **kwargs)
+    return resultados[clave]
+
+
+def evaluar(df_precios, columnas, min_datos=1, version=None):
+    """
+    Devuelve un DataFrame (índice Ticker) con solo las columnas pedidas, para los tickers con
+    al menos min_datos precios válidos. Con version, los intermedios se reutilizan entre screens.
+    """
+    if df_precios.empty: return pd.DataFrame()
+    with tracing.span('calc.pipeline', f"{df_precios.shape[1]} tickers"):
+        return _evaluar(df_precios, columnas, min_datos, version)
+
+
+def _evaluar(df_precios, columnas, min_datos, version):
+    ctx = _contexto(df_precios, version)
+    mascara = resolver(ctx, nodo('validos')) >= min_datos
+    datos = {col: resolver(ctx, COLUMNAS[col])[mascara] for col in columnas}
+    return pd.DataFrame(datos, index=pd.Index(ctx['tickers'][mascara], name='Ticker'))
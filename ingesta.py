@@ -0,0 +1,303 @@
+"""
+Ingesta del histórico de cierres diarios (reemplaza al bot de Yahoo de la VM):
+
+    python ingesta.py                                   # Historial_Yahoo, solo los días que faltan
+    python ingesta.py --hoja Historial_Cedears_Ext --yahoo --sheets
+    python ingesta.py --tickers GGAL.BA,AL30.BA --backfill-dias 3650
+
+Por cada ticker se pide a IOL (seriehistorica) solo el tramo entre su último cierre guardado y
+ayer: un ticker al día no cuesta ningún pedido y uno atrasado cuesta uno (más reintentos ante
+429/5xx). Los tickers sin sufijo .BA o sin datos en IOL pueden ir a Yahoo con --yahoo (salvo
+los bonos de BONOS_SKIP_YAHOO, que Yahoo cotiza mal). La primera corrida parte del histórico
+que ya está en Sheets. El resultado se publica en DIR_INGESTA (matriz float32 de price_matrix)
+y con --sheets se sincroniza la pestaña en lotes: fechas nuevas, columnas completas de los
+tickers nuevos y celdas corregidas. Cada corrida termina con la
+pasada de calidad de calidad.py (ticks erróneos y splits -> tabla de ajustes aplicada al leer).
+"""
+import argparse
+import concurrent.futures
+import random
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import requests
+
+import calidad
+import data_client
+import database
+import price_matrix
+import tracing
+from price_matrix import MatrizPrecios
+
+try:
+    from config import DIR_INGESTA, INGESTA_BACKFILL_DIAS, INGESTA_WORKERS, INGESTA_LOTE_SHEETS, TICKERS
+except ImportError:
+    DIR_INGESTA, INGESTA_BACKFILL_DIAS, INGESTA_WORKERS, INGESTA_LOTE_SHEETS, TICKERS = '.historial', 3650, 8, 500, []
+
+REINTENTOS = 4
+
+
+# --- FUENTES ---
+def _simbolo_iol(ticker):
+    return ticker.upper().replace('.BA', '')
+
+
+def serie_iol(ticker, desde, hasta, token, ajustada='sinAjustar'):
+    """Cierres diarios [desde, hasta] de IOL como Series (índice fecha). Lanza si IOL falla tras los reintentos."""
+    url = (f"{data_client.IOL_BASE_URL}/api/v2/bCBA/Titulos/{_simbolo_iol(ticker)}/Cotizacion/"
+           f"seriehistorica/{desde:%Y-%m-%d}/{hasta:%Y-%m-%d}/{ajustada}")
+    valor = token.obtener()
+    for intento in range(REINTENTOS + 1):
+        with tracing.span('ingesta.iol', ticker):
+            r = requests.get(url, headers={"Authorization": f"Bearer {valor}"}, timeout=15)
+        if r.status_code == 401 and intento < REINTENTOS:
+            valor = token.obtener(vencido=valor)
+            continue
+        if (r.status_code == 429 or r.status_code >= 500) and intento < REINTENTOS:
+            # Con jitter: si no, todos los hilos que recibieron 429 vuelven a pegar a la vez
+            espera = max(float(r.headers.get('Retry-After') or 0), 2 ** intento) * (1 + random.random())
+            time.sleep(min(espera, 30))
+            continue
+        r.raise_for_status()
+        break
+
+    filas = r.json() or []
+    if not filas: return pd.Series(dtype=float)
+    df = pd.DataFrame(filas)
+    fechas = pd.to_datetime(df['fechaHora'], errors='coerce', format='mixed')
+    serie = pd.Series(pd.to_numeric(df['ultimoPrecio'], errors='coerce').to_numpy(), index=fechas)
+    serie = serie[serie.index.notna() & (serie > 0)].sort_index()
+    # Puede haber más de un registro por día: queda el último
+    serie.index = serie.index.normalize().rename(None)
+    return serie[~serie.index.duplicated(keep='last')]
+
+
+def serie_yahoo(ticker, desde, hasta):
+    """Respaldo opcional (import diferido: yfinance no está en el camino de la app)."""
+    import yfinance as yf
+    with tracing.span('ingesta.yahoo', ticker):
+        df = yf.download(ticker, start=desde, end=hasta + timedelta(days=1), progress=False, auto_adjust=False)
+    if df is None or df.empty: return pd.Series(dtype=float)
+    cierre = df['Close']
+    if isinstance(cierre, pd.DataFrame): cierre = cierre.iloc[:, 0]
+    cierre.index = pd.DatetimeIndex(cierre.index).tz_localize(None).normalize()
+    return cierre.dropna().astype(float)
+
+
+# --- PLAN INCREMENTAL ---
+def ultimos_cierres(matriz):
+    """Fecha del último precio válido por ticker (NaT si no tiene ninguno)."""
+    if matriz is None or matriz.empty: return {}
+    valores = np.asarray(matriz.valores)
+    validos = ~np.isnan(valores)
+    ultima_fila = len(valores) - 1 - np.argmax(validos[::-1], axis=0)
+    return {t: (matriz.fechas[f] if validos[:, i].any() else pd.NaT)
+            for i, (t, f) in enumerate(zip(matriz.tickers, ultima_fila))}
+
+
+def planificar(tickers, ultimos, hasta, backfill_dias):
+    """Devuelve {ticker: desde} solo para los tickers a los que les faltan días hábiles hasta 'hasta'."""
+    plan = {}
+    inicio = hasta - timedelta(days=backfill_dias)
+    for t in tickers:
+        ultimo = ultimos.get(t, pd.NaT)
+        desde = inicio if pd.isna(ultimo) else ultimo + pd.Timedelta(days=1)
+        if len(pd.bdate_range(desde, hasta)): plan[t] = desde
+    return plan
+
+
+def _descargar(ticker, desde, hasta, token, con_yahoo):
+    """(ticker, serie, fuente, error)."""
+    es_iol = ticker.upper().endswith('.BA')
+    error = "IOL: sin token" if es_iol and not token.valor else None
+    if es_iol and token.valor:
+        try:
+            serie = serie_iol(ticker, desde, hasta, token)
+            if not serie.empty: return ticker, serie, 'iol', None
+        except Exception as e: error = f"IOL: {e}"
+    if con_yahoo and ticker not in data_client.BONOS_SKIP_YAHOO:
+        try:
+            serie = serie_yahoo(ticker, desde, hasta)
+            if not serie.empty: return ticker, serie, 'yahoo', None
+        except Exception as e: error = f"{error + ' / ' if error else ''}Yahoo: {e}"
+    return ticker, pd.Series(dtype=float), None, error
+
+
+# --- CORRIDA ---
+def base_inicial(hoja, directorio=None):
+    """Lo ya ingerido; en la primera corrida, el histórico que hoy está en Sheets."""
+    matriz, _ = price_matrix.abrir(hoja, directorio or DIR_INGESTA)
+    if matriz is not None: return matriz
+    return MatrizPrecios.desde_frame(database._leer_historial_sheets(hoja))
+
+
+def actualizar(hoja='Historial_Yahoo', tickers=None, hasta=None, con_yahoo=False, backfill_dias=None,
+               max_workers=None, directorio=None, revisar=True):
+    """
+    Trae los días que faltan por ticker, los une a lo guardado y publica la nueva generación.
+    Con revisar, al final corre la pasada de calidad (calidad.sincronizar) sobre la matriz completa.
+    Devuelve (matriz, nuevas, stats) donde nuevas es un DataFrame con solo los valores traídos.
+    """
+    directorio = directorio or DIR_INGESTA
+    hasta = pd.Timestamp(hasta or datetime.now() - timedelta(days=1)).normalize()
+    base = base_inicial(hoja, directorio)
+    tickers = list(dict.fromkeys(tickers or (list(base.tickers) + (TICKERS if hoja == 'Historial_Yahoo' else []))))
+
+    plan = planificar(tickers, ultimos_cierres(base), hasta, backfill_dias or INGESTA_BACKFILL_DIAS)
+    stats = {'tickers': len(tickers), 'al_dia': len(tickers) - len(plan), 'pendientes': len(plan),
+             'iol': 0, 'yahoo': 0, 'sin_datos': 0, 'errores': {}}
+    token = data_client._TOKEN
+    if any(t.upper().endswith('.BA') for t in plan): token.obtener()
+
+    series = {}
+    t0 = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or INGESTA_WORKERS) as executor:
+        futures = [executor.submit(_descargar, t, desde, hasta, token, con_yahoo) for t, desde in plan.items()]
+        for future in concurrent.futures.as_completed(futures):
+            ticker, serie, fuente, error = future.result()
+            if fuente: serie = serie[serie.index <= hasta]
+            if fuente and not serie.empty:
+                series[ticker] = serie
+                stats[fuente] += 1
+            else:
+                stats['sin_datos'] += 1
+                if error: stats['errores'][ticker] = error[:200]
+    stats['descarga_s'] = round(time.perf_counter() - t0, 3)
+
+    nuevas = pd.DataFrame(series).sort_index() if series else pd.DataFrame()
+    if nuevas.empty:
+        stats['filas_nuevas'] = 0
+        if revisar: _revisar(hoja, base, token, directorio, stats)
+        return base, nuevas, stats
+
+    # Lo traído pisa a lo guardado en las mismas fechas (correcciones de la fuente)
+    df = nuevas.combine_first(base.a_frame()) if not base.empty else nuevas
+    matriz = MatrizPrecios.desde_frame(df.sort_index())
+    stats['filas_nuevas'] = int(len(nuevas.index.difference(base.fechas))) if not base.empty else len(nuevas)
+    try:
+        matriz = price_matrix.publicar(matriz, hoja, directorio)
+    except OSError as e:
+        print(f"WARN: no se pudo publicar '{hoja}' en {directorio}: {e}")
+    if revisar: _revisar(hoja, matriz, token, directorio, stats)
+    return matriz, nuevas, stats
+
+
+def _revisar(hoja, matriz, token, directorio, stats):
+    t0 = time.perf_counter()
+    try:
+        _, stats['eventos_calidad'] = calidad.sincronizar(hoja, matriz, token, directorio)
+    except OSError as e:
+        print(f"WARN: no se pudo guardar la tabla de ajustes de '{hoja}': {e}")
+    stats['calidad_s'] = round(time.perf_counter() - t0, 3)
+
+
+# --- ESCRITURA EN SHEETS ---
+def _celda(v):
+    # float32 guarda ~7 dígitos significativos: se escriben esos y no el residuo binario
+    return '' if pd.isna(v) else float(f"{v:.7g}")
+
+
+def _numeros_hoja(cuerpo, ancho):
+    """Celdas de precios de la pestaña como float (mismo criterio que database: vacío o 0 = NaN)."""
+    if not cuerpo or not ancho: return np.full((len(cuerpo), ancho), np.nan)
+    texto = pd.DataFrame([fila[1:ancho + 1] for fila in cuerpo]).reindex(columns=range(ancho)).fillna('')
+    num = texto.apply(pd.to_numeric, errors='coerce')
+    # Formatos con miles / coma decimal (lo que escribía el bot viejo): solo esas celdas van por _clean_number_str
+    raras = num.isna() & texto.ne('')
+    if raras.to_numpy().any(): num = num.mask(raras, texto.where(raras).map(database._clean_number_str, na_action='ignore'))
+    valores = num.to_numpy(dtype=float, copy=True)
+    valores[valores == 0] = np.nan
+    return valores
+
+
+def _rangos_columna(filas, col, valores):
+    """Tramos de filas consecutivas de una columna -> [{'range', 'values'}] (filas/col de la hoja, base 1)."""
+    from gspread.utils import rowcol_to_a1
+    cortes = np.flatnonzero(np.diff(filas) != 1) + 1
+    return [{'range': f"{rowcol_to_a1(int(t[0]), col)}:{rowcol_to_a1(int(t[-1]), col)}", 'values': [[v] for v in vals]}
+            for t, vals in zip(np.split(filas, cortes), np.split(np.asarray(valores, dtype=object), cortes))]
+
+
+def escribir_sheets(hoja, matriz, lote=None):
+    """
+    Sincroniza la pestaña (Date + una columna por ticker) con la matriz:
+    - tickers nuevos: se suman al encabezado y su columna se escribe sobre todas las fechas que
+      ya tiene la pestaña (un rango por columna);
+    - celdas existentes que la fuente corrigió o que estaban vacías: batch_update por tramos;
+    - fechas que la pestaña no tiene: append_rows.
+    Todo por lotes de `lote`. Devuelve (filas agregadas, celdas actualizadas).
+    """
+    from gspread.utils import rowcol_to_a1
+    lote = lote or INGESTA_LOTE_SHEETS
+    ws = database._get_connection().worksheet(hoja)
+    valores = ws.get_all_values()
+    encabezado = [str(h).strip() for h in valores[0]] if valores and any(valores[0]) else ['Date']
+    cuerpo = valores[1:]
+    fechas_hoja = pd.DatetimeIndex(pd.to_datetime([fila[0] if fila else '' for fila in cuerpo], errors='coerce')).normalize()
+    previas = len(encabezado) - 1
+
+    faltantes = [t for t in matriz.tickers if t not in encabezado]
+    if faltantes:
+        if hasattr(ws, 'col_count') and ws.col_count < len(encabezado) + len(faltantes):
+            ws.add_cols(len(encabezado) + len(faltantes) - ws.col_count)
+        ws.batch_update([{'range': f"{rowcol_to_a1(1, len(encabezado) + 1)}:{rowcol_to_a1(1, len(encabezado) + len(faltantes))}",
+                          'values': [faltantes]}])
+        encabezado += faltantes
+    df = matriz.a_frame().reindex(columns=encabezado[1:])
+
+    # Filas que ya están: la matriz en la fecha de cada fila contra lo que dice la hoja
+    rangos, celdas = [], 0
+    if cuerpo:
+        nuevo = df.reindex(fechas_hoja).to_numpy(dtype=float)
+        if faltantes:
+            bloque = [[_celda(v) for v in fila] for fila in nuevo[:, previas:]]
+            rangos.append({'range': f"{rowcol_to_a1(2, previas + 2)}:{rowcol_to_a1(len(cuerpo) + 1, len(encabezado))}",
+                           'values': bloque})
+            celdas += int(np.isfinite(nuevo[:, previas:]).sum())
+        actual = _numeros_hoja(cuerpo, previas)
+        with np.errstate(invalid='ignore'):
+            distinto = np.isfinite(nuevo[:, :previas]) & ~np.isclose(actual, nuevo[:, :previas], rtol=1e-6, atol=0)
+        for j in np.flatnonzero(distinto.any(axis=0)):
+            filas = np.flatnonzero(distinto[:, j])
+            rangos += _rangos_columna(filas + 2, j + 2, [_celda(v) for v in nuevo[filas, j]])
+            celdas += len(filas)
+    for i in range(0, len(rangos), lote):
+        with tracing.span('ingesta.sheets', hoja):
+            ws.batch_update(rangos[i:i + lote], value_input_option='RAW')
+
+    nuevas = df[~df.index.isin(fechas_hoja)]
+    filas = [[f"{fecha:%Y-%m-%d}"] + [_celda(v) for v in vals] for fecha, vals in zip(nuevas.index, nuevas.to_numpy())]
+    for i in range(0, len(filas), lote):
+        with tracing.span('ingesta.sheets', hoja):
+            ws.append_rows(filas[i:i + lote], value_input_option='RAW')
+    if filas or rangos: database.invalidar_historial(hoja)
+    return len(filas), celdas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingesta incremental del histórico de cierres (IOL, Yahoo opcional).")
+    parser.add_argument('--hoja', default='Historial_Yahoo', help="Pestaña / nombre del histórico")
+    parser.add_argument('--tickers', default=None, help="Lista separada por comas (por defecto: los ya guardados + config.TICKERS)")
+    parser.add_argument('--hasta', default=None, help="Última fecha a traer (YYYY-MM-DD, por defecto ayer)")
+    parser.add_argument('--backfill-dias', type=int, default=None, help="Días hacia atrás para tickers sin historia")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--yahoo', action='store_true', help="Usar Yahoo como respaldo")
+    parser.add_argument('--sheets', action='store_true', help="Sincronizar además la pestaña de Sheets (fechas, tickers nuevos y correcciones)")
+    parser.add_argument('--sin-calidad', action='store_true', help="No correr la pasada de calidad (calidad.py)")
+    args = parser.parse_args(argv)
+
+    tickers = [t.strip().upper() for t in args.tickers.split(',') if t.strip()] if args.tickers else None
+    matriz, nuevas, stats = actualizar(args.hoja, tickers, args.hasta, args.yahoo, args.backfill_dias, args.workers,
+                                       revisar=not args.sin_calidad)
+    if args.sheets: stats['filas_sheets'], stats['celdas_sheets'] = escribir_sheets(args.hoja, matriz)
+
+    print(f"{args.hoja}: {matriz.shape[0]} fechas x {matriz.shape[1]} tickers")
+    for clave, valor in stats.items():
+        if clave != 'errores': print(f"  {clave}: {valor}")
+    for ticker, error in stats['errores'].items(): print(f"  ! {ticker}: {error}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
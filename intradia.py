@@ -0,0 +1,284 @@
+"""
+Diario intradiario de cotizaciones de IOL y velas OHLC de 1 / 5 minutos.
+
+Cada cotización que trae data_client (ticker, hora, precio, volumen nominal) se anota en un
+diario append-only por día: DIR_INTRADIA/AAAAMMDD.bin, registros binarios de 32 bytes que se
+agregan con un solo write por tanda. Cada proceso lee solo la cola nueva del archivo del día y
+la vuelca en un agregador en anillo (INTRADIA_RETENCION_MIN velas de 1 minuto por ticker), así
+que lo que anota una sesión lo ven todas y la memoria no crece con el día. Las velas de 5 minutos
+se arman al pedirlas a partir de las de 1. Los archivos de más de INTRADIA_DIAS días se borran.
+
+    python intradia.py --ticker GGAL.BA --minutos 5     # velas de hoy desde el diario
+"""
+import argparse
+import os
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import indicators
+import tracing
+
+try:
+    from config import DIR_INTRADIA, INTRADIA_RETENCION_MIN, INTRADIA_DIAS
+except ImportError:
+    DIR_INTRADIA, INTRADIA_RETENCION_MIN, INTRADIA_DIAS = '.intradia', 600, 5
+
+# Hora local naive en ns (como datetime.now() en el resto de la app)
+REGISTRO = np.dtype([('ts', '<i8'), ('ticker', 'S12'), ('precio', '<f8'), ('volumen', '<f4')])
+NS_MINUTO = 60 * 10**9
+
+# Columnas intradiarias del screener (indicators.COLUMNAS) sobre las velas del día
+COLS_INTRADIA = ['RSI_Intradia', 'Caida_Intradia']
+
+
+def _ruta(dia, directorio=None):
+    return os.path.join(directorio or DIR_INTRADIA, f"{dia:%Y%m%d}.bin")
+
+
+def _dia_de(ts):
+    return pd.Timestamp(ts).normalize()
+
+
+# --- DIARIO (escritura) ---
+class Diario:
+    """Acumula cotizaciones en memoria y las agrega al archivo del día con volcar()."""
+    def __init__(self, directorio=None):
+        self.directorio = directorio
+        self.lock = threading.Lock()
+        self._pendientes = []
+
+    def anotar(self, ticker, precio, volumen=None, ts=None):
+        if precio is None or not precio > 0: return
+        ts = pd.Timestamp.now().value if ts is None else int(pd.Timestamp(ts).value)
+        volumen = np.nan if volumen is None else float(volumen)
+        with self.lock: self._pendientes.append((ts, str(ticker).encode()[:12], float(precio), volumen))
+
+    def volcar(self):
+        """Escribe lo pendiente (un write por día) y devuelve la cantidad de registros."""
+        with self.lock: pendientes, self._pendientes = self._pendientes, []
+        if not pendientes: return 0
+        registros = np.array(pendientes, dtype=REGISTRO)
+        dias = registros['ts'] // (86400 * 10**9)
+        directorio = self.directorio or DIR_INTRADIA
+        try:
+            os.makedirs(directorio, exist_ok=True)
+            for dia in np.unique(dias):
+                ruta = _ruta(pd.Timestamp(int(dia) * 86400 * 10**9), directorio)
+                nuevo = not os.path.exists(ruta)
+                with open(ruta, 'ab') as f: f.write(registros[dias == dia].tobytes())
+                if nuevo: rotar(directorio)
+        except OSError as e:
+            print(f"WARN: no se pudo escribir el diario intradiario: {e}")
+            return 0
+        return len(registros)
+
+
+def rotar(directorio=None, dias=None):
+    """Borra los archivos del diario más viejos que los últimos `dias` días."""
+    directorio = directorio or DIR_INTRADIA
+    archivos = sorted(a for a in os.listdir(directorio) if a.endswith('.bin') and a[:-4].isdigit())
+    for viejo in archivos[:-(dias or INTRADIA_DIAS)]:
+        try: os.remove(os.path.join(directorio, viejo))
+        except FileNotFoundError: pass
+
+
+def leer_dia(dia=None, directorio=None):
+    """Todos los registros de un día como array estructurado (REGISTRO)."""
+    dia = _dia_de(dia or datetime.now())
+    try: return np.fromfile(_ruta(dia, directorio), dtype=REGISTRO)
+    except (FileNotFoundError, ValueError): return np.empty(0, dtype=REGISTRO)
+
+
+# --- AGREGADOR EN ANILLO (velas de 1 minuto) ---
+class Barras:
+    """
+    Velas de 1 minuto por ticker en un anillo de `retencion` posiciones (posición = minuto % retencion).
+    Cada tanda de registros se agrupa de una vez (ticker, minuto) y se funde con lo que ya hay.
+    El volumen guardado es el acumulado del día al cierre de la vela; el de la vela sale de la diferencia.
+    """
+    def __init__(self, retencion=None):
+        self.retencion = retencion or INTRADIA_RETENCION_MIN
+        self.indice = {}
+        self.minuto = np.full((0, self.retencion), -1, dtype=np.int64)
+        self.ohlc = np.full((0, self.retencion, 4), np.nan)
+        self.volumen = np.full((0, self.retencion), np.nan, dtype=np.float32)
+        self.ts = np.zeros((0, self.retencion), dtype=np.int64)
+
+    def _filas(self, tickers):
+        for t in tickers:
+            if t not in self.indice: self.indice[t] = len(self.indice)
+        faltan = len(self.indice) - len(self.minuto)
+        if faltan > 0:
+            extra = max(faltan, len(self.minuto))  # Crece al doble: pocas realocaciones
+            self.minuto = np.concatenate([self.minuto, np.full((extra, self.retencion), -1, dtype=np.int64)])
+            self.ohlc = np.concatenate([self.ohlc, np.full((extra, self.retencion, 4), np.nan)])
+            self.volumen = np.concatenate([self.volumen, np.full((extra, self.retencion), np.nan, dtype=np.float32)])
+            self.ts = np.concatenate([self.ts, np.zeros((extra, self.retencion), dtype=np.int64)])
+        return np.array([self.indice[t] for t in tickers], dtype=np.int64)
+
+    def agregar(self, registros):
+        registros = registros[registros['precio'] > 0]
+        if not len(registros): return 0
+        # Orden (ticker, minuto, ts) y un grupo por vela: agregados con reduceat, sin groupby
+        tickers, inv = np.unique(registros['ticker'], return_inverse=True)
+        ts, minuto = registros['ts'], registros['ts'] // NS_MINUTO
+        orden = np.lexsort((ts, minuto, inv))
+        inv, minuto, ts = inv[orden], minuto[orden], ts[orden]
+        precio, volumen = registros['precio'][orden], registros['volumen'][orden]
+        ini = np.flatnonzero(np.r_[True, (inv[1:] != inv[:-1]) | (minuto[1:] != minuto[:-1])])
+        fin = np.r_[ini[1:], len(inv)] - 1
+        nuevo = np.column_stack([precio[ini], np.maximum.reduceat(precio, ini), np.minimum.reduceat(precio, ini), precio[fin]])
+        vol = np.fmax.reduceat(volumen, ini)  # Acumulado del día: el máximo es el último informado
+        ts, minutos, grupo = ts[fin], minuto[ini], inv[ini]
+
+        # Solo las últimas `retencion` velas de cada ticker (dos minutos no pueden compartir posición)
+        ultimo = np.full(len(tickers), -1, dtype=np.int64)
+        np.maximum.at(ultimo, grupo, minutos)
+        recientes = minutos > ultimo[grupo] - self.retencion
+        nuevo, vol, ts, minutos, grupo = nuevo[recientes], vol[recientes], ts[recientes], minutos[recientes], grupo[recientes]
+
+        filas = self._filas(list(np.char.decode(tickers)))[grupo]
+        pos = minutos % self.retencion
+        actual = self.minuto[filas, pos]
+        vigente = actual <= minutos  # Una vela más nueva en la posición manda
+        filas, pos, minutos, mismo = filas[vigente], pos[vigente], minutos[vigente], (actual == minutos)[vigente]
+        nuevo, ts, vol = nuevo[vigente], ts[vigente], vol[vigente]
+
+        previo, ts_previo = self.ohlc[filas, pos], self.ts[filas, pos]
+        tarde = mismo & (ts_previo > ts)  # Registros de otro proceso que llegan fuera de orden
+        self.ohlc[filas, pos] = np.column_stack([
+            np.where(mismo, previo[:, 0], nuevo[:, 0]),
+            np.where(mismo, np.fmax(previo[:, 1], nuevo[:, 1]), nuevo[:, 1]),
+            np.where(mismo, np.fmin(previo[:, 2], nuevo[:, 2]), nuevo[:, 2]),
+            np.where(tarde, previo[:, 3], nuevo[:, 3]),
+        ])
+        self.volumen[filas, pos] = np.where(tarde | (mismo & np.isnan(vol)), self.volumen[filas, pos], vol)
+        self.ts[filas, pos] = np.where(tarde, ts_previo, ts)
+        self.minuto[filas, pos] = minutos
+        return len(filas)
+
+    def _largo(self, tickers, desde=None):
+        """Velas de 1 minuto de los tickers como DataFrame largo ordenado (ticker, minuto)."""
+        tickers = [t for t in tickers if t in self.indice]
+        if not tickers: return pd.DataFrame(columns=['ticker', 'minuto', 'o', 'h', 'l', 'c', 'v'])
+        filas = np.array([self.indice[t] for t in tickers])
+        minuto = self.minuto[filas]
+        validas = minuto >= (-1 if desde is None else pd.Timestamp(desde).value // NS_MINUTO)
+        validas &= minuto >= 0
+        i, j = np.nonzero(validas)
+        ohlc = self.ohlc[filas[i], j]
+        df = pd.DataFrame({'ticker': np.asarray(tickers)[i], 'minuto': minuto[i, j],
+                           'o': ohlc[:, 0], 'h': ohlc[:, 1], 'l': ohlc[:, 2], 'c': ohlc[:, 3],
+                           'v': self.volumen[filas[i], j]})
+        return df.sort_values(['ticker', 'minuto'], kind='stable')
+
+    def velas(self, ticker, minutos=1, desde=None):
+        """OHLC + volumen de un ticker en velas de `minutos` (índice: hora de apertura de la vela)."""
+        df = self._largo([ticker], desde)
+        if df.empty: return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volumen'])
+        df['vela'] = df['minuto'] // minutos * minutos
+        velas = df.groupby('vela').agg(Open=('o', 'first'), High=('h', 'max'), Low=('l', 'min'),
+                                       Close=('c', 'last'), Acumulado=('v', 'last'))
+        # El volumen nominal de IOL es acumulado del día: el de cada vela es la diferencia
+        volumen = velas['Acumulado'].diff()
+        velas['Volumen'] = volumen.where(volumen >= 0, velas['Acumulado'])
+        velas.index = pd.to_datetime(velas.index.to_numpy() * NS_MINUTO)
+        return velas.drop(columns='Acumulado')
+
+    def cierres(self, tickers, minutos=1, desde=None):
+        """Matriz de cierres (índice hora de la vela, una columna por ticker con velas) para los indicadores."""
+        tickers = [t for t in tickers if t in self.indice]
+        if not tickers: return pd.DataFrame()
+        filas = np.array([self.indice[t] for t in tickers])
+        minuto = self.minuto[filas]
+        i, j = np.nonzero(minuto >= (0 if desde is None else pd.Timestamp(desde).value // NS_MINUTO))
+        if not len(i): return pd.DataFrame()
+        # El cierre de cada vela es el de su último minuto: orden (ticker, vela, minuto) y el último de cada grupo
+        m = minuto[i, j]
+        vela = m // minutos * minutos
+        orden = np.lexsort((m, vela, i))
+        i, j, vela = i[orden], j[orden], vela[orden]
+        ultimo = np.r_[(i[1:] != i[:-1]) | (vela[1:] != vela[:-1]), True]
+        i, j, vela = i[ultimo], j[ultimo], vela[ultimo]
+        velas, fila = np.unique(vela, return_inverse=True)
+        columnas, col = np.unique(i, return_inverse=True)
+        valores = np.full((len(velas), len(columnas)), np.nan)
+        valores[fila, col] = self.ohlc[filas[i], j, 3]
+        return pd.DataFrame(valores, index=pd.to_datetime(velas * NS_MINUTO), columns=np.asarray(tickers)[columnas])
+
+
+# --- LECTOR DE LA COLA DEL DIARIO (por proceso) ---
+class _Lector:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.barras = Barras()
+        self.dia, self.offset = None, 0
+
+    def actualizar(self, directorio=None):
+        """Pasa al agregador los registros agregados al archivo de hoy desde la última lectura."""
+        hoy = _dia_de(datetime.now())
+        with self.lock:
+            if hoy != self.dia: self.dia, self.offset = hoy, 0
+            ruta = _ruta(hoy, directorio)
+            try: tamano = os.path.getsize(ruta)
+            except OSError: return 0
+            n = (tamano - self.offset) // REGISTRO.itemsize
+            if n <= 0: return 0
+            registros = np.fromfile(ruta, dtype=REGISTRO, count=n, offset=self.offset)
+            self.offset += n * REGISTRO.itemsize
+            with tracing.span('intradia.agregar', f"{n} registros"):
+                self.barras.agregar(registros)
+            return n
+
+
+DIARIO = Diario()
+_LECTOR = _Lector()
+
+
+def velas(ticker, minutos=1, desde=None):
+    _LECTOR.actualizar()
+    with _LECTOR.lock: return _LECTOR.barras.velas(ticker, minutos, desde)
+
+
+def cierres(tickers, minutos=1, desde=None):
+    _LECTOR.actualizar()
+    with _LECTOR.lock: return _LECTOR.barras.cierres(tickers, minutos, desde)
+
+
+def indicadores(tickers, minutos=5, barras=None, hoy=None):
+    """
+    RSI_Intradia y Caida_Intradia del día (velas de `minutos`); tickers con menos de 15 velas quedan
+    afuera. Por defecto usa las velas del diario; replay.py pasa su propio agregador y día.
+    """
+    desde = pd.Timestamp(hoy or datetime.now()).normalize()
+    df = barras.cierres(list(tickers), minutos, desde) if barras is not None else cierres(list(tickers), minutos, desde)
+    if df.empty: return pd.DataFrame(columns=COLS_INTRADIA)
+    return indicators.evaluar(df, COLS_INTRADIA, min_datos=15)
+
+
+def agregar_indicadores(df_screener, minutos=5, barras=None, hoy=None):
+    """Suma al screener (índice Ticker) las columnas intradiarias; sin velas suficientes quedan vacías."""
+    if df_screener.empty: return df_screener
+    try: intradia = indicadores(df_screener.index, minutos, barras, hoy)
+    except Exception as e:
+        # Un diario ilegible no debe dejar sin screener diario
+        print(f"WARN: indicadores intradiarios: {e}")
+        return df_screener
+    return df_screener.join(intradia, how='left')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Velas intradiarias desde el diario de cotizaciones.")
+    parser.add_argument('--ticker', required=True)
+    parser.add_argument('--minutos', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    registros = leer_dia()
+    print(f"{len(registros)} registros hoy ({REGISTRO.itemsize} bytes c/u)")
+    print(velas(args.ticker.upper(), args.minutos).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,268 @@
+"""
+Servidor local que imita la API de IOL (para pruebas de carga sin tocar el broker):
+
+    python iol_simulado.py --puerto 8765 --latencia-ms 80 --jitter-ms 40 --rps 20 --token-ttl 60 --prob-error 0.02
+    IOL_BASE_URL=http://127.0.0.1:8765 streamlit run home.py
+
+Endpoints:
+    POST /token                                                         (password o refresh_token)
+    GET  /api/v2/{mercado}/Titulos/{simbolo}/Cotizacion
+    GET  /api/v2/{mercado}/Titulos/{simbolo}/Cotizacion/seriehistorica/{desde}/{hasta}/{ajustada}
+    GET  /_stats                                                        (contadores del simulador)
+
+Los precios son deterministas: cada símbolo tiene su caminata diaria (semilla = crc32 del símbolo)
+y la cotización intradía oscila alrededor del último cierre según el minuto. Las fallas se
+inyectan con un generador con semilla propia: latencia fija + jitter, límite de pedidos por
+segundo (429 con Retry-After), vencimiento de tokens (401) y errores 500/503 aleatorios.
+"""
+import argparse
+import json
+import random
+import re
+import secrets
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import numpy as np
+import pandas as pd
+
+INICIO_SERIES = pd.Timestamp('2015-01-02')
+RE_COTIZACION = re.compile(r'^/api/v2/(\w+)/Titulos/([\w.]+)/Cotizacion/?$', re.IGNORECASE)
+RE_SERIE = re.compile(r'^/api/v2/(\w+)/Titulos/([\w.]+)/Cotizacion/seriehistorica/([\d-]+)/([\d-]+)/(\w+)/?$', re.IGNORECASE)
+
+
+# --- DATOS DETERMINISTAS ---
+_SERIES = {}
+_lock_series = threading.Lock()
+
+
+def serie_diaria(simbolo):
+    """Cierres en días hábiles desde INICIO_SERIES hasta hoy (cacheada por símbolo)."""
+    simbolo = simbolo.upper()
+    hoy = pd.Timestamp.now().normalize()
+    with _lock_series:
+        serie = _SERIES.get(simbolo)
+        if serie is not None and serie.index[-1] >= hoy - pd.offsets.BDay(): return serie
+
+    fechas = pd.bdate_range(INICIO_SERIES, hoy)
+    rng = np.random.default_rng(zlib.crc32(simbolo.encode()))
+    base = rng.uniform(50, 5000)
+    cierres = base * np.exp(np.cumsum(rng.normal(0.0004, 0.022, len(fechas))))
+    serie = pd.Series(cierres.round(2), index=fechas)
+    with _lock_series: _SERIES[simbolo] = serie
+    return serie
+
+
+def cotizacion(simbolo, ahora=None):
+    ahora = ahora or datetime.now()
+    serie = serie_diaria(simbolo)
+    cierre_anterior = float(serie.iloc[-2])
+    # Oscilación intradía determinista por (símbolo, minuto)
+    minuto = int(ahora.timestamp() // 60)
+    mov = np.random.default_rng(zlib.crc32(f"{simbolo.upper()}|{minuto}".encode())).normal(0, 0.01)
+    ultimo = round(float(serie.iloc[-1]) * (1 + mov), 2)
+    return {
+        'ultimoPrecio': ultimo,
+        'variacion': round((ultimo / cierre_anterior - 1) * 100, 2),
+        'apertura': cierre_anterior,
+        'maximo': round(max(ultimo, cierre_anterior) * 1.005, 2),
+        'minimo': round(min(ultimo, cierre_anterior) * 0.995, 2),
+        'cierreAnterior': cierre_anterior,
+        'volumenNominal': int(zlib.crc32(simbolo.encode()) % 100000) + minuto % 1000,
+        'fechaHora': ahora.isoformat(timespec='seconds'),
+        'moneda': 'peso_Argentino',
+    }
+
+
+def serie_historica(simbolo, desde, hasta):
+    """Filas como las de seriehistorica (más recientes primero)."""
+    serie = serie_diaria(simbolo)
+    tramo = serie.loc[pd.Timestamp(desde):pd.Timestamp(hasta)]
+    anteriores = serie.shift(1).loc[tramo.index].fillna(tramo)
+    return [{
+        'fechaHora': f"{fecha:%Y-%m-%d}T17:00:00",
+        'ultimoPrecio': float(cierre),
+        'apertura': float(previo),
+        'maximo': round(max(cierre, previo) * 1.01, 2),
+        'minimo': round(min(cierre, previo) * 0.99, 2),
+        'cierreAnterior': float(previo),
+        'variacion': round((cierre / previo - 1) * 100, 2),
+        'volumenNominal': int(zlib.crc32(f"{simbolo}{fecha:%Y%m%d}".encode()) % 100000),
+    } for fecha, cierre, previo in zip(tramo.index[::-1], tramo.values[::-1], anteriores.values[::-1])]
+
+
+# --- SIMULADOR (estado y fallas) ---
+class Simulador:
+    def __init__(self, latencia_ms=0, jitter_ms=0, rps=0, token_ttl=900, prob_error=0.0,
+                 prob_lento=0.0, lento_ms=5000, usuario=None, password=None, semilla=0):
+        self.latencia_ms, self.jitter_ms = latencia_ms, jitter_ms
+        self.rps, self.token_ttl = rps, token_ttl
+        self.prob_error, self.prob_lento, self.lento_ms = prob_error, prob_lento, lento_ms
+        self.usuario, self.password = usuario, password  # None = acepta cualquiera
+        self.rng = random.Random(semilla)
+        self.lock = threading.Lock()
+        self.tokens = {}      # access_token -> vence (epoch)
+        self.refresh = set()
+        self.ventana = []     # epochs de los pedidos del último segundo (límite de rps)
+        self.stats = {'pedidos': 0, 'ok': 0, '401': 0, '429': 0, '5xx': 0, 'lentos': 0, 'tokens': 0}
+
+    def _contar(self, clave):
+        with self.lock: self.stats[clave] += 1
+
+    def demora(self):
+        """Segundos a dormir antes de responder (latencia + jitter, o un pedido 'colgado')."""
+        with self.lock:
+            lento = self.rng.random() < self.prob_lento
+            ms = self.latencia_ms + self.rng.uniform(0, self.jitter_ms)
+        if lento:
+            self._contar('lentos')
+            ms = self.lento_ms
+        return ms / 1000
+
+    def limitar(self):
+        """True si el pedido supera el límite de pedidos por segundo."""
+        if not self.rps: return False
+        ahora = time.monotonic()
+        with self.lock:
+            self.ventana = [t for t in self.ventana if ahora - t < 1.0]
+            if len(self.ventana) >= self.rps: return True
+            self.ventana.append(ahora)
+        return False
+
+    def falla(self):
+        """Código 500/503 a devolver, o None si el pedido sigue."""
+        with self.lock:
+            if self.rng.random() >= self.prob_error: return None
+            return self.rng.choice([500, 503])
+
+    def emitir_token(self):
+        access, refresh = secrets.token_hex(16), secrets.token_hex(16)
+        with self.lock:
+            self.tokens[access] = time.time() + self.token_ttl
+            self.refresh.add(refresh)
+            self.stats['tokens'] += 1
+        ahora = datetime.now(timezone.utc)
+        return {'access_token': access, 'token_type': 'bearer', 'expires_in': self.token_ttl,
+                'refresh_token': refresh, '.issued': ahora.strftime('%a, %d %b %Y %H:%M:%S GMT'),
+                '.expires': (ahora + timedelta(seconds=self.token_ttl)).strftime('%a, %d %b %Y %H:%M:%S GMT')}
+
+    def token_valido(self, cabecera):
+        if not cabecera or not cabecera.startswith('Bearer '): return False
+        with self.lock: vence = self.tokens.get(cabecera[7:])
+        return vence is not None and vence > time.time()
+
+    def usar_refresh(self, refresh):
+        with self.lock:
+            if refresh not in self.refresh: return False
+            self.refresh.discard(refresh)
+            return True
+
+
+def _handler(sim):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args): pass
+
+        def _responder(self, codigo, cuerpo, cabeceras=None):
+            datos = json.dumps(cuerpo).encode()
+            self.send_response(codigo)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(datos)))
+            for k, v in (cabeceras or {}).items(): self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(datos)
+            if codigo == 200: sim._contar('ok')
+            elif codigo in (401, 429): sim._contar(str(codigo))
+            elif codigo >= 500: sim._contar('5xx')
+
+        def _previo(self):
+            """Latencia y fallas comunes; devuelve True si ya se respondió con error."""
+            sim._contar('pedidos')
+            time.sleep(sim.demora())
+            if sim.limitar():
+                self._responder(429, {'message': 'Too Many Requests'}, {'Retry-After': '1'})
+                return True
+            codigo = sim.falla()
+            if codigo:
+                self._responder(codigo, {'message': 'Error simulado'})
+                return True
+            return False
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/token': return self._responder(404, {'message': 'No encontrado'})
+            largo = int(self.headers.get('Content-Length') or 0)
+            form = {k: v[0] for k, v in parse_qs(self.rfile.read(largo).decode()).items()}
+            if self._previo(): return
+
+            if form.get('grant_type') == 'refresh_token':
+                if not sim.usar_refresh(form.get('refresh_token', '')):
+                    return self._responder(400, {'error': 'invalid_grant'})
+            elif form.get('grant_type') == 'password':
+                if sim.usuario is not None and (form.get('username'), form.get('password')) != (sim.usuario, sim.password):
+                    return self._responder(400, {'error': 'invalid_grant'})
+            else:
+                return self._responder(400, {'error': 'unsupported_grant_type'})
+            self._responder(200, sim.emitir_token())
+
+        def do_GET(self):
+            ruta = self.path.split('?')[0]
+            if ruta == '/_stats':
+                with sim.lock: stats = dict(sim.stats)
+                return self._responder(200, stats)
+            m_serie, m_cot = RE_SERIE.match(ruta), RE_COTIZACION.match(ruta)
+            if not (m_serie or m_cot): return self._responder(404, {'message': 'No encontrado'})
+            if self._previo(): return
+            if not sim.token_valido(self.headers.get('Authorization')):
+                return self._responder(401, {'message': 'Authorization has been denied for this request.'})
+
+            if m_serie:
+                _, simbolo, desde, hasta, _ = m_serie.groups()
+                return self._responder(200, serie_historica(simbolo, desde, hasta))
+            self._responder(200, cotizacion(m_cot.group(2)))
+
+    return Handler
+
+
+def iniciar(puerto=0, host='127.0.0.1', **opciones):
+    """Levanta el servidor en un hilo daemon. Devuelve (servidor, simulador, base_url)."""
+    sim = Simulador(**opciones)
+    servidor = ThreadingHTTPServer((host, puerto), _handler(sim))
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, sim, f"http://{host}:{servidor.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API de IOL.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--latencia-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=30)
+    parser.add_argument('--rps', type=int, default=0, help="Pedidos por segundo antes de responder 429 (0 = sin límite)")
+    parser.add_argument('--token-ttl', type=int, default=900, help="Segundos de validez del access_token")
+    parser.add_argument('--prob-error', type=float, default=0.0, help="Probabilidad de 500/503 por pedido")
+    parser.add_argument('--prob-lento', type=float, default=0.0, help="Probabilidad de un pedido colgado")
+    parser.add_argument('--lento-ms', type=float, default=5000)
+    parser.add_argument('--usuario', default=None, help="Si se indica, /token exige este usuario")
+    parser.add_argument('--password', default=None)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    opciones = {k: v for k, v in vars(args).items() if k not in ('host', 'puerto')}
+    servidor, sim, url = iniciar(args.puerto, args.host, **opciones)
+    print(f"IOL simulado en {url}  (IOL_BASE_URL={url})")
+    try:
+        while True:
+            time.sleep(10)
+            with sim.lock: print(f"[stats] {sim.stats}")
+    except KeyboardInterrupt:
+        servidor.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
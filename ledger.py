@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+import market_logic
+
+# Libro de resultados realizados: reconstruye los lotes originales (abiertos + vendidos),
+# re-imputa cada venta por FIFO y por costo promedio, y mantiene agregados por
+# Ticker / Broker / Mes / Año que se actualizan solo con las ventas nuevas.
+METODOS = {'FIFO': 'Resultado_FIFO', 'Promedio': 'Resultado_Promedio', 'Lote': 'Resultado_Lote'}
+DIMENSIONES = ['Ticker', 'Broker', 'Mes', 'Anio']
+COLS_AGREGADAS = ['Cantidad', 'Ingreso', 'Costo_FIFO', 'Costo_Promedio', 'Resultado_FIFO', 'Resultado_Promedio', 'Resultado_Lote', 'Operaciones']
+
+
+def _broker(df):
+    if 'Broker' not in df.columns: return pd.Series('DEFAULT', index=df.index)
+    return df['Broker'].astype(str).str.upper().str.strip().replace('', 'DEFAULT')
+
+
+def _monto_neto(cantidad, precio, ticker, broker, signo):
+    """Monto bruto +/- comisión (signo=+1 compra, -1 venta), con el divisor de bonos."""
+    es_bono = ticker.map(market_logic._es_bono)
+    bruto = cantidad * precio / np.where(es_bono, 100, 1)
+    comision = market_logic.calcular_comisiones(bruto, broker, es_bono)
+    return bruto + signo * comision
+
+
+# --- RECONSTRUCCIÓN ---
+def reconstruir_lotes(df_portafolio, df_historial):
+    """Lotes originales: cantidad abierta + cantidad ya vendida de cada (Ticker, Fecha, Precio, Broker)."""
+    partes = []
+    for df in (df_portafolio, df_historial):
+        if df is None or df.empty or 'Fecha_Compra' not in df.columns: continue
+        partes.append(pd.DataFrame({
+            'Ticker': df['Ticker'].map(market_logic.normalizar_ticker),
+            'Broker': _broker(df),
+            'Fecha': pd.to_datetime(df['Fecha_Compra'].astype(str).str[:10], errors='coerce'),
+            'Precio': market_logic.columna_num(df, 'Precio_Compra').round(4),
+            'Cantidad': market_logic.columna_num(df, 'Cantidad'),
+        }))
+    if not partes: return pd.DataFrame(columns=['Ticker', 'Broker', 'Fecha', 'Precio', 'Cantidad', 'Costo'])
+
+    lotes = pd.concat(partes, ignore_index=True).dropna(subset=['Fecha'])
+    lotes = lotes.groupby(['Ticker', 'Broker', 'Fecha', 'Precio'], as_index=False)['Cantidad'].sum()
+    lotes = lotes[lotes['Cantidad'] > 0].sort_values(['Ticker', 'Broker', 'Fecha'], kind='stable').reset_index(drop=True)
+    lotes['Costo'] = _monto_neto(lotes['Cantidad'], lotes['Precio'], lotes['Ticker'], lotes['Broker'], +1)
+    return lotes
+
+
+def preparar_ventas(df_historial):
+    if df_historial is None or df_historial.empty or 'Fecha_Venta' not in df_historial.columns:
+        return pd.DataFrame(columns=['Ticker', 'Broker', 'Fecha', 'Precio', 'Cantidad', 'Ingreso', 'Resultado_Lote'])
+    v = pd.DataFrame({
+        'Ticker': df_historial['Ticker'].map(market_logic.normalizar_ticker),
+        'Broker': _broker(df_historial),
+        'Fecha': pd.to_datetime(df_historial['Fecha_Venta'].astype(str).str[:10], errors='coerce'),
+        'Precio': market_logic.columna_num(df_historial, 'Precio_Venta'),
+        'Cantidad': market_logic.columna_num(df_historial, 'Cantidad'),
+        'Resultado_Lote': market_logic.columna_num(df_historial, 'Resultado_Neto'),
+    })
+    v = v.dropna(subset=['Fecha'])
+    v['Ingreso'] = _monto_neto(v['Cantidad'], v['Precio'], v['Ticker'], v['Broker'], -1)
+    return v
+
+
+# --- IMPUTACIÓN ---
+def _agregar(ventas):
+    fechas = pd.to_datetime(ventas['Fecha'])
+    df = ventas.assign(Mes=fechas.dt.strftime('%Y-%m'), Anio=fechas.dt.year, Operaciones=1)
+    return {dim: df.groupby(dim)[COLS_AGREGADAS].sum() for dim in DIMENSIONES}
+
+
+def _costo_promedio(g_l, f_l, q_l, c_l, g_v, f_v, q_v, n_grupos):
+    """Costo promedio ponderado vigente en cada venta (compras del mismo día primero)."""
+    g = np.concatenate([g_l, g_v])
+    f = np.concatenate([f_l, f_v])
+    orden = np.concatenate([np.zeros(len(g_l), dtype=int), np.ones(len(g_v), dtype=int)])
+    pos = np.concatenate([np.full(len(g_l), -1), np.arange(len(g_v))])
+    cant = np.concatenate([q_l, q_v])
+    costo = np.concatenate([c_l, np.zeros(len(g_v))])
+    idx = np.lexsort((orden, f, g))
+
+    costos = np.zeros(len(g_v))
+    qty_g, costo_g = np.zeros(n_grupos), np.zeros(n_grupos)
+    for i in idx.tolist():
+        k = g[i]
+        if orden[i] == 0:
+            qty_g[k] += cant[i]
+            costo_g[k] += costo[i]
+        else:
+            unit = costo_g[k] / qty_g[k] if qty_g[k] > 0 else 0.0
+            costos[pos[i]] = unit * cant[i]
+            qty_g[k] -= cant[i]
+            costo_g[k] -= unit * cant[i]
+    return costos, qty_g, costo_g
+
+
+def construir_ledger(df_portafolio, df_historial):
+    """
+    Reconstruye posiciones y resultados. Cada venta queda con su costo por FIFO, por costo
+    promedio y el resultado registrado por lote (Resultado_Neto). Devuelve un dict con
+    'ventas', 'agregados' (DataFrames por dimensión) y el estado para agregar ventas nuevas.
+    """
+    lotes = reconstruir_lotes(df_portafolio, df_historial)
+    ventas = preparar_ventas(df_historial)
+
+    claves = pd.concat([lotes['Ticker'] + '|' + lotes['Broker'], ventas['Ticker'] + '|' + ventas['Broker']], ignore_index=True)
+    codigos, grupos = pd.factorize(claves)
+    n_grupos = len(grupos)
+    g_l, g_v = codigos[:len(lotes)], codigos[len(lotes):]
+
+    # Orden (grupo, fecha) para lotes y ventas
+    f_l = lotes['Fecha'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    f_v = ventas['Fecha'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    o_l, o_v = np.lexsort((f_l, g_l)), np.lexsort((f_v, g_v))
+    lotes, g_l, f_l = lotes.iloc[o_l].reset_index(drop=True), g_l[o_l], f_l[o_l]
+    ventas, g_v, f_v = ventas.iloc[o_v].reset_index(drop=True), g_v[o_v], f_v[o_v]
+    q_l, c_l = lotes['Cantidad'].to_numpy(dtype=float), lotes['Costo'].to_numpy(dtype=float)
+    q_v = ventas['Cantidad'].to_numpy(dtype=float)
+
+    # FIFO: curva global de costo acumulado; cada grupo ocupa el tramo [inicio, fin)
+    cq = np.concatenate([[0.0], np.cumsum(q_l)])
+    cc = np.concatenate([[0.0], np.cumsum(c_l)])
+    comprado = np.bincount(g_l, weights=q_l, minlength=n_grupos)
+    inicio = np.concatenate([[0.0], np.cumsum(comprado)])[:-1]
+    fin = inicio + comprado
+    vendido_g = np.bincount(g_v, weights=q_v, minlength=n_grupos)
+    acum_v = np.cumsum(q_v) - (np.concatenate([[0.0], np.cumsum(vendido_g)])[:-1])[g_v]
+    hasta = np.minimum(inicio[g_v] + acum_v, fin[g_v])
+    desde = np.minimum(inicio[g_v] + acum_v - q_v, fin[g_v])
+    ventas['Costo_FIFO'] = np.interp(hasta, cq, cc) - np.interp(desde, cq, cc)
+
+    costos_prom, qty_g, costo_g = _costo_promedio(g_l, f_l, q_l, c_l, g_v, f_v, q_v, n_grupos)
+    ventas['Costo_Promedio'] = costos_prom
+    ventas['Resultado_FIFO'] = ventas['Ingreso'] - ventas['Costo_FIFO']
+    ventas['Resultado_Promedio'] = ventas['Ingreso'] - ventas['Costo_Promedio']
+
+    ultima = np.full(n_grupos, np.iinfo(np.int64).min)
+    np.maximum.at(ultima, g_l, f_l)
+    np.maximum.at(ultima, g_v, f_v)
+
+    estado = {'grupos': pd.Index(grupos), 'cq': cq, 'cc': cc, 'inicio': inicio, 'fin': fin,
+              'vendido': vendido_g, 'qty': qty_g, 'costo': costo_g, 'ultima_fecha': ultima}
+    return {'ventas': ventas, 'agregados': _agregar(ventas), 'estado': estado, 'lotes': lotes,
+            'version_lotes': int(pd.util.hash_pandas_object(lotes, index=False).sum()) if not lotes.empty else 0}
+
+
+# --- ACTUALIZACIÓN INCREMENTAL ---
+def agregar_ventas(ledger, df_nuevas, df_portafolio=None, df_historial=None):
+    """
+    Imputa solo las ventas nuevas usando el estado por (Ticker, Broker) y suma su aporte a los
+    agregados existentes. Si alguna venta es anterior a la última operación de su grupo se
+    reconstruye todo (requiere df_portafolio y df_historial completos).
+    """
+    nuevas = preparar_ventas(df_nuevas).sort_values('Fecha', kind='stable').reset_index(drop=True)
+    if nuevas.empty: return ledger
+    e = ledger['estado']
+    g_v = e['grupos'].get_indexer(nuevas['Ticker'] + '|' + nuevas['Broker'])
+    f_v = nuevas['Fecha'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+    if (g_v < 0).any() or (f_v < e['ultima_fecha'][np.maximum(g_v, 0)]).any():
+        if df_historial is None: raise ValueError("Venta fuera de orden: se necesita reconstruir el ledger completo.")
+        return construir_ledger(df_portafolio, df_historial)
+
+    vendido, qty, costo = e['vendido'].copy(), e['qty'].copy(), e['costo'].copy()
+    costos_fifo, costos_prom = [], []
+    for k, q in zip(g_v.tolist(), nuevas['Cantidad'].tolist()):
+        hasta = min(e['inicio'][k] + vendido[k] + q, e['fin'][k])
+        desde = min(e['inicio'][k] + vendido[k], e['fin'][k])
+        costos_fifo.append(np.interp(hasta, e['cq'], e['cc']) - np.interp(desde, e['cq'], e['cc']))
+        unit = costo[k] / qty[k] if qty[k] > 0 else 0.0
+        costos_prom.append(unit * q)
+        vendido[k] += q
+        qty[k] -= q
+        costo[k] -= unit * q
+
+    ultima = e['ultima_fecha'].copy()
+    np.maximum.at(ultima, g_v, f_v)
+    nuevas['Costo_FIFO'] = costos_fifo
+    nuevas['Costo_Promedio'] = costos_prom
+    nuevas['Resultado_FIFO'] = nuevas['Ingreso'] - nuevas['Costo_FIFO']
+    nuevas['Resultado_Promedio'] = nuevas['Ingreso'] - nuevas['Costo_Promedio']
+
+    delta = _agregar(nuevas)
+    agregados = {dim: ledger['agregados'][dim].add(delta[dim], fill_value=0) for dim in DIMENSIONES}
+    ventas = pd.concat([ledger['ventas'], nuevas[ledger['ventas'].columns]], ignore_index=True)
+    estado = {**e, 'vendido': vendido, 'qty': qty, 'costo': costo, 'ultima_fecha': ultima}
+    return {**ledger, 'ventas': ventas, 'agregados': agregados, 'estado': estado}
+
+
+def actualizar_ledger(ledger, df_portafolio, df_historial):
+    """
+    Reutiliza el ledger si el historial solo sumó filas al final y los lotes originales no
+    cambiaron (una venta no altera cantidad abierta + vendida); si no, reconstruye.
+    """
+    n_hist = 0 if df_historial is None else len(df_historial)
+    if ledger is not None and 0 < ledger.get('n_hist', 0) <= n_hist:
+        lotes = reconstruir_lotes(df_portafolio, df_historial)
+        version = int(pd.util.hash_pandas_object(lotes, index=False).sum()) if not lotes.empty else 0
+        if version == ledger['version_lotes']:
+            if n_hist == ledger['n_hist']: return ledger
+            nuevo = agregar_ventas(ledger, df_historial.iloc[ledger['n_hist']:], df_portafolio, df_historial)
+            nuevo['n_hist'] = n_hist
+            return nuevo
+    nuevo = construir_ledger(df_portafolio, df_historial)
+    nuevo['n_hist'] = n_hist
+    return nuevo
+
+
+def resumen(ledger, dimension, metodo='FIFO'):
+    """Tabla lista para mostrar: Operaciones, Cantidad, Ingreso, Costo y Resultado del método elegido."""
+    df = ledger['agregados'][dimension]
+    col = METODOS[metodo]
+    costo = df['Costo_FIFO'] if metodo == 'FIFO' else (df['Costo_Promedio'] if metodo == 'Promedio' else df['Ingreso'] - df['Resultado_Lote'])
+    out = pd.DataFrame({'Operaciones': df['Operaciones'].astype(int), 'Cantidad': df['Cantidad'],
+                        'Ingreso': df['Ingreso'], 'Costo': costo, 'Resultado': df[col]})
+    return out.sort_index(ascending=dimension not in ('Mes', 'Anio'))
@@ -1,208 +1,329 @@
-import streamlit as st
-import pandas as pd
-from datetime import datetime
-import data_client
-import market_logic
-import database
-import config
-import time
-from typing import List
-import numpy as np # Necesario para el np.nan
-
-# --- INICIALIZACIÓN DE ESTADO (Mantenido) ---
-def init_session_state():
-    screener_cols = ['Precio', 'RSI', 'Caida_30d', 'Caida_5d', 'Var_Ayer', 'Suma_Caidas', 'Senal']
-
-    if 'oportunidades' not in st.session_state:
-        df_base = pd.DataFrame(index=config.TICKERS)
-        for col in screener_cols:
-             df_base[col] = 0.0 if col != 'Senal' else 'PENDIENTE'
-        df_base['Senal'] = df_base['Senal'].fillna('PENDIENTE')
-        st.session_state.oportunidades = df_base
-        
-    if 'precios_actuales' not in st.session_state: st.session_state.precios_actuales = pd.Series(dtype=float)
-    if 'mep_valor' not in st.session_state: st.session_state.mep_valor = None
-    if 'mep_var' not in st.session_state: st.session_state.mep_var = None
-    if 'last_update' not in st.session_state: st.session_state.last_update = None
-    if 'init_done' not in st.session_state: st.session_state.init_done = False
-    
-# --- LÓGICA DE ACTUALIZACIÓN BASE ---
-def update_data(lista_tickers, nombre_panel, silent=False):
-    if not lista_tickers: return
-
-    if not silent:
-        with st.spinner(f"Cargando {nombre_panel}..."):
-            # CRÍTICO: Si es SOLOS IOL (Dashboard), no llama a Yahoo
-            if nombre_panel == "SOLO IOL (Dashboard)":
-                dict_precios_hoy = data_client.get_current_prices_iol(lista_tickers)
-                if not dict_precios_hoy:
-                    st.warning(f"⚠️ No se encontraron precios en tiempo real.")
-                    return
-                
-                # Actualizar precios
-                st.session_state.precios_actuales.update(dict_precios_hoy)
-                st.session_state.precios_actuales = st.session_state.precios_actuales.combine_first(pd.Series(dict_precios_hoy))
-                
-                # Recalcular MEP
-                df_raw = pd.DataFrame([dict_precios_hoy])
-                mep, var = market_logic.calcular_mep(df_raw)
-                if mep:
-                    st.session_state.mep_valor = mep
-                    st.session_state.mep_var = var
-                
-                st.session_state.last_update = datetime.now()
-                st.success(f"✅ Precios IOL actualizados.")
-                return
-
-            # --- Lógica de Descarga COMPLETA (Home) ---
-            df_nuevo_raw = data_client.get_data(lista_tickers)
-            # ... [Bloque de procesamiento restante idéntico] ...
-            if df_nuevo_raw.empty:
-                st.warning(f"⚠️ No se encontraron datos para {nombre_panel}.")
-                return
-            
-            mep, var = market_logic.calcular_mep(df_nuevo_raw)
-            if mep:
-                st.session_state.mep_valor = mep
-                st.session_state.mep_var = var
-
-            try:
-                df_nuevo_screener = market_logic.calcular_indicadores(df_nuevo_raw)
-            except Exception as e:
-                st.error(f"❌ Error interno de cálculo: {e}")
-                return
-            
-            if df_nuevo_screener.empty: return
-            
-            if 'Precio' in df_nuevo_screener.columns:
-                nuevos = df_nuevo_screener['Precio']
-                st.session_state.precios_actuales.update(nuevos)
-                st.session_state.precios_actuales = st.session_state.precios_actuales.combine_first(nuevos)
-            
-            df_total = st.session_state.oportunidades.copy()
-            
-            df_nuevo_screener['Suma_Caidas'] = pd.to_numeric(df_nuevo_screener['Suma_Caidas'], errors='coerce')
-            
-            for idx in df_nuevo_screener.index:
-                 if idx in df_total.index:
-                     df_total.loc[idx] = df_nuevo_screener.loc[idx]
-            
-            if not df_total.empty:
-                cols_sort = ['Senal', 'Suma_Caidas']
-                if 'Suma_Caidas' in df_total.columns:
-                     df_total['Suma_Caidas'] = pd.to_numeric(df_total['Suma_Caidas'], errors='coerce')
-                df_total.sort_values(by=cols_sort, ascending=[True, False], na_position='last', inplace=True)
-
-            st.session_state.oportunidades = df_total
-            st.session_state.last_update = datetime.now()
-            st.success(f"✅ Datos actualizados.")
-            
-    else: # Si silent=True, procesa sin spinner
-        # Lógica de carga silenciosa (Auto-Refresh)
-        df_nuevo_raw = data_client.get_data(lista_tickers)
-        if df_nuevo_raw.empty: return
-
-        mep, var = market_logic.calcular_mep(df_nuevo_raw)
-        if mep:
-            st.session_state.mep_valor = mep
-            st.session_state.mep_var = var
-
-        try:
-            df_nuevo_screener = market_logic.calcular_indicadores(df_nuevo_raw)
-        except: return
-
-        if df_nuevo_screener.empty: return
-
-        if 'Precio' in df_nuevo_screener.columns:
-            nuevos = df_nuevo_screener['Precio']
-            st.session_state.precios_actuales.update(nuevos)
-            st.session_state.precios_actuales = st.session_state.precios_actuales.combine_first(nuevos)
-        
-        df_total = st.session_state.oportunidades.copy()
-        
-        df_nuevo_screener['Suma_Caidas'] = pd.to_numeric(df_nuevo_screener['Suma_Caidas'], errors='coerce')
-        
-        for idx in df_nuevo_screener.index:
-             if idx in df_total.index:
-                 df_total.loc[idx] = df_nuevo_screener.loc[idx]
-        
-        if not df_total.empty:
-            cols_sort = ['Senal', 'Suma_Caidas']
-            if 'Suma_Caidas' in df_total.columns:
-                 df_total['Suma_Caidas'] = pd.to_numeric(df_total['Suma_Caidas'], errors='coerce')
-            df_total.sort_values(by=cols_sort, ascending=[True, False], na_position='last', inplace=True)
-
-        st.session_state.oportunidades = df_total
-        st.session_state.last_update = datetime.now()
-
-
-def actualizar_solo_iol():
-    """NUEVA FUNCIÓN: Actualiza solo IOL (precios de Portafolio + MEP) para DASHBOARD."""
-    init_session_state()
-    
-    t_cartera = database.get_tickers_en_cartera()
-    t_mep = ['AL30.BA', 'AL30D.BA', 'GD30.BA', 'GD30D.BA']
-    t_a_cargar = list(set(t_cartera + t_mep))
-    
-    if not t_a_cargar:
-        st.warning("No hay activos para actualizar.")
-        return
-
-    # Llama al update_data con un nombre especial para activar la lógica de SOLO IOL
-    update_data(t_a_cargar, "SOLO IOL (Dashboard)", silent=False)
-
-
-def actualizar_todo(silent=False):
-    """Función para HOME y DASHBOARD (Carga SOLO MEP al inicio)."""
-    init_session_state()
-
-    if not st.session_state.init_done:
-        t_a_cargar = get_tickers_a_cargar()
-        update_data(t_a_cargar, "MEP Base", silent=silent)
-    else:
-        # Aquí es donde fallamos, si init_done=True, intentamos actualizar la cartera completa.
-        actualizar_solo_cartera(silent=silent)
-
-
-# ... [Bloque de funciones restantes idéntico omitido] ...
-def get_tickers_a_cargar() -> List[str]:
-    tickers_a_cargar = set()
-    tickers_a_cargar.update(['AL30.BA', 'AL30D.BA', 'GD30.BA', 'GD30D.BA'])
-    return list(tickers_a_cargar)
-
-def actualizar_solo_cartera(silent=False):
-    init_session_state()
-    
-    t_cartera = database.get_tickers_en_cartera()
-    t_mep = ['AL30.BA', 'AL30D.BA', 'GD30.BA', 'GD30D.BA']
-    t_a_cargar = list(set(t_cartera + t_mep))
-    
-    if not t_a_cargar:
-        t_a_cargar = get_tickers_a_cargar()
-        
-    update_data(t_a_cargar, "Portafolio en Tenencia", silent=silent)
-
-def actualizar_panel_individual(nombre_panel, lista_tickers):
-    init_session_state()
-    
-    t_mep = ['AL30.BA', 'AL30D.BA', 'GD30.BA', 'GD30D.BA']
-    t_cartera = database.get_tickers_en_cartera()
-    
-    t_a_cargar = list(set(lista_tickers + t_mep + t_cartera))
-    
-    update_data(t_a_cargar, nombre_panel, silent=False)
-
-def mostrar_boton_actualizar():
-    init_session_state()
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("📡 Datos de Mercado")
-    
-    if st.sidebar.button("🔄 Actualizar Todo", use_container_width=True):
-        st.session_state.init_done = False
-        st.rerun()
-        
-    if st.session_state.last_update:
-        st.sidebar.caption(f"Última act: {st.session_state.last_update.strftime('%H:%M:%S')}")
-        
-    if st.session_state.mep_valor:
-        st.sidebar.metric("MEP", f"${st.session_state.mep_valor:,.0f}")
\ No newline at end of file
+import streamlit as st
+import pandas as pd
+import concurrent.futures
+from datetime import datetime
+import data_client
+import market_logic
+import alerts
+import intradia
+from screener_state import EstadoScreener
+import snapshot
+import database
+import config
+import time
+from typing import List
+import numpy as np # Necesario para el np.nan
+
+# --- INICIALIZACIÓN DE ESTADO (Mantenido) ---
+def init_session_state():
+    if 'screener' not in st.session_state:
+        st.session_state.screener = EstadoScreener(config.TICKERS)
+        _restaurar_snapshot()
+    if 'precios_actuales' not in st.session_state: st.session_state.precios_actuales = pd.Series(dtype=float)
+    if 'mep_valor' not in st.session_state: st.session_state.mep_valor = None
+    if 'mep_var' not in st.session_state: st.session_state.mep_var = None
+    if 'mep_serie' not in st.session_state: st.session_state.mep_serie = pd.DataFrame()
+    if 'moneda' not in st.session_state: st.session_state.moneda = 'ARS'
+    if 'last_update' not in st.session_state: st.session_state.last_update = None
+    if 'init_done' not in st.session_state: st.session_state.init_done = False
+    if 'alertas_estado' not in st.session_state: st.session_state.alertas_estado = alerts.estado_vacio()
+    if 'portafolio_valuacion' not in st.session_state: st.session_state.portafolio_valuacion = pd.DataFrame()
+    if 'alertas_pendientes' not in st.session_state: st.session_state.alertas_pendientes = alerts.disparos_vacios()
+    if 'alertas_ultimo_flush' not in st.session_state: st.session_state.alertas_ultimo_flush = time.time()
+    if 'desde_snapshot' not in st.session_state: st.session_state.desde_snapshot = False
+
+# --- SNAPSHOT (Arranque en caliente) ---
+CLAVES_RESTAURAR = {'precios_actuales': 'precios_actuales', 'mep_valor': 'mep_valor', 'mep_var': 'mep_var',
+                    'mep_serie': 'mep_serie', 'last_update': 'last_update',
+                    'alertas_estado': 'alertas_estado', 'portafolio': 'portafolio_valuacion'}
+
+def _restaurar_snapshot():
+    """Siembra una sesión nueva con el último estado calculado; queda marcada hasta el primer refresco real."""
+    datos = snapshot.cargar()
+    if not datos or datos.get('last_update') is None: return
+    st.session_state.screener.restaurar(datos['screener'])
+    # Clave del snapshot -> clave de sesión (el estado de alertas evita re-disparar flancos ya avisados)
+    for clave, destino in CLAVES_RESTAURAR.items():
+        if datos.get(clave) is not None: st.session_state[destino] = datos[clave]
+    st.session_state.desde_snapshot = True
+
+def _guardar_snapshot():
+    st.session_state.desde_snapshot = False
+    snapshot.guardar({
+        'screener': st.session_state.screener.datos,
+        'precios_actuales': st.session_state.precios_actuales,
+        'mep_valor': st.session_state.mep_valor,
+        'mep_var': st.session_state.mep_var,
+        'mep_serie': st.session_state.mep_serie,
+        'last_update': st.session_state.last_update,
+        'alertas_estado': st.session_state.alertas_estado,
+        'portafolio': st.session_state.portafolio_valuacion,
+    })
+
+# --- MOTOR DE ALERTAS (Flanco + Cooldown) ---
+def procesar_alertas(forzar_persistencia=False):
+    """Evalúa las alertas de todos los lotes contra precios_actuales y persiste los disparos por lotes."""
+    if st.session_state.precios_actuales.empty: return
+    df_port = database.get_portafolio_df()
+    if df_port.empty: return
+
+    estado, disparos = alerts.evaluar_alertas(df_port, st.session_state.precios_actuales, st.session_state.alertas_estado)
+    st.session_state.alertas_estado = estado
+    # Valuación por lote para el snapshot (api.py la sirve sin volver a leer Sheets)
+    st.session_state.portafolio_valuacion = market_logic.analizar_portafolio(df_port, st.session_state.precios_actuales)
+
+    for d in disparos.to_dict('records'):
+        icono = "🔴" if d['Tipo'] == 'STOP LOSS' else "🟢"
+        st.toast(f"{d['Tipo']}: {d['Ticker']} a ${d['Precio']:,.2f} (lote {str(d['Fecha_Compra'])[:10]})", icon=icono)
+    st.session_state.alertas_pendientes = alerts.acumular_disparos(st.session_state.alertas_pendientes, disparos)
+
+    if alerts.debe_persistir(st.session_state.alertas_pendientes, st.session_state.alertas_ultimo_flush, forzar=forzar_persistencia):
+        ok, _ = database.registrar_disparos_alertas(st.session_state.alertas_pendientes)
+        if ok:
+            st.session_state.alertas_pendientes = alerts.disparos_vacios()
+            st.session_state.alertas_ultimo_flush = time.time()
+    
+# --- LÓGICA DE ACTUALIZACIÓN BASE ---
+def update_data(lista_tickers, nombre_panel, silent=False):
+    if not lista_tickers: return
+
+    if silent: # Carga silenciosa (Auto-Refresh): mismo camino, sin spinner ni mensajes
+        _actualizar_screener(lista_tickers, nombre_panel, silent=True)
+        return
+
+    with st.spinner(f"Cargando {nombre_panel}..."):
+        # CRÍTICO: Si es SOLOS IOL (Dashboard), no llama a Yahoo
+        if nombre_panel == "SOLO IOL (Dashboard)":
+            dict_precios_hoy = data_client.get_current_prices_iol(lista_tickers)
+            if not dict_precios_hoy:
+                st.warning(f"⚠️ No se encontraron precios en tiempo real.")
+                return
+            
+            # Actualizar precios
+            st.session_state.precios_actuales.update(dict_precios_hoy)
+            st.session_state.precios_actuales = st.session_state.precios_actuales.combine_first(pd.Series(dict_precios_hoy))
+            
+            # Recalcular MEP (solo la fila de hoy sobre la serie ya calculada)
+            if st.session_state.mep_serie.empty:
+                st.session_state.mep_serie = market_logic.calcular_serie_mep(database.get_historical_prices_df())
+            st.session_state.mep_serie = market_logic.actualizar_mep_incremental(st.session_state.mep_serie, dict_precios_hoy)
+            mep, var = market_logic.ultimo_mep(st.session_state.mep_serie)
+            if mep:
+                st.session_state.mep_valor = mep
+                st.session_state.mep_var = var
+            
+            st.session_state.last_update = datetime.now()
+            procesar_alertas()
+            _guardar_snapshot()
+            st.success(f"✅ Precios IOL actualizados.")
+            return
+
+        # --- Lógica de Descarga COMPLETA (Home) ---
+        _actualizar_screener(lista_tickers, nombre_panel, silent=False)
+
+def _actualizar_screener(lista_tickers, nombre_panel, silent):
+    """Descarga completa: MEP, indicadores y solo las filas refrescadas aplicadas al estado del screener."""
+    _aplicar_descarga(data_client.get_data(lista_tickers), nombre_panel, silent)
+
+def _aplicar_descarga(df_nuevo_raw, nombre_panel, silent):
+    if df_nuevo_raw.empty:
+        if not silent: st.warning(f"⚠️ No se encontraron datos para {nombre_panel}.")
+        return
+    st.toast("📂 Historial cargado de Google Sheets.", icon="✅")
+    
+    st.session_state.mep_serie = market_logic.calcular_serie_mep(df_nuevo_raw)
+    mep, var = market_logic.ultimo_mep(st.session_state.mep_serie)
+    if mep:
+        st.session_state.mep_valor = mep
+        st.session_state.mep_var = var
+
+    try:
+        df_nuevo_screener = intradia.agregar_indicadores(market_logic.calcular_indicadores(df_nuevo_raw))
+    except Exception as e:
+        if not silent: st.error(f"❌ Error interno de cálculo: {e}")
+        return
+    
+    if df_nuevo_screener.empty: return
+    
+    if 'Precio' in df_nuevo_screener.columns:
+        nuevos = df_nuevo_screener['Precio']
+        st.session_state.precios_actuales.update(nuevos)
+        st.session_state.precios_actuales = st.session_state.precios_actuales.combine_first(nuevos)
+    
+    st.session_state.screener.aplicar(df_nuevo_screener)
+    st.session_state.last_update = datetime.now()
+    procesar_alertas()
+    _guardar_snapshot()
+    if not silent: st.success(f"✅ Datos actualizados.")
+
+def get_oportunidades():
+    """Vista ordenada del screener (Senal, Suma_Caidas) con la hora de actualización de cada fila."""
+    init_session_state()
+    return st.session_state.screener.vista()
+
+
+def actualizar_solo_iol():
+    """NUEVA FUNCIÓN: Actualiza solo IOL (precios de Portafolio + MEP) para DASHBOARD."""
+    init_session_state()
+    
+    t_cartera = database.get_tickers_en_cartera()
+    t_mep = config.TICKERS_MEP
+    t_a_cargar = list(set(t_cartera + t_mep))
+    
+    if not t_a_cargar:
+        st.warning("No hay activos para actualizar.")
+        return
+
+    # Llama al update_data con un nombre especial para activar la lógica de SOLO IOL
+    update_data(t_a_cargar, "SOLO IOL (Dashboard)", silent=False)
+
+
+def actualizar_todo(silent=False):
+    """Función para HOME y DASHBOARD (Carga SOLO MEP al inicio)."""
+    init_session_state()
+
+    if not st.session_state.init_done:
+        t_a_cargar = get_tickers_a_cargar()
+        update_data(t_a_cargar, "MEP Base", silent=silent)
+    else:
+        # Aquí es donde fallamos, si init_done=True, intentamos actualizar la cartera completa.
+        actualizar_solo_cartera(silent=silent)
+
+# --- REFRESCO EN SEGUNDO PLANO (Home) ---
+# La descarga (Sheets + IOL) de actualizar_todo corre en un hilo: el script dibuja con lo que haya
+# (snapshot o nada) y queda libre para los widgets; el resultado se aplica en un rerun posterior.
+_DESCARGAS = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='refresco')
+REFRESCO_REINTENTO_SEG = 60  # Si una descarga vino vacía o falló, no se relanza en cada rerun
+
+def iniciar_refresco_fondo():
+    """Lanza la descarga de actualizar_todo en un hilo (una sola en curso por sesión)."""
+    init_session_state()
+    if refresco_en_curso(): return
+    if time.time() - st.session_state.get('refresco_lanzado', 0) < REFRESCO_REINTENTO_SEG: return
+    st.session_state.refresco_lanzado = time.time()
+    if not st.session_state.init_done: t_a_cargar = get_tickers_a_cargar()
+    else: t_a_cargar = list(set(database.get_tickers_en_cartera() + config.TICKERS_MEP)) or get_tickers_a_cargar()
+    st.session_state.refresco_fondo = _DESCARGAS.submit(data_client.get_data, t_a_cargar)
+
+def refresco_en_curso():
+    return st.session_state.get('refresco_fondo') is not None
+
+def aplicar_refresco_fondo():
+    """Si la descarga terminó, aplica sus filas como _actualizar_screener. Devuelve True si hubo algo que aplicar."""
+    tarea = st.session_state.get('refresco_fondo')
+    if tarea is None or not tarea.done(): return False
+    st.session_state.refresco_fondo = None
+    st.session_state.init_done = True
+    try:
+        df_nuevo_raw = tarea.result()
+    except Exception as e:
+        print(f"WARN: refresco en segundo plano fallido: {e}")
+        return True
+    _aplicar_descarga(df_nuevo_raw, "Refresco", silent=True)
+    return True
+
+
+# ... [Bloque de funciones restantes idéntico omitido] ...
+def get_tickers_a_cargar() -> List[str]:
+    tickers_a_cargar = set()
+    tickers_a_cargar.update(config.TICKERS_MEP)
+    return list(tickers_a_cargar)
+
+def actualizar_solo_cartera(silent=False):
+    init_session_state()
+    
+    t_cartera = database.get_tickers_en_cartera()
+    t_mep = config.TICKERS_MEP
+    t_a_cargar = list(set(t_cartera + t_mep))
+    
+    if not t_a_cargar:
+        t_a_cargar = get_tickers_a_cargar()
+        
+    update_data(t_a_cargar, "Portafolio en Tenencia", silent=silent)
+
+def actualizar_panel_individual(nombre_panel, lista_tickers):
+    init_session_state()
+    
+    t_mep = config.TICKERS_MEP
+    t_cartera = database.get_tickers_en_cartera()
+    
+    t_a_cargar = list(set(lista_tickers + t_mep + t_cartera))
+    
+    update_data(t_a_cargar, nombre_panel, silent=False)
+
+def cargar_paneles(paneles, al_completar=None):
+    """
+    Carga varios paneles en paralelo: una sola tanda de cotizaciones IOL para la unión de tickers
+    (los compartidos se piden una vez) y, apenas un panel tiene todas sus cotizaciones, se calculan
+    sus indicadores y se llama a al_completar(nombre, df_panel) para dibujarlo sin esperar al resto.
+    """
+    init_session_state()
+    grupos = {nombre: list(tickers) for nombre, tickers in paneles.items()}
+    # Cartera y bonos MEP se cargan siempre, como en actualizar_panel_individual
+    grupos['_base'] = list(set(database.get_tickers_en_cartera() + config.TICKERS_MEP))
+    faltan = {nombre: set(tickers) for nombre, tickers in grupos.items()}
+    universo = list(dict.fromkeys(t for tickers in grupos.values() for t in tickers))
+
+    historial = database.get_historical_matrix()
+    precios_hoy = {}
+
+    def _completar(nombre):
+        tickers = grupos[nombre]
+        df_raw = data_client.unir_historial(historial.seleccionar(tickers), {t: precios_hoy[t] for t in tickers if t in precios_hoy})
+        if df_raw.empty: return
+        df_panel = intradia.agregar_indicadores(market_logic.calcular_indicadores(df_raw))
+        if df_panel.empty: return
+        st.session_state.screener.aplicar(df_panel)
+        nuevos = df_panel['Precio']
+        st.session_state.precios_actuales.update(nuevos)
+        st.session_state.precios_actuales = st.session_state.precios_actuales.combine_first(nuevos)
+        if al_completar and nombre in paneles:
+            vista = st.session_state.screener.vista()
+            al_completar(nombre, vista[vista.index.isin(tickers)])
+
+    for ticker, precio in data_client.iter_precios_iol(universo):
+        if precio is not None: precios_hoy[ticker] = precio
+        for nombre in [n for n, pendientes in faltan.items() if ticker in pendientes]:
+            faltan[nombre].discard(ticker)
+            if not faltan[nombre]: _completar(nombre)
+
+    # Paneles con cotizaciones que no llegaron (timeout) se completan con lo que haya
+    for nombre in [n for n, pendientes in faltan.items() if pendientes]: _completar(nombre)
+
+    df_mep = data_client.unir_historial(historial, precios_hoy)
+    if not df_mep.empty:
+        st.session_state.mep_serie = market_logic.calcular_serie_mep(df_mep)
+        mep, var = market_logic.ultimo_mep(st.session_state.mep_serie)
+        if mep:
+            st.session_state.mep_valor = mep
+            st.session_state.mep_var = var
+
+    st.session_state.last_update = datetime.now()
+    procesar_alertas()
+    _guardar_snapshot()
+
+def mostrar_boton_actualizar():
+    init_session_state()
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("📡 Datos de Mercado")
+    
+    if st.sidebar.button("🔄 Actualizar Todo", use_container_width=True):
+        st.session_state.init_done = False
+        st.rerun()
+        
+    if st.session_state.last_update:
+        st.sidebar.caption(f"Última act: {st.session_state.last_update.strftime('%H:%M:%S')}")
+        
+    if st.session_state.mep_valor:
+        st.sidebar.metric("MEP", f"${st.session_state.mep_valor:,.0f}")
+
+def selector_moneda():
+    """Selector ARS/USD en la barra lateral. Cambiar de moneda reutiliza los cálculos memorizados."""
+    init_session_state()
+    return st.sidebar.radio("Moneda", market_logic.MONEDAS, key='moneda', horizontal=True)
+
+def get_serie_mep():
+    """Serie MEP diaria de la sesión; si todavía no hay, la del historial de Sheets."""
+    init_session_state()
+    if not st.session_state.mep_serie.empty: return st.session_state.mep_serie
+    return market_logic.calcular_serie_mep(database.get_historical_prices_df())
\ No newline at end of file
@@ -1,371 +1,349 @@
-import pandas as pd
-import pandas_ta as ta
-import numpy as np
-import config
-
-# --- [DETECCIÓN DE BONOS Y COMISIONES] (No Modificado) ---
-def _es_bono(ticker):
-    if not ticker: return False
-    t = str(ticker).strip().upper()
-    bonos_letras = ['DICP', 'PARP', 'CUAP', 'DICY', 'PARY', 'TO26', 'PR13', 'CER']
-    if any(b in t for b in bonos_letras): return True
-    prefijos = ['AL', 'GD', 'TX', 'TO', 'BA', 'BP', 'TV', 'AE', 'SX', 'MR', 'CL', 'NO']
-    if any(t.startswith(p) for p in prefijos):
-        if any(char.isdigit() for char in t): return True
-    return False
-
-def calcular_comision_real(monto_bruto, broker, es_bono=False):
-    broker = str(broker).upper().strip()
-    iva = config.IVA
-    derechos_acciones = config.DERECHOS_ACCIONES
-    derechos_bonos = config.DERECHOS_BONOS
-    veta_min = config.VETA_MINIMO
-
-    if es_bono:
-        tasa_derechos = derechos_bonos
-        multiplicador_iva = 1.0
-    else:
-        tasa_derechos = derechos_acciones
-        multiplicador_iva = iva
-        
-    if broker == 'VETA':
-        tasa_veta = config.COMISIONES.get('VETA', 0.0015)
-        comision_base = max(veta_min, monto_bruto * tasa_veta)
-        costo_total = (comision_base * multiplicador_iva) + (monto_bruto * tasa_derechos)
-        return costo_total
-    
-    tasa = config.COMISIONES.get(broker, config.COMISIONES.get('DEFAULT', 0.0045))
-    comision_base = monto_bruto * tasa
-    costo_derechos = monto_bruto * tasa_derechos
-    
-    if es_bono:
-        costo_total = comision_base + costo_derechos
-    else:
-        costo_total = (comision_base + costo_derechos) * multiplicador_iva
-        
-    return costo_total
-
-# --- INDICADORES (No Modificado el general) ---
-def calcular_indicadores(df_historico_raw):
-    if df_historico_raw.empty: return pd.DataFrame()
-    
-    lista_resultados = []
-    
-    for ticker in df_historico_raw.columns:
-        try:
-            serie_precios = df_historico_raw[ticker].dropna()
-            cant_datos = len(serie_precios)
-            
-            if cant_datos < 15:
-                # Datos insuficientes, saltamos
-                continue
-
-            precio_actual = serie_precios.iloc[-1]
-            rsi_actual = 0
-            var_max_30d = 0
-            var_max_5d = 0
-            var_ayer = 0
-            
-            # RSI
-            rsi = ta.rsi(serie_precios, length=14)
-            if rsi is not None and not rsi.empty:
-                rsi_actual = rsi.iloc[-1]
-            
-            # Caídas
-            max_30d = serie_precios.tail(30).max()
-            if max_30d > 0: var_max_30d = (precio_actual / max_30d) - 1
-            
-            max_5d = serie_precios.tail(5).max()
-            if max_5d > 0: var_max_5d = (precio_actual / max_5d) - 1
-            
-            if len(serie_precios) >= 2:
-                cierre_ayer = serie_precios.iloc[-2]
-                if cierre_ayer > 0: var_ayer = (precio_actual / cierre_ayer) - 1
-
-            lista_resultados.append({
-                'Ticker': ticker,
-                'Precio': precio_actual,
-                'RSI': rsi_actual,
-                'Caida_30d': var_max_30d,
-                'Caida_5d': var_max_5d,
-                'Var_Ayer': var_ayer
-            })
-            
-        except Exception: continue
-
-    df_resumen = pd.DataFrame(lista_resultados)
-    if df_resumen.empty: return pd.DataFrame()
-
-    df_resumen.set_index('Ticker', inplace=True)
-    
-    df_resumen['Caida_30d'] = pd.to_numeric(df_resumen['Caida_30d'], errors='coerce').fillna(0)
-    df_resumen['Caida_5d'] = pd.to_numeric(df_resumen['Caida_5d'], errors='coerce').fillna(0)
-    df_resumen['Suma_Caidas'] = df_resumen['Caida_30d'].abs() + df_resumen['Caida_5d'].abs()
-    
-    conditions = [
-        (df_resumen['RSI'] >= 60) & (df_resumen['Suma_Caidas'] > 0.10),
-        (df_resumen['RSI'] >= 40) & (df_resumen['RSI'] < 60) & (df_resumen['Suma_Caidas'] > 0.12),
-        (df_resumen['RSI'] < 40) & (df_resumen['Suma_Caidas'] > 0.15) & (df_resumen['RSI'] > 0)
-    ]
-    df_resumen['Senal'] = np.select(conditions, ['COMPRAR']*3, default='NEUTRO')
-    df_resumen.loc[df_resumen['RSI'].isna(), 'Senal'] = 'PENDIENTE'
-    
-    return df_resumen
-
-# --- NUEVA FUNCIÓN: SIMULADOR DE RSI ---
-def calcular_rsi_simulado(df_historico, ticker, precio_nuevo):
-    if ticker not in df_historico.columns: return None
-    
-    # Tomamos la serie y agregamos el precio nuevo al final
-    serie = df_historico[ticker].dropna().copy()
-    
-    # Agregar el precio simulado como si fuera el cierre de hoy (o mañana)
-    # Pandas Series append está deprecado en versiones nuevas, usamos concat
-    nueva_fila = pd.Series([precio_nuevo], index=[serie.index[-1] + pd.Timedelta(days=1)])
-    serie_simulada = pd.concat([serie, nueva_fila])
-    
-    try:
-        rsi_series = ta.rsi(serie_simulada, length=14)
-        if rsi_series is not None and not rsi_series.empty:
-            return rsi_series.iloc[-1]
-    except: pass
-    
-    return None
-
-# ... [Resto de funciones omitidas sin cambios: analizar_portafolio, calcular_mep] ...
-def analizar_portafolio(df_portafolio, series_precios_actuales):
-    if df_portafolio.empty: return pd.DataFrame()
-
-    df = df_portafolio.copy()
-    df_precios = series_precios_actuales.to_frame(name='Precio_Actual')
-    df = df.merge(df_precios, left_on='Ticker', right_index=True, how='left')
-
-    def calc_fila(row):
-        if pd.isna(row['Precio_Actual']) or row['Precio_Actual'] == 0.0: return pd.Series([0,0,0,0,0,0,0])
-        
-        p_compra = float(row['Precio_Compra'])
-        p_actual = float(row['Precio_Actual'])
-        cant = float(row['Cantidad'])
-        broker = row.get('Broker', 'DEFAULT')
-        ticker = row['Ticker']
-
-        es_bono = _es_bono(ticker)
-        divisor = 100 if es_bono else 1
-        
-        monto_compra_puro = (p_compra * cant) / divisor
-        valor_bruto_actual = (p_actual * cant) / divisor
-        
-        comis_compra = calcular_comision_real(monto_compra_puro, broker, es_bono)
-        inversion_total = monto_compra_puro + comis_compra
-
-        comis_venta_estimada = calcular_comision_real(valor_bruto_actual, broker, es_bono)
-        valor_neto_salida = valor_bruto_actual - comis_venta_estimada
-
-        gan_bruta_monto = valor_bruto_actual - monto_compra_puro
-        gan_neta_monto = valor_neto_salida - inversion_total
-        
-        pct_bruta = (valor_bruto_actual / monto_compra_puro) - 1 if monto_compra_puro else 0
-        pct_neta = (gan_neta_monto / inversion_total) if inversion_total else 0
-
-        return pd.Series([inversion_total, valor_bruto_actual, valor_neto_salida, 
-                          gan_bruta_monto, gan_neta_monto, pct_bruta, pct_neta])
-
-    cols_calc = ['Inversion_Total', 'Valor_Actual', 'Valor_Salida_Neto', 
-                 'Ganancia_Bruta_Monto', 'Ganancia_Neta_Monto', 
-                 '%_Ganancia_Bruta', '%_Ganancia_Neto']
-    
-    df[cols_calc] = df.apply(calc_fila, axis=1)
-
-    df['%_Ganancia_Bruta'] = df['%_Ganancia_Bruta'].replace([np.inf, -np.inf], np.nan)
-    df['%_Ganancia_Neto'] = df['%_Ganancia_Neto'].replace([np.inf, -np.inf], np.nan)
-
-    cond_stop_loss = (df['Alerta_Baja'] > 0) & (df['Precio_Actual'] <= df['Alerta_Baja'])
-    cond_take_profit = (df['Alerta_Alta'] > 0) & (df['Precio_Actual'] >= df['Alerta_Alta'])
-    
-    conditions = [cond_stop_loss, cond_take_profit]
-    df['Senal_Venta'] = np.select(conditions, ['STOP LOSS', 'TAKE PROFIT'], default='NEUTRO')
-    df.loc[df['Precio_Actual'].isna(), 'Senal_Venta'] = 'PRECIO FALTANTE'
-
-    return df
-
-def calcular_mep(df_raw):
-    if df_raw.empty: return None, None
-    pares = [('AL30.BA', 'AL30D.BA'), ('GD30.BA', 'GD30D.BA')]
-    for peso_ticker, dolar_ticker in pares:
-        if peso_ticker in df_raw.columns and dolar_ticker in df_raw.columns:
-            try:
-                serie_peso = df_raw[peso_ticker].dropna()
-                serie_dolar = df_raw[dolar_ticker].dropna()
-                if serie_peso.empty or serie_dolar.empty: continue
-                df_pair = pd.concat([serie_peso, serie_dolar], axis=1, join='inner')
-                if df_pair.empty: continue
-                mep_series = df_pair.iloc[:,0] / df_pair.iloc[:,1]
-                ultimo_mep = mep_series.iloc[-1]
-                variacion = 0.0
-                if len(mep_series) >= 2:
-                    variacion = (ultimo_mep / mep_series.iloc[-2]) - 1
-                return ultimo_mep, variacion
-            except Exception: continue
-    return None, None
-
-# --- EN MARKET_LOGIC.PY ---
-
-def calcular_screen_cedears(df_historico_raw):
-    """
-    Calcula métricas estándar + Consenso RSI + SMA 70 + Racha bajista vs SMA 70.
-    """
-    if df_historico_raw.empty: return pd.DataFrame()
-    
-    lista_resultados = []
-    rangos_analisis = range(2, 9) 
-
-    for ticker in df_historico_raw.columns:
-        try:
-            serie_precios = df_historico_raw[ticker].dropna()
-            cant_datos = len(serie_precios)
-            
-            # Necesitamos historial suficiente para SMA 70
-            if cant_datos < 75: continue # Aumenté un poco el filtro para asegurar SMA 70
-
-            precio_actual = serie_precios.iloc[-1]
-            
-            # 1. Indicadores Base
-            rsi_14 = 0
-            try:
-                r14 = ta.rsi(serie_precios, length=14)
-                if r14 is not None: rsi_14 = r14.iloc[-1]
-            except: pass
-
-            var_max_30d = 0
-            max_30 = serie_precios.tail(30).max()
-            if max_30 > 0: var_max_30d = (precio_actual / max_30) - 1
-            
-            var_max_5d = 0
-            max_5 = serie_precios.tail(5).max()
-            if max_5 > 0: var_max_5d = (precio_actual / max_5) - 1
-
-            # 2. Consenso RSI
-            conteo_sobreventa = 0
-            total_mediciones = len(rangos_analisis)
-            for length in rangos_analisis:
-                try:
-                    val_rsi = ta.rsi(serie_precios, length=length).iloc[-1]
-                    if val_rsi < 30: conteo_sobreventa += 1
-                except: pass
-            pct_consenso = conteo_sobreventa / total_mediciones
-
-            # 3. SMA 70 y Días Consecutivos Debajo
-            sma_70_val = 0
-            dias_bajo_sma = 0
-            try:
-                sma_series = ta.sma(serie_precios, length=70)
-                if sma_series is not None and not sma_series.empty:
-                    sma_70_val = sma_series.iloc[-1]
-                    
-                    # Lógica de Racha: Recorrer hacia atrás contando días CLOSE < SMA
-                    # Alineamos series (quitando nulos iniciales de la SMA)
-                    df_calc = pd.DataFrame({'close': serie_precios, 'sma': sma_series}).dropna()
-                    
-                    if not df_calc.empty:
-                        # Convertimos a booleanos: True si Precio < SMA
-                        condicion_bajo_sma = df_calc['close'] < df_calc['sma']
-                        
-                        # Recorremos de atrás hacia adelante (desde hoy hacia el pasado)
-                        # iloc[-1] es hoy, iloc[-2] ayer...
-                        for i in range(len(condicion_bajo_sma) - 1, -1, -1):
-                            if condicion_bajo_sma.iloc[i]:
-                                dias_bajo_sma += 1
-                            else:
-                                break # Cortamos la racha apenas un día el precio estuvo arriba
-            except: pass
-
-            lista_resultados.append({
-                'Ticker': ticker,
-                'Precio': precio_actual,
-                'RSI_14': rsi_14,
-                'Caida_30d': var_max_30d,
-                'Caida_5d': var_max_5d,
-                'Consenso_RSI': pct_consenso,
-                'SMA_70': sma_70_val,
-                'Dias_Bajo_SMA': dias_bajo_sma
-            })
-            
-        except Exception: continue
-
-    df_resumen = pd.DataFrame(lista_resultados)
-    if df_resumen.empty: return pd.DataFrame()
-
-    df_resumen.set_index('Ticker', inplace=True)
-    return df_resumen
-    """
-    Calcula métricas estándar + Consenso de RSI de corto plazo (1 a 8 periodos).
-    """
-    if df_historico_raw.empty: return pd.DataFrame()
-    
-    lista_resultados = []
-    
-    # Definimos los periodos para el consenso
-    lengths_consenso = range(2, 9) # Usamos 2 a 8 (RSI 1 es muy ruidoso/binario, pero si quieres 1 a 8 cambia a range(1, 9))
-    # NOTA: Larry Connors usa RSI(2). RSI(1) es 0 o 100 casi siempre. 
-    # Si prefieres estrictamente 1 a 8, usa: range(1, 9)
-    # Voy a usar 2 a 8 para evitar ruido extremo, pero es configurable.
-    
-    rangos_analisis = range(1, 9) # Ok, hagamos 1 a 8 como pediste estrictamente.
-
-    for ticker in df_historico_raw.columns:
-        try:
-            serie_precios = df_historico_raw[ticker].dropna()
-            cant_datos = len(serie_precios)
-            
-            # Necesitamos al menos unos 20 datos para que el RSI(14) sea estable, 
-            # y el RSI(8) necesita mínimo 9.
-            if cant_datos < 20: continue
-
-            precio_actual = serie_precios.iloc[-1]
-            
-            # 1. Métricas Estándar (Contexto)
-            rsi_14 = 0
-            try:
-                r14 = ta.rsi(serie_precios, length=14)
-                if r14 is not None: rsi_14 = r14.iloc[-1]
-            except: pass
-
-            var_max_30d = 0
-            max_30 = serie_precios.tail(30).max()
-            if max_30 > 0: var_max_30d = (precio_actual / max_30) - 1
-            
-            var_max_5d = 0
-            max_5 = serie_precios.tail(5).max()
-            if max_5 > 0: var_max_5d = (precio_actual / max_5) - 1
-
-            # 2. CÁLCULO DE CONSENSO MULTI-LENGTH (1 a 8)
-            # Contamos cuántos de estos RSIs están por debajo de 30
-            conteo_sobreventa = 0
-            total_mediciones = len(rangos_analisis) # 8
-            
-            for length in rangos_analisis:
-                try:
-                    # Cálculo rápido de RSI para N periodos
-                    val_rsi = ta.rsi(serie_precios, length=length).iloc[-1]
-                    if val_rsi < 30:
-                        conteo_sobreventa += 1
-                except: pass
-            
-            pct_consenso = conteo_sobreventa / total_mediciones # Ej: 4/8 = 0.50
-
-            lista_resultados.append({
-                'Ticker': ticker,
-                'Precio': precio_actual,
-                'RSI_14': rsi_14, # Le pongo RSI_14 para diferenciar
-                'Caida_30d': var_max_30d,
-                'Caida_5d': var_max_5d,
-                'Consenso_RSI': pct_consenso # Valor entre 0.0 y 1.0
-            })
-            
-        except Exception: continue
-
-    df_resumen = pd.DataFrame(lista_resultados)
-    if df_resumen.empty: return pd.DataFrame()
-
-    df_resumen.set_index('Ticker', inplace=True)
+import pandas as pd
+import numpy as np
+import config
+import indicators
+import tracing
+from collections import OrderedDict
+
+# --- [DETECCIÓN DE BONOS Y COMISIONES] (No Modificado) ---
+def _es_bono(ticker):
+    if not ticker: return False
+    t = str(ticker).strip().upper()
+    bonos_letras = ['DICP', 'PARP', 'CUAP', 'DICY', 'PARY', 'TO26', 'PR13', 'CER']
+    if any(b in t for b in bonos_letras): return True
+    prefijos = ['AL', 'GD', 'TX', 'TO', 'BA', 'BP', 'TV', 'AE', 'SX', 'MR', 'CL', 'NO']
+    if any(t.startswith(p) for p in prefijos):
+        if any(char.isdigit() for char in t): return True
+    return False
+
+def calcular_comisiones(montos, brokers, es_bono):
+    """Comisión + derechos de mercado (+ IVA en acciones) de cada operación, sobre arrays alineados."""
+    montos = np.asarray(montos, dtype=float)
+    brokers = np.array([str(b).upper().strip() for b in brokers], dtype=object)
+    es_bono = np.asarray(es_bono, dtype=bool)
+    default = config.COMISIONES.get('DEFAULT', 0.0045)
+    tasa = np.array([config.COMISIONES.get(b, default) for b in brokers], dtype=float)
+    tasa_derechos = np.where(es_bono, config.DERECHOS_BONOS, config.DERECHOS_ACCIONES)
+    multiplicador_iva = np.where(es_bono, 1.0, config.IVA)  # Los bonos no pagan IVA
+
+    costo_derechos = montos * tasa_derechos
+    # VETA cobra un mínimo por operación
+    comision_veta = np.maximum(config.VETA_MINIMO, montos * config.COMISIONES.get('VETA', 0.0015))
+    return np.where(brokers == 'VETA', comision_veta * multiplicador_iva + costo_derechos,
+                    (montos * tasa + costo_derechos) * multiplicador_iva)
+
+def calcular_comision_real(monto_bruto, broker, es_bono=False):
+    """Una operación suelta (mismo cálculo que calcular_comisiones)."""
+    return float(calcular_comisiones([monto_bruto], [broker], [es_bono])[0])
+
+# --- NORMALIZACIÓN DE DATOS DE LA PLANILLA (compartida por database, nav y ledger) ---
+def normalizar_ticker(t):
+    """Mayúsculas sin espacios; los tickers locales sin sufijo llevan .BA ('' si viene vacío)."""
+    t = str(t).strip().upper()
+    if t and '.' not in t and len(t) < 9: return f"{t}.BA"
+    return t
+
+def columna_num(df, col):
+    """Columna numérica (0.0 si falta o no se puede convertir)."""
+    if col not in df.columns: return pd.Series(0.0, index=df.index)
+    return pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+
+# --- INDICADORES (Pipeline compartido en indicators.py) ---
+COLS_INDICADORES = ['Precio', 'RSI', 'Caida_30d', 'Caida_5d', 'Var_Ayer']
+COLS_SCREEN_CEDEARS = ['Precio', 'RSI_14', 'Caida_30d', 'Caida_5d', 'Consenso_RSI', 'SMA_70', 'Dias_Bajo_SMA']
+
+def calcular_indicadores(df_historico_raw, moneda='ARS', df_mep=None):
+    if df_historico_raw.empty: return pd.DataFrame()
+    params = (moneda, _version_mep(moneda, df_mep))
+    return _memo('indicadores', version_historial(df_historico_raw), params,
+                 lambda: _calcular_indicadores(precios_en_moneda(df_historico_raw, moneda, df_mep))).copy()
+
+def _calcular_indicadores(df_historico_raw):
+    if df_historico_raw.empty: return pd.DataFrame()
+
+    # Datos insuficientes (< 15 precios) quedan afuera
+    df_resumen = indicators.evaluar(df_historico_raw, COLS_INDICADORES, min_datos=15,
+                                    version=version_historial(df_historico_raw))
+    if df_resumen.empty: return pd.DataFrame()
+    
+    df_resumen['Caida_30d'] = pd.to_numeric(df_resumen['Caida_30d'], errors='coerce').fillna(0)
+    df_resumen['Caida_5d'] = pd.to_numeric(df_resumen['Caida_5d'], errors='coerce').fillna(0)
+    df_resumen['Suma_Caidas'] = df_resumen['Caida_30d'].abs() + df_resumen['Caida_5d'].abs()
+    
+    conditions = [
+        (df_resumen['RSI'] >= 60) & (df_resumen['Suma_Caidas'] > 0.10),
+        (df_resumen['RSI'] >= 40) & (df_resumen['RSI'] < 60) & (df_resumen['Suma_Caidas'] > 0.12),
+        (df_resumen['RSI'] < 40) & (df_resumen['Suma_Caidas'] > 0.15) & (df_resumen['RSI'] > 0)
+    ]
+    df_resumen['Senal'] = np.select(conditions, ['COMPRAR']*3, default='NEUTRO')
+    df_resumen.loc[df_resumen['RSI'].isna(), 'Senal'] = 'PENDIENTE'
+    
+    return df_resumen
+
+# --- NUEVA FUNCIÓN: SIMULADOR DE RSI ---
+def calcular_rsi_simulado(df_historico, ticker, precio_nuevo):
+    if ticker not in df_historico.columns: return None
+    
+    # Tomamos la serie y agregamos el precio simulado como si fuera el cierre de hoy (o mañana)
+    serie = df_historico[ticker].dropna()
+    if serie.empty: return None
+    valores = np.append(serie.to_numpy(dtype=float), float(precio_nuevo))
+    
+    rsi = indicators.evaluar(pd.DataFrame({ticker: valores}), ['RSI_14'])
+    if rsi.empty or pd.isna(rsi['RSI_14'].iloc[0]): return None
+    return rsi['RSI_14'].iloc[0]
+
+# ... [Resto de funciones omitidas sin cambios: analizar_portafolio, calcular_mep] ...
+def analizar_portafolio(df_portafolio, series_precios_actuales, moneda='ARS', df_mep=None):
+    if df_portafolio.empty: return pd.DataFrame()
+    if moneda != 'ARS':
+        if moneda not in MONEDAS: raise ValueError(f"Moneda no soportada: {moneda}")
+        if df_mep is None or df_mep.empty: return pd.DataFrame()
+        version_port = int(pd.util.hash_pandas_object(df_portafolio.astype(str)).sum())
+        params = (moneda, version_historial(df_mep), int(pd.util.hash_pandas_object(series_precios_actuales).sum()))
+        return _memo('portafolio', version_port, params,
+                     lambda: _portafolio_a_usd(analizar_portafolio(df_portafolio, series_precios_actuales), df_mep)).copy()
+
+    df = df_portafolio.copy()
+    df_precios = series_precios_actuales.to_frame(name='Precio_Actual')
+    df = df.merge(df_precios, left_on='Ticker', right_index=True, how='left')
+
+    # Todos los lotes a la vez (antes df.apply fila por fila); los lotes sin precio quedan en 0
+    p_actual = pd.to_numeric(df['Precio_Actual'], errors='coerce').to_numpy(dtype=float)
+    con_precio = ~np.isnan(p_actual) & (p_actual != 0.0)
+    p_compra = pd.to_numeric(df['Precio_Compra'], errors='coerce').to_numpy(dtype=float)
+    cant = pd.to_numeric(df['Cantidad'], errors='coerce').to_numpy(dtype=float)
+    brokers = df['Broker'].to_numpy(dtype=object) if 'Broker' in df.columns else np.full(len(df), 'DEFAULT', dtype=object)
+    es_bono = df['Ticker'].map(_es_bono).to_numpy(dtype=bool)
+    divisor = np.where(es_bono, 100.0, 1.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        monto_compra_puro = (p_compra * cant) / divisor
+        valor_bruto_actual = (p_actual * cant) / divisor
+        inversion_total = monto_compra_puro + calcular_comisiones(monto_compra_puro, brokers, es_bono)
+        valor_neto_salida = valor_bruto_actual - calcular_comisiones(valor_bruto_actual, brokers, es_bono)
+        gan_bruta_monto = valor_bruto_actual - monto_compra_puro
+        gan_neta_monto = valor_neto_salida - inversion_total
+        pct_bruta = np.where(monto_compra_puro != 0, (valor_bruto_actual / monto_compra_puro) - 1, 0.0)
+        pct_neta = np.where(inversion_total != 0, gan_neta_monto / inversion_total, 0.0)
+
+    cols_calc = ['Inversion_Total', 'Valor_Actual', 'Valor_Salida_Neto', 
+                 'Ganancia_Bruta_Monto', 'Ganancia_Neta_Monto', 
+                 '%_Ganancia_Bruta', '%_Ganancia_Neto']
+    valores = [inversion_total, valor_bruto_actual, valor_neto_salida, gan_bruta_monto, gan_neta_monto, pct_bruta, pct_neta]
+    for col, vals in zip(cols_calc, valores):
+        df[col] = np.where(con_precio, vals, 0.0)
+
+    df['%_Ganancia_Bruta'] = df['%_Ganancia_Bruta'].replace([np.inf, -np.inf], np.nan)
+    df['%_Ganancia_Neto'] = df['%_Ganancia_Neto'].replace([np.inf, -np.inf], np.nan)
+
+    cond_stop_loss = (df['Alerta_Baja'] > 0) & (df['Precio_Actual'] <= df['Alerta_Baja'])
+    cond_take_profit = (df['Alerta_Alta'] > 0) & (df['Precio_Actual'] >= df['Alerta_Alta'])
+    
+    conditions = [cond_stop_loss, cond_take_profit]
+    df['Senal_Venta'] = np.select(conditions, ['STOP LOSS', 'TAKE PROFIT'], default='NEUTRO')
+    df.loc[df['Precio_Actual'].isna(), 'Senal_Venta'] = 'PRECIO FALTANTE'
+
+    return df
+
+def _portafolio_a_usd(df, df_mep):
+    """Inversión al MEP de la fecha de compra; valores actuales al último MEP."""
+    df = df.copy()
+    fechas = pd.to_datetime(df['Fecha_Compra'], errors='coerce')
+    mep_hoy = df_mep['MEP'].dropna().iloc[-1]
+    mep_compra = _mep_a_fechas(df_mep, pd.DatetimeIndex(fechas.fillna(df_mep.index[-1]))).to_numpy()
+
+    en_dolares = df['Ticker'].map(_cotiza_en_dolares).to_numpy(dtype=bool)
+    mc = np.where(en_dolares, 1.0, mep_compra)
+    mh = np.where(en_dolares, 1.0, mep_hoy)
+
+    monto_compra = (df['Valor_Actual'] - df['Ganancia_Bruta_Monto']) / mc
+    df['Precio_Compra'] = df['Precio_Compra'] / mc
+    df['Inversion_Total'] = df['Inversion_Total'] / mc
+    for c in ['Precio_Actual', 'Valor_Actual', 'Valor_Salida_Neto', 'Alerta_Alta', 'Alerta_Baja']:
+        if c in df.columns: df[c] = df[c] / mh
+
+    df['Ganancia_Bruta_Monto'] = df['Valor_Actual'] - monto_compra
+    df['Ganancia_Neta_Monto'] = df['Valor_Salida_Neto'] - df['Inversion_Total']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['%_Ganancia_Bruta'] = (df['Valor_Actual'] / monto_compra) - 1
+        df['%_Ganancia_Neto'] = df['Ganancia_Neta_Monto'] / df['Inversion_Total']
+
+    # Lotes sin precio quedan en 0 como en la versión en pesos
+    sin_precio = df['Valor_Actual'].fillna(0) == 0
+    df.loc[sin_precio, ['Ganancia_Bruta_Monto', 'Ganancia_Neta_Monto', '%_Ganancia_Bruta', '%_Ganancia_Neto']] = 0
+    df['%_Ganancia_Bruta'] = df['%_Ganancia_Bruta'].replace([np.inf, -np.inf], np.nan)
+    df['%_Ganancia_Neto'] = df['%_Ganancia_Neto'].replace([np.inf, -np.inf], np.nan)
+    return df
+
+def convertir_montos_a_usd(montos, fechas, df_mep):
+    """Convierte montos en pesos al MEP de su fecha (ej: Resultado_Neto a la Fecha_Venta)."""
+    if df_mep is None or df_mep.empty: return pd.Series(np.nan, index=montos.index)
+    fechas = pd.to_datetime(fechas, errors='coerce').fillna(df_mep.index[-1])
+    mep = _mep_a_fechas(df_mep, pd.DatetimeIndex(fechas)).to_numpy()
+    return montos / mep
+
+# --- MEMO POR VERSIÓN DE HISTORIAL ---
+# Los resultados derivados del historial se guardan por (nombre, versión, parámetros):
+# un rerun con el mismo historial no recalcula nada.
+_MEMO = OrderedDict()
+_MEMO_MAX = 64
+
+def version_historial(df):
+    """Huella barata del contenido de un DataFrame de precios (forma, extremos, suma y última fila)."""
+    if df is None or df.empty: return None
+    valores = df.to_numpy(dtype=float, na_value=np.nan)
+    return hash((df.shape, str(df.index[0]), str(df.index[-1]), tuple(df.columns),
+                 float(np.nansum(valores)), valores[-1].tobytes()))
+
+def _memo(nombre, version, params, func):
+    if version is None: return func()
+    clave = (nombre, version, params)
+    if clave in _MEMO:
+        _MEMO.move_to_end(clave)
+        tracing.contar('cache.memo', f"{nombre} hit")
+        return _MEMO[clave]
+    tracing.contar('cache.memo', f"{nombre} miss")
+    with tracing.span(f"calc.{nombre}"): resultado = func()
+    _MEMO[clave] = resultado
+    if len(_MEMO) > _MEMO_MAX: _MEMO.popitem(last=False)
+    return resultado
+
+# --- DÓLAR IMPLÍCITO (MEP / CCL) ---
+def pares_fx(columnas, sufijo='D'):
+    """Pares (peso, dólar) presentes: AL30.BA -> AL30D.BA para MEP, AL30C.BA para CCL."""
+    cols = set(columnas)
+    pares = []
+    for t in columnas:
+        if not _es_bono(t) or not str(t).endswith('.BA'): continue
+        base = str(t)[:-3]
+        if base.endswith(('D', 'C')): continue
+        dolar = f"{base}{sufijo}.BA"
+        if dolar in cols: pares.append((t, dolar))
+    return pares
+
+def _calcular_serie_fx(df_raw, sufijo):
+    pares = pares_fx(df_raw.columns, sufijo)
+    if not pares: return pd.DataFrame()
+
+    pesos = df_raw[[p for p, _ in pares]].to_numpy(dtype=float, na_value=np.nan)
+    dolares = df_raw[[d for _, d in pares]].to_numpy(dtype=float, na_value=np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matriz = pesos / dolares
+    matriz[~np.isfinite(matriz) | (matriz <= 0)] = np.nan
+
+    df_fx = pd.DataFrame(matriz, index=df_raw.index, columns=[p.replace('.BA', '') for p, _ in pares])
+    df_fx['MEP'] = _mediana_filas(matriz)
+    return df_fx[df_fx['MEP'].notna()]
+
+def _mediana_filas(matriz):
+    # nanmedian sin el warning de filas completamente vacías
+    validas = ~np.isnan(matriz).all(axis=1)
+    resultado = np.full(matriz.shape[0], np.nan)
+    if validas.any(): resultado[validas] = np.nanmedian(matriz[validas], axis=1)
+    return resultado
+
+def calcular_serie_mep(df_raw, sufijo='D'):
+    """
+    Serie histórica del dólar implícito para todos los pares bono peso/dólar presentes,
+    en una sola operación matricial. La columna 'MEP' es la mediana entre pares.
+    sufijo='D' -> MEP, sufijo='C' -> CCL.
+    """
+    if df_raw is None or df_raw.empty: return pd.DataFrame()
+    return _memo('serie_fx', version_historial(df_raw), (sufijo,), lambda: _calcular_serie_fx(df_raw, sufijo))
+
+def ultimo_mep(df_mep):
+    if df_mep is None or df_mep.empty: return None, None
+    serie = df_mep['MEP'].dropna()
+    if serie.empty: return None, None
+    ultimo = serie.iloc[-1]
+    variacion = (ultimo / serie.iloc[-2]) - 1 if len(serie) >= 2 else 0.0
+    return ultimo, variacion
+
+def actualizar_mep_incremental(df_mep, precios_hoy, fecha=None, sufijo='D'):
+    """Recalcula solo la fila de hoy con las cotizaciones nuevas; los pares sin cotización mantienen su último valor."""
+    fecha = pd.Timestamp.now().normalize() if fecha is None else pd.Timestamp(fecha).normalize()
+    pares = pares_fx(list(precios_hoy.keys()), sufijo)
+
+    fila = {}
+    if df_mep is not None and not df_mep.empty:
+        fila = df_mep.drop(columns='MEP').ffill().iloc[-1].to_dict()
+    for peso, dolar in pares:
+        p, d = precios_hoy.get(peso), precios_hoy.get(dolar)
+        if p and d and p > 0 and d > 0: fila[peso.replace('.BA', '')] = p / d
+    if not fila: return df_mep if df_mep is not None else pd.DataFrame()
+
+    valores = np.array([list(fila.values())], dtype=float)
+    fila['MEP'] = _mediana_filas(valores)[0]
+    nueva = pd.DataFrame([fila], index=[fecha])
+
+    if df_mep is None or df_mep.empty: return nueva
+    base = df_mep[df_mep.index.normalize() < fecha]
+    return pd.concat([base, nueva])
+
+def calcular_mep(df_raw):
+    if df_raw.empty: return None, None
+    return ultimo_mep(calcular_serie_mep(df_raw))
+
+# --- MONEDA (ARS / USD vía MEP diario) ---
+MONEDAS = ['ARS', 'USD']
+
+def _cotiza_en_dolares(ticker):
+    # Especies D/C de bonos ya cotizan en dólares: no se convierten
+    t = str(ticker).upper()
+    return _es_bono(t) and t.endswith(('D.BA', 'C.BA'))
+
+def _mep_a_fechas(df_mep, fechas):
+    """MEP vigente (último conocido) en cada fecha; antes del inicio de la serie usa el primer valor."""
+    serie = df_mep['MEP'].dropna()
+    serie = serie[~serie.index.duplicated(keep='last')].sort_index()
+    alineado = serie.reindex(serie.index.union(fechas.unique())).ffill().bfill()
+    return alineado.reindex(fechas)
+
+def _version_mep(moneda, df_mep):
+    if moneda == 'ARS': return None
+    return version_historial(df_mep) if df_mep is not None else 'propio'
+
+def convertir_a_usd(df_precios, df_mep=None):
+    """
+    Divide toda la matriz de precios por el MEP diario alineado por fecha, en una sola operación.
+    Si no se pasa df_mep se usa el MEP implícito del propio historial. El resultado se comparte
+    entre reruns (memo por versión): no modificarlo in-place.
+    """
+    if df_precios.empty: return pd.DataFrame()
+    if df_mep is None: df_mep = calcular_serie_mep(df_precios)
+    if df_mep is None or df_mep.empty: return pd.DataFrame()
+
+    def _convertir():
+        mep = _mep_a_fechas(df_mep, pd.DatetimeIndex(df_precios.index)).to_numpy()
+        divisor = np.where([_cotiza_en_dolares(c) for c in df_precios.columns], 1.0, mep[:, None])
+        return pd.DataFrame(df_precios.to_numpy(dtype=float, na_value=np.nan) / divisor,
+                            index=df_precios.index, columns=df_precios.columns)
+
+    return _memo('usd', version_historial(df_precios), (version_historial(df_mep),), _convertir)
+
+def precios_en_moneda(df_precios, moneda='ARS', df_mep=None):
+    if moneda == 'ARS': return df_precios
+    if moneda == 'USD': return convertir_a_usd(df_precios, df_mep)
+    raise ValueError(f"Moneda no soportada: {moneda}")
+
+# --- EN MARKET_LOGIC.PY ---
+
+def calcular_screen_cedears(df_historico_raw, moneda='ARS', df_mep=None):
+    """
+    Calcula métricas estándar + Consenso RSI + SMA 70 + Racha bajista vs SMA 70.
+    """
+    if df_historico_raw.empty: return pd.DataFrame()
+    params = (moneda, _version_mep(moneda, df_mep))
+    return _memo('screen_cedears', version_historial(df_historico_raw), params,
+                 lambda: _calcular_screen_cedears(precios_en_moneda(df_historico_raw, moneda, df_mep))).copy()
+
+def _calcular_screen_cedears(df_historico_raw):
+    if df_historico_raw.empty: return pd.DataFrame()
+
+    # Necesitamos historial suficiente para SMA 70
+    df_resumen = indicators.evaluar(df_historico_raw, COLS_SCREEN_CEDEARS, min_datos=75,
+                                    version=version_historial(df_historico_raw))
+    if df_resumen.empty: return pd.DataFrame()
+    df_resumen['Dias_Bajo_SMA'] = df_resumen['Dias_Bajo_SMA'].astype(int)
     return df_resumen
\ No newline at end of file
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import market_logic
+
+# Serie diaria de la cartera: tenencias (fechas x tickers) construidas con sumas acumuladas
+# de los movimientos, multiplicadas por la matriz de precios. Sin loops por día.
+COLS_NAV = ['Valor_Mercado', 'Capital_Invertido', 'Ganancia_Latente', 'Ganancia_Realizada', 'Resultado_Total', 'Drawdown']
+
+
+def construir_movimientos(df_portafolio, df_historial):
+    """
+    Une lotes abiertos y ventas realizadas en una tabla de movimientos:
+    Fecha, Ticker, Cantidad (+compra / -venta), Costo (capital que entra o sale) y Realizado.
+    """
+    partes = []
+
+    if df_portafolio is not None and not df_portafolio.empty:
+        p = pd.DataFrame({
+            'Fecha': pd.to_datetime(df_portafolio['Fecha_Compra'], errors='coerce'),
+            'Ticker': df_portafolio['Ticker'].map(market_logic.normalizar_ticker),
+            'Cantidad': market_logic.columna_num(df_portafolio, 'Cantidad'),
+        })
+        precio = market_logic.columna_num(df_portafolio, 'Precio_Compra')
+        broker = df_portafolio['Broker'] if 'Broker' in df_portafolio.columns else pd.Series('DEFAULT', index=df_portafolio.index)
+        es_bono = p['Ticker'].map(market_logic._es_bono)
+        monto = p['Cantidad'] * precio / np.where(es_bono, 100, 1)
+        p['Costo'] = monto + market_logic.calcular_comisiones(monto, broker, es_bono)
+        p['Realizado'] = 0.0
+        partes.append(p)
+
+    if df_historial is not None and not df_historial.empty and {'Ticker', 'Fecha_Compra', 'Fecha_Venta'} <= set(df_historial.columns):
+        ticker = df_historial['Ticker'].map(market_logic.normalizar_ticker)
+        cantidad = market_logic.columna_num(df_historial, 'Cantidad')
+        costo = market_logic.columna_num(df_historial, 'Costo_Total_Origen')
+        # La venta entra como compra en su fecha original y sale en la fecha de venta
+        partes.append(pd.DataFrame({
+            'Fecha': pd.to_datetime(df_historial['Fecha_Compra'], errors='coerce'),
+            'Ticker': ticker, 'Cantidad': cantidad, 'Costo': costo, 'Realizado': 0.0,
+        }))
+        partes.append(pd.DataFrame({
+            'Fecha': pd.to_datetime(df_historial['Fecha_Venta'], errors='coerce'),
+            'Ticker': ticker, 'Cantidad': -cantidad, 'Costo': -costo,
+            'Realizado': market_logic.columna_num(df_historial, 'Resultado_Neto'),
+        }))
+
+    if not partes: return pd.DataFrame(columns=['Fecha', 'Ticker', 'Cantidad', 'Costo', 'Realizado'])
+    mov = pd.concat(partes, ignore_index=True)
+    return mov[mov['Fecha'].notna()].sort_values('Fecha', kind='stable').reset_index(drop=True)
+
+
+def version_movimientos(mov):
+    if mov.empty: return 0
+    return int(pd.util.hash_pandas_object(mov, index=False).sum())
+
+
+def agregar_precios_hoy(df_precios, precios_actuales, fecha=None):
+    """Agrega (o reemplaza) la fila de hoy con los precios en vivo y completa con el último cierre."""
+    if precios_actuales is None or precios_actuales.empty: return df_precios
+    fecha = pd.Timestamp.now().normalize() if fecha is None else pd.Timestamp(fecha).normalize()
+    fila = pd.DataFrame([precios_actuales.to_dict()], index=[fecha])
+    if df_precios is None or df_precios.empty: return fila
+    base = df_precios[df_precios.index.normalize() < fecha]
+    return pd.concat([base, fila]).ffill()
+
+
+def _calcular_tramo(mov, df_precios, desde, tenencia_inicial, acumulados_iniciales):
+    """Calcula las filas df_precios[desde:] partiendo de la tenencia y acumulados previos."""
+    fechas = pd.DatetimeIndex(df_precios.index).normalize()
+    tickers = list(df_precios.columns)
+    n = len(fechas)
+    col_idx = pd.Index(tickers)
+
+    # Movimientos: fila = primer día hábil >= fecha del movimiento
+    fila = np.searchsorted(fechas.values, mov['Fecha'].dt.normalize().values, side='left')
+    col = col_idx.get_indexer(mov['Ticker'])
+    en_rango = (fila < n) & (col >= 0)
+    # Los movimientos anteriores al tramo ya están en la tenencia inicial
+    en_tramo = en_rango & (fila >= desde)
+    fila_t = np.maximum(fila[en_tramo] - desde, 0)
+
+    filas_tramo = n - desde
+    deltas = np.zeros((filas_tramo, len(tickers)))
+    np.add.at(deltas, (fila_t, col[en_tramo]), mov['Cantidad'].to_numpy()[en_tramo])
+    tenencia = np.cumsum(deltas, axis=0) + tenencia_inicial
+
+    costo = np.cumsum(np.bincount(fila_t, weights=mov['Costo'].to_numpy()[en_tramo], minlength=filas_tramo))
+    realizado = np.cumsum(np.bincount(fila_t, weights=mov['Realizado'].to_numpy()[en_tramo], minlength=filas_tramo))
+
+    divisor = np.where([market_logic._es_bono(t) for t in tickers], 100.0, 1.0)
+    precios = np.nan_to_num(df_precios.iloc[desde:].to_numpy(dtype=float, na_value=np.nan)) / divisor
+    valor = np.einsum('ij,ij->i', tenencia, precios)
+
+    nav = pd.DataFrame({
+        'Valor_Mercado': valor,
+        'Capital_Invertido': costo + acumulados_iniciales[0],
+        'Ganancia_Realizada': realizado + acumulados_iniciales[1],
+    }, index=df_precios.index[desde:])
+    return nav
+
+
+def _completar_columnas(nav):
+    nav['Ganancia_Latente'] = nav['Valor_Mercado'] - nav['Capital_Invertido']
+    nav['Resultado_Total'] = nav['Ganancia_Latente'] + nav['Ganancia_Realizada']
+    nav['Drawdown'] = nav['Resultado_Total'] - nav['Resultado_Total'].cummax()
+    return nav[COLS_NAV]
+
+
+def calcular_nav(df_portafolio, df_historial, df_precios, estado_previo=None):
+    """
+    Serie diaria de valor de mercado, capital invertido y resultado realizado + latente.
+    Si estado_previo corresponde a las mismas operaciones, tickers y precios pasados, solo se
+    recalculan la última fila conocida (el precio de hoy cambia) y los días nuevos.
+    Devuelve (df_nav, estado) donde estado se pasa en la siguiente llamada.
+    """
+    if df_precios is None or df_precios.empty: return pd.DataFrame(columns=COLS_NAV), None
+    # Un hueco en la historia (o sin precios en vivo) vale el último cierre, no 0
+    df_precios = df_precios.sort_index().ffill()
+    mov = construir_movimientos(df_portafolio, df_historial)
+    version = version_movimientos(mov)
+    tickers = tuple(df_precios.columns)
+
+    desde, tenencia, acumulados, nav_base = 0, np.zeros(len(tickers)), (0.0, 0.0), None
+    if estado_previo and estado_previo['version'] == version and estado_previo['tickers'] == tickers:
+        nav_prev = estado_previo['nav']
+        # Se recalcula desde la última fecha del estado previo (incluida)
+        desde = int(np.searchsorted(df_precios.index.values, nav_prev.index[-1].to_datetime64(), side='left'))
+        misma_fecha = desde < len(df_precios) and df_precios.index[desde] == nav_prev.index[-1]
+        # Precios pasados reescritos (resync de Sheets, tabla de ajustes de calidad): se recalcula todo
+        mismos_precios = market_logic.version_historial(df_precios.iloc[:desde]) == estado_previo.get('precios')
+        if desde > 0 and misma_fecha and len(nav_prev) >= 2 and mismos_precios:
+            tenencia = estado_previo['tenencia_ante']
+            acumulados = estado_previo['acumulados_ante']
+            nav_base = nav_prev.iloc[:-1]
+        else:
+            desde = 0
+
+    tramo = _calcular_tramo(mov, df_precios, desde, tenencia, acumulados)
+    nav = pd.concat([nav_base.drop(columns=['Ganancia_Latente', 'Resultado_Total', 'Drawdown']), tramo]) if nav_base is not None else tramo
+    nav = _completar_columnas(nav)
+
+    # Para la próxima llamada guardamos la tenencia previa a la última fila
+    ultimo = len(df_precios) - 1
+    if ultimo >= 1:
+        tenencia_ante = _tenencia_hasta(mov, df_precios, ultimo)
+        acumulados_ante = (nav['Capital_Invertido'].iloc[-2], nav['Ganancia_Realizada'].iloc[-2])
+    else:
+        tenencia_ante, acumulados_ante = np.zeros(len(tickers)), (0.0, 0.0)
+
+    estado = {'version': version, 'tickers': tickers, 'nav': nav,
+              'precios': market_logic.version_historial(df_precios.iloc[:ultimo]),
+              'tenencia_ante': tenencia_ante, 'acumulados_ante': acumulados_ante}
+    return nav, estado
+
+
+def _tenencia_hasta(mov, df_precios, fila_limite):
+    """Tenencia acumulada por ticker con los movimientos anteriores a fila_limite."""
+    fechas = pd.DatetimeIndex(df_precios.index).normalize()
+    fila = np.searchsorted(fechas.values, mov['Fecha'].dt.normalize().values, side='left')
+    col = pd.Index(df_precios.columns).get_indexer(mov['Ticker'])
+    sel = (fila < fila_limite) & (col >= 0)
+    tenencia = np.zeros(len(df_precios.columns))
+    np.add.at(tenencia, col[sel], mov['Cantidad'].to_numpy()[sel])
+    return tenencia
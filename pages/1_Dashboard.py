@@ -1,93 +1,148 @@
-import streamlit as st
-import pandas as pd
-import altair as alt
-import database
-import market_logic
-import manager
-
-st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
-st.title("📊 Rendimiento del Portafolio")
-
-# --- CRÍTICO: BOTÓN DE ACTUALIZACIÓN LOCAL ---
-if st.button("🔄 Actualizar Datos de Mercado"):
-    # Llamada a la función que actualiza SOLO IOL
-    manager.actualizar_solo_iol() 
-    st.rerun()
-
-if 'precios_actuales' not in st.session_state or st.session_state.precios_actuales.empty:
-    # CRÍTICO: Si no hay precios, el Dashboard debe forzar la carga de la Cartera.
-    manager.actualizar_solo_iol() # Forzar la carga al inicio
-    st.warning("⚠️ Sin precios. Forzando actualización inicial.")
-    # No st.rerun() aquí para evitar bucle, solo si falla la carga.
-    if st.session_state.precios_actuales.empty: st.stop()
-
-
-# --- CARGA DATOS ---
-try:
-    df_port = database.get_portafolio_df()
-    df_hist = database.get_historial_df()
-except Exception as e:
-    st.error(f"Error BD: {e}")
-    st.stop()
-
-# --- CÁLCULOS ---
-# ... (Bloque de cálculos idéntico) ...
-ganancia_latente = 0.0
-valor_cartera = 0.0
-ganancia_realizada = 0.0
-
-# 1. Tenencia
-df_validos = pd.DataFrame()
-if not df_port.empty:
-    # Esta función ya fue restaurada en market_logic.py
-    df_analizado = market_logic.analizar_portafolio(df_port, st.session_state.precios_actuales)
-    if 'Valor_Actual' in df_analizado.columns:
-        df_validos = df_analizado[df_analizado['Valor_Actual'] > 0].copy()
-        ganancia_latente = df_validos['Ganancia_Neta_Monto'].sum()
-        valor_cartera = df_validos['Valor_Salida_Neto'].sum()
-
-# 2. Historial
-if not df_hist.empty and 'Resultado_Neto' in df_hist.columns:
-    ganancia_realizada = df_hist['Resultado_Neto'].sum()
-
-resultado_global = ganancia_latente + ganancia_realizada
-
-# --- UI MÉTRICAS ---
-c1, c2, c3, c4 = st.columns(4)
-c1.metric("Valor Cartera", f"${valor_cartera:,.0f}")
-c2.metric("Ganancia Latente", f"${ganancia_latente:,.0f}")
-c3.metric("Ganancia Realizada", f"${ganancia_realizada:,.0f}")
-c4.metric("Total", f"${resultado_global:,.0f}")
-
-st.divider()
-
-# --- DIAGNÓSTICO RÁPIDO (Opcional, útil para forzar recargas) ---
-with st.expander("⚙️ Opciones de Datos", expanded=False):
-    c_op1, c_op2 = st.columns([1, 5])
-    
-    with c_op1:
-        if st.button("🔄 Recargar DB"):
-            st.cache_data.clear()
-            st.rerun()
-            
-    with c_op2:
-        if df_hist.empty:
-            st.warning("El historial parece vacío.")
-        else:
-            st.caption(f"Historial cargado: {len(df_hist)} operaciones procesadas.")
-            st.caption("Usa 'Recargar DB' si editaste Google Sheet manualmente.")
-
-# --- GRÁFICOS ---
-if not df_validos.empty:
-    g1, g2 = st.columns(2)
-    with g1:
-        base = alt.Chart(df_validos).encode(theta=alt.Theta("Valor_Actual", stack=True), color="Ticker", tooltip=["Ticker", "Valor_Actual"])
-        st.altair_chart(base.mark_arc(outerRadius=120), width='stretch')
-    with g2:
-        chart = alt.Chart(df_validos).mark_bar().encode(
-            x=alt.X('Ticker', sort='-y'), 
-            y='Ganancia_Neta_Monto',
-            color=alt.condition(alt.datum.Ganancia_Neta_Monto > 0, alt.value("green"), alt.value("red")),
-            tooltip=["Ticker", "Ganancia_Neta_Monto"]
-        )
-        st.altair_chart(chart, width='stretch')
\ No newline at end of file
+import streamlit as st
+import pandas as pd
+import database
+import market_logic
+import manager
+import nav
+import ledger
+import perfilado
+
+st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
+perfilado.iniciar('dashboard')
+st.title("📊 Rendimiento del Portafolio")
+moneda = manager.selector_moneda()
+simbolo = "US$" if moneda == 'USD' else "$"
+
+# --- CRÍTICO: BOTÓN DE ACTUALIZACIÓN LOCAL ---
+if st.button("🔄 Actualizar Datos de Mercado"):
+    # Llamada a la función que actualiza SOLO IOL
+    manager.actualizar_solo_iol() 
+    st.rerun()
+
+if 'precios_actuales' not in st.session_state or st.session_state.precios_actuales.empty:
+    # CRÍTICO: Si no hay precios, el Dashboard debe forzar la carga de la Cartera.
+    manager.actualizar_solo_iol() # Forzar la carga al inicio
+    st.warning("⚠️ Sin precios. Forzando actualización inicial.")
+    # No st.rerun() aquí para evitar bucle, solo si falla la carga.
+    if st.session_state.precios_actuales.empty: st.stop()
+
+
+# --- CARGA DATOS ---
+try:
+    df_port = database.get_portafolio_df()
+    df_hist = database.get_historial_df()
+except Exception as e:
+    st.error(f"Error BD: {e}")
+    st.stop()
+
+# --- CÁLCULOS ---
+# ... (Bloque de cálculos idéntico) ...
+ganancia_latente = 0.0
+valor_cartera = 0.0
+ganancia_realizada = 0.0
+
+# 1. Tenencia
+df_validos = pd.DataFrame()
+if not df_port.empty:
+    # Esta función ya fue restaurada en market_logic.py
+    df_analizado = market_logic.analizar_portafolio(df_port, st.session_state.precios_actuales, moneda=moneda, df_mep=manager.get_serie_mep() if moneda == 'USD' else None)
+    if 'Valor_Actual' in df_analizado.columns:
+        df_validos = df_analizado[df_analizado['Valor_Actual'] > 0].copy()
+        ganancia_latente = df_validos['Ganancia_Neta_Monto'].sum()
+        valor_cartera = df_validos['Valor_Salida_Neto'].sum()
+
+# 2. Historial
+if not df_hist.empty and 'Resultado_Neto' in df_hist.columns:
+    if moneda == 'USD' and 'Fecha_Venta' in df_hist.columns:
+        ganancia_realizada = market_logic.convertir_montos_a_usd(df_hist['Resultado_Neto'], df_hist['Fecha_Venta'], manager.get_serie_mep()).sum()
+    else:
+        ganancia_realizada = df_hist['Resultado_Neto'].sum()
+
+resultado_global = ganancia_latente + ganancia_realizada
+
+# --- UI MÉTRICAS ---
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Valor Cartera", f"{simbolo}{valor_cartera:,.0f}")
+c2.metric("Ganancia Latente", f"{simbolo}{ganancia_latente:,.0f}")
+c3.metric("Ganancia Realizada", f"{simbolo}{ganancia_realizada:,.0f}")
+c4.metric("Total", f"{simbolo}{resultado_global:,.0f}")
+
+st.divider()
+
+# --- DIAGNÓSTICO RÁPIDO (Opcional, útil para forzar recargas) ---
+with st.expander("⚙️ Opciones de Datos", expanded=False):
+    c_op1, c_op2 = st.columns([1, 5])
+    
+    with c_op1:
+        if st.button("🔄 Recargar DB"):
+            st.cache_data.clear()
+            database.invalidar_lecturas()
+            st.rerun()
+            
+    with c_op2:
+        if df_hist.empty:
+            st.warning("El historial parece vacío.")
+        else:
+            st.caption(f"Historial cargado: {len(df_hist)} operaciones procesadas.")
+            st.caption("Usa 'Recargar DB' si editaste Google Sheet manualmente.")
+
+# --- RESULTADOS REALIZADOS (LEDGER) ---
+with st.expander("📒 Resultados Realizados", expanded=False):
+    if df_hist.empty:
+        st.caption("Sin ventas registradas.")
+    else:
+        st.session_state.ledger = ledger.actualizar_ledger(st.session_state.get('ledger'), df_port, df_hist)
+        metodo = st.radio("Imputación", list(ledger.METODOS.keys()), horizontal=True, key="ledger_metodo",
+                          help="FIFO: primero los lotes más viejos. Promedio: costo promedio ponderado. Lote: el lote elegido al vender.")
+        tabs = st.tabs(["Por Ticker", "Por Broker", "Por Mes", "Por Año"])
+        formato = {"Ingreso": st.column_config.NumberColumn(format="$%.0f"),
+                   "Costo": st.column_config.NumberColumn(format="$%.0f"),
+                   "Resultado": st.column_config.NumberColumn(format="$%.0f")}
+        for tab, dim in zip(tabs, ledger.DIMENSIONES):
+            with tab:
+                st.dataframe(ledger.resumen(st.session_state.ledger, dim, metodo), column_config=formato, width='stretch')
+
+# --- GRÁFICOS ---
+# altair (~0.3 s de import) se carga acá: métricas y tablas ya se enviaron al navegador
+import altair as alt
+
+if not df_validos.empty:
+    g1, g2 = st.columns(2)
+    with g1:
+        base = alt.Chart(df_validos).encode(theta=alt.Theta("Valor_Actual", stack=True), color="Ticker", tooltip=["Ticker", "Valor_Actual"])
+        st.altair_chart(base.mark_arc(outerRadius=120), width='stretch')
+    with g2:
+        chart = alt.Chart(df_validos).mark_bar().encode(
+            x=alt.X('Ticker', sort='-y'), 
+            y='Ganancia_Neta_Monto',
+            color=alt.condition(alt.datum.Ganancia_Neta_Monto > 0, alt.value("green"), alt.value("red")),
+            tooltip=["Ticker", "Ganancia_Neta_Monto"]
+        )
+        st.altair_chart(chart, width='stretch')
+
+# --- EVOLUCIÓN DIARIA (NAV) ---
+st.divider()
+st.subheader("📈 Evolución de la Cartera")
+df_precios_nav = nav.agregar_precios_hoy(database.get_historical_prices_df(), st.session_state.precios_actuales)
+df_nav, st.session_state.nav_estado = nav.calcular_nav(df_port, df_hist, df_precios_nav, st.session_state.get('nav_estado'))
+
+if df_nav.empty or (df_nav['Capital_Invertido'] == 0).all():
+    st.caption("Sin historial de precios suficiente para reconstruir la evolución.")
+else:
+    df_nav = df_nav[df_nav['Capital_Invertido'].ne(0).cummax()]
+    df_plot = df_nav.reset_index(names='Fecha')
+    if moneda == 'USD': st.caption("La evolución diaria se muestra en pesos.")
+
+    n1, n2 = st.columns(2)
+    with n1:
+        lineas = alt.Chart(df_plot).transform_fold(['Valor_Mercado', 'Capital_Invertido'], as_=['Serie', 'Monto']).mark_line().encode(
+            x='Fecha:T', y='Monto:Q', color='Serie:N', tooltip=['Fecha:T', 'Serie:N', alt.Tooltip('Monto:Q', format=',.0f')]
+        )
+        st.altair_chart(lineas, width='stretch')
+    with n2:
+        resultado = alt.Chart(df_plot).transform_fold(['Resultado_Total', 'Drawdown'], as_=['Serie', 'Monto']).mark_area(opacity=0.5).encode(
+            x='Fecha:T', y=alt.Y('Monto:Q', stack=None), color='Serie:N', tooltip=['Fecha:T', 'Serie:N', alt.Tooltip('Monto:Q', format=',.0f')]
+        )
+        st.altair_chart(resultado, width='stretch')
+
+perfilado.terminar()
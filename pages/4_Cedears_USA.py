@@ -1,93 +1,86 @@
-import streamlit as st
-import database
-import market_logic
-import pandas as pd
-import numpy as np
-
-st.set_page_config(page_title="Cedears USA (RSI Multi)", layout="wide")
-
-st.title("🌎 Monitor CEDEARs (Estrategia Multi-RSI)")
-st.caption("Consenso de Sobreventa: Porcentaje de indicadores RSI (1 a 8 periodos) que están por debajo de 30.")
-
-# 1. Cargar Datos
-with st.spinner("Cargando historial y calculando matrices..."):
-    df_history = database.get_historical_prices_df(nombre_hoja="Historial_Cedears_Ext")
-
-if df_history.empty:
-    st.error("No se pudieron cargar los datos de 'Historial_Cedears_Ext'.")
-else:
-    # 2. Calcular usando la NUEVA función Multi-length
-    df_screen = market_logic.calcular_screen_cedears(df_history)
-    
-    if df_screen.empty:
-        st.warning("Datos insuficientes.")
-    else:
-        # 3. Estilos de la Tabla
-        # Resaltamos RSI 14 estándar como referencia
-        def style_rsi_std(val):
-            if val < 30: return 'color: red; font-weight: bold;'
-            return ''
-
-        # Ordenar: Primero los que tengan MAYOR CONSENSO de sobreventa
-        df_screen.sort_values(by=['Consenso_RSI', 'RSI_14'], ascending=[False, True], inplace=True)
-        
-# Formato columnas
-        column_config = {
-            "Precio": st.column_config.NumberColumn(format="$%.2f"),
-            "RSI_14": st.column_config.NumberColumn(format="%.1f", label="RSI (14)"),
-            
-            "Consenso_RSI": st.column_config.ProgressColumn(
-                label="Consenso RSI < 30",
-                help="% RSI corto plazo en sobreventa",
-                format="%.0f%%",
-                min_value=0,
-                max_value=1,
-            ),
-            
-            # NUEVAS COLUMNAS
-            "SMA_70": st.column_config.NumberColumn(format="$%.2f", label="SMA (70)"),
-            "Dias_Bajo_SMA": st.column_config.NumberColumn(
-                label="Días < SMA70",
-                help="Días hábiles consecutivos que el precio ha cerrado por debajo de la SMA 70.",
-                format="%d 📉" # Agrega un iconito visual
-            ),
-
-            "Caida_30d": st.column_config.NumberColumn(format="%.2%", label="Caída 30d"),
-        }
-        
-        # Agregamos los campos a la lista de visualización
-        cols_show = ['Precio', 'Consenso_RSI', 'Dias_Bajo_SMA', 'SMA_70', 'RSI_14', 'Caida_30d']
-
-        # Mostrar Tabla
-        st.dataframe(
-            df_screen[cols_show].style.map(style_rsi_std, subset=['RSI_14']),
-            use_container_width=True,
-            column_config=column_config,
-            height=700
-        )
-        
-        cols_show = ['Precio', 'Consenso_RSI', 'RSI_14', 'Caida_30d', 'Caida_5d']
-
-        # Mostrar Tabla
-        st.dataframe(
-            df_screen[cols_show].style.map(style_rsi_std, subset=['RSI_14']),
-            use_container_width=True,
-            column_config=column_config,
-            height=700
-        )
-
-        # --- SIMULADOR SIMPLE (Adaptado) ---
-        st.sidebar.header("🧪 Simulador")
-        lista_tickers = sorted(df_history.columns.tolist())
-        ticker_sim = st.sidebar.selectbox("Simular Activo", lista_tickers)
-        precio_ref = df_history[ticker_sim].iloc[-1]
-        
-        precio_input = st.sidebar.number_input("Precio Hipotético", value=float(precio_ref), format="%.2f")
-        
-        if st.sidebar.button("Calcular Impacto"):
-            # Usamos la función simple para RSI 14 solo como referencia rápida
-            rsi_sim = market_logic.calcular_rsi_simulado(df_history, ticker_sim, precio_input)
-            st.sidebar.metric("RSI (14) Simulado", f"{rsi_sim:.2f}" if rsi_sim else "--")
-            
-            diff = (precio_input / precio_ref) - 1
-            st.sidebar.caption(f"Variación: {diff:+.2%}")
\ No newline at end of file
+import streamlit as st
+import database
+import market_logic
+import pandas as pd
+import numpy as np
+import manager
+import perfilado
+
+st.set_page_config(page_title="Cedears USA (RSI Multi)", layout="wide")
+perfilado.iniciar('cedears')
+
+st.title("🌎 Monitor CEDEARs (Estrategia Multi-RSI)")
+st.caption("Consenso de Sobreventa: Porcentaje de indicadores RSI (1 a 8 periodos) que están por debajo de 30.")
+moneda = manager.selector_moneda()
+
+# 1. Cargar Datos
+with st.spinner("Cargando historial y calculando matrices..."):
+    df_history = database.get_historical_prices_df(nombre_hoja="Historial_Cedears_Ext")
+
+if df_history.empty:
+    st.error("No se pudieron cargar los datos de 'Historial_Cedears_Ext'.")
+else:
+    # 2. Calcular usando la NUEVA función Multi-length
+    df_screen = market_logic.calcular_screen_cedears(df_history, moneda=moneda, df_mep=manager.get_serie_mep() if moneda == 'USD' else None)
+    
+    if df_screen.empty:
+        st.warning("Datos insuficientes.")
+    else:
+        # Ordenar: Primero los que tengan MAYOR CONSENSO de sobreventa
+        df_screen.sort_values(by=['Consenso_RSI', 'RSI_14'], ascending=[False, True], inplace=True)
+        
+# Formato columnas
+        column_config = {
+            "Precio": st.column_config.NumberColumn(format="US$%.2f" if moneda == 'USD' else "$%.2f"),
+            "RSI_14": st.column_config.ProgressColumn(format="%.1f", label="RSI (14)", min_value=0, max_value=100),
+            
+            "Consenso_RSI": st.column_config.ProgressColumn(
+                label="Consenso RSI < 30",
+                help="% RSI corto plazo en sobreventa",
+                format="percent",
+                min_value=0,
+                max_value=1,
+            ),
+            
+            # NUEVAS COLUMNAS
+            "SMA_70": st.column_config.NumberColumn(format="US$%.2f" if moneda == 'USD' else "$%.2f", label="SMA (70)"),
+            "Dias_Bajo_SMA": st.column_config.NumberColumn(
+                label="Días < SMA70",
+                help="Días hábiles consecutivos que el precio ha cerrado por debajo de la SMA 70.",
+                format="%d 📉" # Agrega un iconito visual
+            ),
+
+            "RSI_Bajo": st.column_config.CheckboxColumn(label="RSI < 30"),
+            "Caida_30d": st.column_config.NumberColumn(format="percent", label="Caída 30d"),
+            "Caida_5d": st.column_config.NumberColumn(format="percent", label="Caída 5d"),
+        }
+        
+        # Una sola tabla (antes se dibujaba dos veces); RSI < 30 marcado como columna booleana
+        df_screen['RSI_Bajo'] = df_screen['RSI_14'] < 30
+        cols_show = ['Precio', 'Consenso_RSI', 'Dias_Bajo_SMA', 'SMA_70', 'RSI_14', 'RSI_Bajo', 'Caida_30d', 'Caida_5d']
+
+        # Mostrar Tabla
+        st.dataframe(
+            df_screen[cols_show],
+            use_container_width=True,
+            column_config=column_config,
+            height=700
+        )
+
+        # --- SIMULADOR SIMPLE (Adaptado) ---
+        st.sidebar.header("🧪 Simulador")
+        lista_tickers = sorted(df_history.columns.tolist())
+        ticker_sim = st.sidebar.selectbox("Simular Activo", lista_tickers)
+        precio_ref = df_history[ticker_sim].iloc[-1]
+        
+        precio_input = st.sidebar.number_input("Precio Hipotético", value=float(precio_ref), format="%.2f")
+        
+        if st.sidebar.button("Calcular Impacto"):
+            # Usamos la función simple para RSI 14 solo como referencia rápida
+            rsi_sim = market_logic.calcular_rsi_simulado(df_history, ticker_sim, precio_input)
+            st.sidebar.metric("RSI (14) Simulado", f"{rsi_sim:.2f}" if rsi_sim else "--")
+            
+            diff = (precio_input / precio_ref) - 1
+            st.sidebar.caption(f"Variación: {diff:+.2%}")
+
+perfilado.terminar()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import streamlit as st
+import pandas as pd
+import tracing
+import perfilado
+
+st.set_page_config(page_title="Rendimiento", page_icon="⏱️", layout="wide")
+perfilado.iniciar('rendimiento')
+st.title("⏱️ Rendimiento de la App")
+st.caption("Tiempos medidos en este proceso desde que arrancó (o desde el último reinicio de métricas).")
+
+ms = st.column_config.NumberColumn(format="%.1f ms")
+
+# --- RESUMEN POR OPERACIÓN ---
+df_resumen = tracing.resumen()
+if df_resumen.empty:
+    st.info("Todavía no hay mediciones. Navegá por la app y volvé a esta página.")
+    st.stop()
+
+st.subheader("Latencia por operación")
+st.dataframe(df_resumen, width='stretch', column_config={
+    'p50_ms': ms, 'p95_ms': ms, 'p99_ms': ms, 'Max_ms': ms,
+    'Errores': st.column_config.NumberColumn(help="Excepciones dentro del span (HTTP 429 = throttling de IOL/Sheets)"),
+})
+
+# --- DETALLE POR ETIQUETA ---
+tab_iol, tab_sheets, tab_cache, tab_calc = st.tabs(["📡 IOL por ticker", "📄 Sheets", "🗄️ Cachés", "🧮 Cálculo y render"])
+config_detalle = {'Prom_ms': ms, 'Ultimo_Error': st.column_config.TextColumn("Último error", width='large')}
+
+with tab_iol:
+    st.caption("Tickers ordenados por errores y luego por latencia promedio: los lentos o rechazados arriba.")
+    st.dataframe(tracing.por_etiqueta('iol.'), width='stretch', hide_index=True, column_config=config_detalle)
+with tab_sheets:
+    st.dataframe(tracing.por_etiqueta('sheets.'), width='stretch', hide_index=True, column_config=config_detalle)
+with tab_cache:
+    df_cache = tracing.eventos('cache.')
+    if not df_cache.empty:
+        st.dataframe(df_cache.pivot_table(index='Nombre', columns='Etiqueta', values='N', aggfunc='sum', fill_value=0), width='stretch')
+with tab_calc:
+    df_calc = pd.concat([tracing.por_etiqueta('calc.'), tracing.por_etiqueta('render.'), tracing.por_etiqueta('data.')])
+    st.dataframe(df_calc, width='stretch', hide_index=True, column_config=config_detalle)
+
+# --- EXPORTAR / REINICIAR ---
+st.divider()
+c_exp, c_reset = st.columns([1, 1])
+with c_exp:
+    st.download_button("⬇️ Exportar spans (JSONL)", tracing.exportar_jsonl(), file_name="trazas.jsonl", mime="application/jsonl")
+with c_reset:
+    if st.button("🧹 Reiniciar métricas"):
+        tracing.reiniciar()
+        st.rerun()
+
+perfilado.terminar()
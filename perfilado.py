@@ -0,0 +1,155 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+
+# Perfilado opcional de cada rerun (PERFILAR=1 en el entorno o ?perfilar=1 en la URL).
+# Cada página llama iniciar() arriba y terminar() al final: mientras tanto corren cProfile
+# (tiempos exactos por función -> .pstats) y un muestreador de stacks del hilo del script
+# (-> .collapsed, se abre en speedscope.app o con flamegraph.pl). Se perfila un rerun a la vez
+# en todo el proceso; si otra sesión está perfilando, este rerun sigue sin perfil.
+# Un st.stop()/st.rerun() corta el script antes de terminar(): ese perfil se cierra al
+# comenzar el siguiente rerun.
+try:
+    from config import DIR_PERFILES, PERFILES_MAX
+except ImportError:
+    DIR_PERFILES, PERFILES_MAX = '.perfiles', 50
+
+INTERVALO_MUESTREO = 0.005
+TOP_N = 25
+_RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+_lock = threading.Lock()
+_activo = None    # dict del rerun que se está perfilando
+_ultimos = {}     # session_id -> DataFrame con el top de su último perfil
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else ''
+    except Exception: return ''
+
+
+def habilitado():
+    if os.environ.get('PERFILAR', '').lower() in ('1', 'true', 'si', 'sí'): return True
+    try:
+        valor = st.query_params.get('perfilar')
+        if valor is not None: st.session_state.perfilar = valor.lower() in ('1', 'true', 'si', 'sí')
+    except Exception: pass
+    return bool(st.session_state.get('perfilar', False))
+
+
+# --- MUESTREO DE STACKS ---
+def _nombre_marco(frame):
+    codigo = frame.f_code
+    archivo = os.path.relpath(codigo.co_filename, _RAIZ) if codigo.co_filename.startswith(_RAIZ) else os.path.basename(codigo.co_filename)
+    return f"{codigo.co_name} ({archivo}:{codigo.co_firstlineno})"
+
+
+def _muestrear(thread_id, parar, stacks):
+    while not parar.wait(INTERVALO_MUESTREO):
+        frame = sys._current_frames().get(thread_id)
+        if frame is None: continue
+        pila = []
+        while frame is not None:
+            pila.append(_nombre_marco(frame))
+            frame = frame.f_back
+        stacks[';'.join(reversed(pila))] += 1
+
+
+# --- CICLO POR RERUN ---
+def iniciar(pagina):
+    """Cierra el perfil pendiente, muestra el último de esta sesión y, si está habilitado, arranca uno nuevo."""
+    global _activo
+    with _lock:
+        pendiente = _activo
+        hilo_vivo = pendiente and pendiente['hilo'].is_alive() and pendiente['hilo'] is not threading.current_thread()
+        if pendiente and not hilo_vivo: _activo = None
+    if pendiente and not hilo_vivo: _cerrar(pendiente)
+
+    if not habilitado(): return
+    panel()
+
+    with _lock:
+        if _activo is not None: return
+        _activo = {'pagina': pagina, 'sesion': _session_id(), 'hilo': threading.current_thread(),
+                   'inicio': time.perf_counter(), 'stacks': Counter(), 'parar': threading.Event(),
+                   'perfil': cProfile.Profile()}
+        activo = _activo
+    threading.Thread(target=_muestrear, args=(activo['hilo'].ident, activo['parar'], activo['stacks']), daemon=True).start()
+    activo['perfil'].enable()
+
+
+def terminar():
+    global _activo
+    with _lock:
+        activo = _activo
+        if activo is None or activo['hilo'] is not threading.current_thread(): return
+        _activo = None
+    _cerrar(activo)
+
+
+def _cerrar(activo):
+    activo['perfil'].disable()
+    activo['parar'].set()
+    duracion = time.perf_counter() - activo['inicio']
+    try:
+        base = guardar(activo['perfil'], activo['stacks'], activo['pagina'])
+    except OSError as e:
+        print(f"Perfil no guardado: {e}")
+        base = None
+    _ultimos[activo['sesion']] = (activo['pagina'], duracion, base, top_funciones(activo['perfil']))
+    while len(_ultimos) > 50: _ultimos.pop(next(iter(_ultimos)))
+
+
+# --- ARCHIVOS ---
+def guardar(perfil, stacks, pagina, directorio=None):
+    """Escribe <ts>_<pagina>.pstats y .collapsed; deja solo los PERFILES_MAX más recientes."""
+    directorio = directorio or DIR_PERFILES
+    os.makedirs(directorio, exist_ok=True)
+    base = os.path.join(directorio, f"{datetime.now():%Y%m%d-%H%M%S-%f}_{pagina}")
+    perfil.dump_stats(f"{base}.pstats")
+    with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+        f.writelines(f"{pila} {n}\n" for pila, n in stacks.items())
+
+    bases = sorted({a.rsplit('.', 1)[0] for a in os.listdir(directorio) if a.endswith(('.pstats', '.collapsed'))})
+    for vieja in bases[:-PERFILES_MAX]:
+        for ext in ('.pstats', '.collapsed'):
+            try: os.remove(os.path.join(directorio, vieja + ext))
+            except FileNotFoundError: pass
+    return base
+
+
+def top_funciones(perfil, n=TOP_N):
+    """Funciones ordenadas por tiempo acumulado (ms), como pstats sort_stats('cumulative')."""
+    filas = []
+    for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in pstats.Stats(perfil).stats.items():
+        if archivo.startswith(_RAIZ): archivo = os.path.relpath(archivo, _RAIZ)
+        elif archivo != '~': archivo = os.path.basename(archivo)
+        filas.append({'Funcion': f"{funcion} ({archivo}:{linea})", 'Llamadas': llamadas,
+                      'Acum_ms': acumulado * 1000, 'Propio_ms': propio * 1000})
+    if not filas: return pd.DataFrame(columns=['Funcion', 'Llamadas', 'Acum_ms', 'Propio_ms'])
+    return pd.DataFrame(filas).sort_values('Acum_ms', ascending=False).head(n).reset_index(drop=True)
+
+
+# --- PANEL ---
+def panel():
+    ultimo = _ultimos.get(_session_id())
+    with st.sidebar.expander("🔬 Perfil del último rerun", expanded=False):
+        if not ultimo:
+            st.caption("Perfilado activo: el perfil aparece a partir del próximo rerun.")
+            return
+        pagina, duracion, base, df_top = ultimo
+        st.caption(f"{pagina}: {duracion * 1000:.0f} ms" + (f" · {os.path.basename(base)}.pstats / .collapsed" if base else ""))
+        st.dataframe(df_top, hide_index=True, width='stretch', column_config={
+            'Acum_ms': st.column_config.NumberColumn("Acum.", format="%.1f ms"),
+            'Propio_ms': st.column_config.NumberColumn("Propio", format="%.1f ms"),
+        })
@@ -0,0 +1,206 @@
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    from config import DIR_COMPARTIDO
+except ImportError:
+    DIR_COMPARTIDO = os.path.join(tempfile.gettempdir(), 'bot_inversiones')
+
+# Matriz de precios compacta: un único bloque float32 contiguo (días x tickers), un índice
+# ticker -> columna y el índice de días hábiles compartido. Las ventanas por fecha son vistas
+# (slices) del mismo bloque y la selección de tickers guarda solo los índices de columna: nada
+# se copia hasta convertir explícitamente a DataFrame en los bordes.
+DTYPE = np.float32
+
+
+class MatrizPrecios:
+    def __init__(self, valores, fechas, tickers, filas=slice(None), columnas=None):
+        self._base = valores
+        self._fechas = pd.DatetimeIndex(fechas)
+        self._tickers = list(tickers)
+        self._pos = {t: i for i, t in enumerate(self._tickers)}
+        self._filas = filas
+        self._columnas = columnas  # None = todas (vista), o array de índices
+
+    # --- CONVERSIÓN EN LOS BORDES ---
+    @classmethod
+    def desde_frame(cls, df):
+        if df is None or df.empty:
+            return cls(np.empty((0, 0), dtype=DTYPE), pd.DatetimeIndex([]), [])
+        if not df.index.is_monotonic_increasing: df = df.sort_index()
+        valores = np.ascontiguousarray(df.to_numpy(dtype=DTYPE, na_value=np.nan))
+        return cls(valores, df.index, [str(c) for c in df.columns])
+
+    def a_frame(self, dtype=None):
+        valores = self.valores if dtype is None else self.valores.astype(dtype)
+        return pd.DataFrame(valores, index=self.fechas, columns=self.tickers, copy=False)
+
+    # --- ATRIBUTOS ---
+    @property
+    def valores(self):
+        """Bloque de la vista actual (sin copia salvo que se hayan elegido tickers sueltos)."""
+        v = self._base[self._filas]
+        return v if self._columnas is None else v[:, self._columnas]
+
+    @property
+    def fechas(self):
+        return self._fechas[self._filas]
+
+    @property
+    def tickers(self):
+        if self._columnas is None: return list(self._tickers)
+        return [self._tickers[i] for i in self._columnas]
+
+    @property
+    def shape(self):
+        n_filas = len(range(*self._filas.indices(self._base.shape[0])))
+        n_cols = self._base.shape[1] if self._columnas is None else len(self._columnas)
+        return n_filas, n_cols
+
+    @property
+    def empty(self):
+        return 0 in self.shape
+
+    @property
+    def nbytes(self):
+        return self._base.nbytes
+
+    # --- VISTAS ---
+    def ventana(self, desde=None, hasta=None):
+        """Vista por rango de fechas [desde, hasta): comparte el bloque, no copia."""
+        inicio, fin, _ = self._filas.indices(self._base.shape[0])
+        if desde is not None: inicio = max(inicio, int(self._fechas.searchsorted(pd.Timestamp(desde), side='left')))
+        if hasta is not None: fin = min(fin, int(self._fechas.searchsorted(pd.Timestamp(hasta), side='left')))
+        return MatrizPrecios(self._base, self._fechas, self._tickers, slice(inicio, max(inicio, fin)), self._columnas)
+
+    def seleccionar(self, tickers):
+        """Subconjunto de tickers (los que no existen se ignoran); guarda solo índices de columna."""
+        actuales = np.arange(len(self._tickers)) if self._columnas is None else np.asarray(self._columnas)
+        pedidos = {self._pos[t] for t in tickers if t in self._pos}
+        columnas = np.array([c for c in actuales if c in pedidos], dtype=np.intp)
+        return MatrizPrecios(self._base, self._fechas, self._tickers, self._filas, columnas)
+
+    def columna(self, ticker):
+        v = self._base[self._filas, self._pos[ticker]]
+        return pd.Series(v, index=self.fechas, name=ticker, copy=False)
+
+    # --- OPERACIONES (devuelven una matriz nueva, una sola asignación) ---
+    def con_fila(self, fecha, precios):
+        """
+        Reemplaza (o agrega) la fila de `fecha` con los precios dados. Los tickers nuevos se
+        agregan como columnas; los que no vienen quedan en NaN para esa fila.
+        """
+        fecha = pd.Timestamp(fecha)
+        base = self.ventana(hasta=fecha)
+        tickers = base.tickers + [t for t in precios if t not in set(base.tickers)]
+        n_filas, n_cols = base.shape
+        valores = np.full((n_filas + 1, len(tickers)), np.nan, dtype=DTYPE)
+        valores[:n_filas, :n_cols] = base.valores
+        pos = {t: i for i, t in enumerate(tickers)}
+        for t, p in precios.items():
+            if p is not None: valores[n_filas, pos[t]] = p
+        return MatrizPrecios(valores, base.fechas.append(pd.DatetimeIndex([fecha])), tickers)
+
+    def ffill(self):
+        v = self.valores
+        if v.size == 0: return self
+        filas = np.where(np.isnan(v), 0, np.arange(v.shape[0])[:, None])
+        np.maximum.accumulate(filas, axis=0, out=filas)
+        return MatrizPrecios(np.ascontiguousarray(v[filas, np.arange(v.shape[1])]), self.fechas, self.tickers)
+
+
+# --- PUBLICACIÓN COMPARTIDA (memory-map entre procesos) ---
+# Cada generación del histórico se escribe una vez como .npy y todos los procesos y sesiones
+# la mapean en modo solo lectura: un hit no copia nada y la memoria residente es una sola.
+# El encabezado JSON (generación, fechas, tickers) se reemplaza con os.replace, así un lector
+# ve la generación anterior o la nueva completa, nunca un archivo a medio escribir.
+_MAPEADAS = {}  # ruta del encabezado -> (mtime, generación, publicado, matriz)
+_GENERACIONES_CONSERVADAS = 2  # la anterior queda por si otro proceso la está abriendo
+
+
+def _ruta_encabezado(nombre, directorio=None):
+    return os.path.join(directorio or DIR_COMPARTIDO, f"{nombre}.json")
+
+
+def _escribir_atomico(ruta, escribir, modo='w'):
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, modo) as f: escribir(f)
+    os.replace(tmp, ruta)
+
+
+def publicar(matriz, nombre, directorio=None):
+    """Publica la matriz como nueva generación y devuelve la versión mapeada en memoria."""
+    directorio = directorio or DIR_COMPARTIDO
+    os.makedirs(directorio, exist_ok=True)
+    generacion = time.time_ns()
+    archivo = f"{nombre}.{generacion}.npy"
+    valores = np.ascontiguousarray(matriz.valores, dtype=DTYPE)
+    _escribir_atomico(os.path.join(directorio, archivo), lambda f: np.save(f, valores), 'wb')
+
+    encabezado = {
+        'generacion': generacion, 'archivo': archivo, 'publicado': time.time(),
+        'fechas': matriz.fechas.as_unit('ns').asi8.tolist(), 'tickers': matriz.tickers,
+    }
+    _escribir_atomico(_ruta_encabezado(nombre, directorio), lambda f: json.dump(encabezado, f))
+    _limpiar_generaciones(nombre, directorio)
+    return abrir(nombre, directorio)[0]
+
+
+def abrir(nombre, directorio=None):
+    """
+    Devuelve (matriz, publicado) con la última generación publicada, o (None, 0) si no hay.
+    El encabezado solo se vuelve a leer si cambió en disco; el mapeo se reutiliza por generación.
+    """
+    directorio = directorio or DIR_COMPARTIDO
+    ruta = _ruta_encabezado(nombre, directorio)
+    try: mtime = os.stat(ruta).st_mtime_ns
+    except OSError: return None, 0
+
+    previo = _MAPEADAS.get(ruta)
+    if previo and previo[0] == mtime: return previo[3], previo[2]
+
+    try:
+        with open(ruta) as f: encabezado = json.load(f)
+        if previo and previo[1] == encabezado['generacion']:
+            matriz = previo[3]
+        else:
+            valores = np.load(os.path.join(directorio, encabezado['archivo']), mmap_mode='r')
+            matriz = MatrizPrecios(valores, pd.to_datetime(encabezado['fechas']), encabezado['tickers'])
+    except (OSError, ValueError, KeyError):
+        return (previo[3], previo[2]) if previo else (None, 0)
+
+    _MAPEADAS[ruta] = (mtime, encabezado['generacion'], encabezado['publicado'], matriz)
+    return matriz, encabezado['publicado']
+
+
+def invalidar(nombre=None, directorio=None):
+    """
+    Marca como vencida la generación actual (o todas, sin nombre): el próximo lector, de
+    cualquier proceso, la renueva.
+    """
+    directorio = directorio or DIR_COMPARTIDO
+    if nombre is None:
+        try: nombres = [a[:-5] for a in os.listdir(directorio) if a.endswith('.json')]
+        except OSError: return
+    else:
+        nombres = [nombre]
+    for n in nombres:
+        ruta = _ruta_encabezado(n, directorio)
+        try:
+            with open(ruta) as f: encabezado = json.load(f)
+        except (OSError, ValueError): continue
+        encabezado['publicado'] = 0
+        _escribir_atomico(ruta, lambda f: json.dump(encabezado, f))
+
+
+def _limpiar_generaciones(nombre, directorio):
+    prefijo = f"{nombre}."
+    archivos = sorted(a for a in os.listdir(directorio) if a.startswith(prefijo) and a.endswith('.npy'))
+    for archivo in archivos[:-_GENERACIONES_CONSERVADAS]:
+        # En Windows un archivo mapeado no se puede borrar; queda para la próxima limpieza
+        try: os.remove(os.path.join(directorio, archivo))
+        except OSError: pass
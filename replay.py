@@ -0,0 +1,249 @@
+"""
+Replay determinístico de cotizaciones intradiarias por el mismo camino que el refresco en vivo:
+
+    python replay.py --sintetico --tickers 150 --intervalo 60 --velocidad 0   # una rueda, lo más rápido posible
+    python replay.py --dia 2026-10-16 --datos app --velocidad 60               # diario grabado (intradia.py) a 60x
+    python replay.py --sintetico --salida replay.json --huella                 # para comparar corridas
+
+Cada tanda de cotizaciones (un polling de IOL) pasa por las mismas funciones que usa manager.py:
+precios_actuales (update + combine_first), MEP incremental, unir_historial + calcular_indicadores
+(+ columnas intradiarias sobre un agregador propio, no el del diario), screener.aplicar,
+analizar_portafolio y alerts.evaluar_alertas. No se escribe en Sheets ni en el diario.
+El reloj de las alertas y del screener es el de los registros, así que dos corridas con los
+mismos datos dan el mismo resultado (la huella lo resume) a cualquier velocidad.
+
+Con --datos sinteticos (por defecto) el histórico y la cartera salen de benchmarks.py y a la mitad
+de los lotes se les ponen alertas ±2% del último cierre; con --datos app se leen de database.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+import alerts
+import data_client
+import intradia
+import market_logic
+import tracing
+from screener_state import EstadoScreener
+
+ETAPAS = ['precios', 'mep', 'indicadores', 'portafolio', 'alertas']
+SEPARACION_LOTE_NS = 10**9  # Registros a menos de 1s del anterior son del mismo polling
+
+
+# --- FUENTES ---
+def ticks_sinteticos(ultimos, dia, intervalo_s=60, apertura='11:00', cierre='17:00', volatilidad=0.02, semilla=None):
+    """
+    Una rueda de pollings cada `intervalo_s` segundos para todos los tickers de `ultimos` (Series
+    ticker -> último cierre), como registros de intradia.REGISTRO. Caminata geométrica con la
+    volatilidad diaria dada; los pares D siguen a su par en pesos (MEP estable).
+    """
+    import benchmarks
+    rng = np.random.default_rng(benchmarks.SEMILLA if semilla is None else semilla)
+    ultimos = ultimos.dropna()
+    ultimos = ultimos[ultimos > 0]
+    dia = pd.Timestamp(dia).normalize()
+    inicio, fin = dia + pd.Timedelta(apertura + ':00'), dia + pd.Timedelta(cierre + ':00')
+    pasos = int((fin - inicio).total_seconds() // intervalo_s) + 1
+    tickers = list(ultimos.index)
+
+    sigma = volatilidad / np.sqrt(pasos)
+    precios = ultimos.to_numpy(dtype=float) * np.exp(np.cumsum(rng.normal(0, sigma, size=(pasos, len(tickers))), axis=0))
+    columnas = {t: i for i, t in enumerate(tickers)}
+    for peso, dolar in market_logic.pares_fx(tickers):
+        i, j = columnas[peso], columnas[dolar]
+        precios[:, j] = precios[:, i] * (ultimos.iloc[j] / ultimos.iloc[i]) * np.exp(rng.normal(0, sigma / 4, pasos))
+    volumen = np.cumsum(rng.integers(0, 500, size=(pasos, len(tickers))), axis=0)
+
+    # Dentro de un polling las respuestas llegan desparramadas unos milisegundos
+    ts = inicio.value + np.arange(pasos)[:, None] * intervalo_s * 10**9 + rng.integers(0, 300, size=(pasos, len(tickers))) * 10**6
+    registros = np.empty(pasos * len(tickers), dtype=intradia.REGISTRO)
+    registros['ts'] = ts.ravel()
+    registros['ticker'] = np.tile(np.array(tickers, dtype='S12'), pasos)
+    registros['precio'] = precios.ravel()
+    registros['volumen'] = volumen.ravel()
+    return np.sort(registros, order='ts', kind='stable')
+
+
+def lotes(registros):
+    """Corta los registros (ordenados por ts) en pollings: un hueco de más de 1s abre una tanda nueva."""
+    if not len(registros): return []
+    cortes = np.flatnonzero(np.diff(registros['ts']) > SEPARACION_LOTE_NS) + 1
+    return np.split(registros, cortes)
+
+
+def datos_sinteticos(n_tickers, semilla=None):
+    """(historial, cartera) de benchmarks.py: mismo generador y semilla que los benchmarks."""
+    import benchmarks
+    from price_matrix import MatrizPrecios
+    semilla = benchmarks.SEMILLA if semilla is None else semilla
+    df = benchmarks.matriz_sintetica(n_tickers, 1, semilla=semilla)
+    cartera = benchmarks.portafolio_sintetico(df, max(10, n_tickers), semilla=semilla)
+    ultimos = df.ffill().iloc[-1]
+    con_alerta = np.arange(len(cartera)) % 2 == 0
+    precio = cartera['Ticker'].map(ultimos).to_numpy(dtype=float)
+    cartera['Alerta_Alta'] = np.where(con_alerta, np.round(precio * 1.02, 2), 0.0)
+    cartera['Alerta_Baja'] = np.where(con_alerta, np.round(precio * 0.98, 2), 0.0)
+    return MatrizPrecios.desde_frame(df), cartera
+
+
+def datos_app():
+    import database
+    return database.get_historical_matrix(), database.get_portafolio_df()
+
+
+# --- PIPELINE ---
+class Pipeline:
+    """El estado de una sesión (lo que manager.py guarda en st.session_state) y el refresco por tanda."""
+    def __init__(self, historial, cartera, dia):
+        self.historial, self.cartera = historial, cartera
+        self.dia = pd.Timestamp(dia).normalize()
+        self.historial_previo = historial.ventana(hasta=self.dia)
+        self.screener = EstadoScreener(list(historial.tickers))
+        self.barras = intradia.Barras()
+        self.precios_actuales = pd.Series(dtype=float)
+        self.mep_serie = market_logic.calcular_serie_mep(self.historial_previo.a_frame())
+        self.mep_valor = None
+        self.alertas_estado = alerts.estado_vacio()
+        self.disparos = []
+        self.portafolio = pd.DataFrame()
+        self.tiempos = defaultdict(list)
+
+    def _etapa(self, nombre, func):
+        t0 = time.perf_counter()
+        with tracing.span(f'replay.{nombre}'):
+            resultado = func()
+        self.tiempos[nombre].append(time.perf_counter() - t0)
+        return resultado
+
+    def procesar(self, lote):
+        ahora = pd.Timestamp(int(lote['ts'][-1]))
+        precios_lote = dict(zip(np.char.decode(lote['ticker']), lote['precio'].astype(float)))
+
+        def _precios():
+            self.barras.agregar(lote)
+            self.precios_actuales.update(precios_lote)
+            self.precios_actuales = self.precios_actuales.combine_first(pd.Series(precios_lote))
+        self._etapa('precios', _precios)
+
+        def _mep():
+            self.mep_serie = market_logic.actualizar_mep_incremental(self.mep_serie, precios_lote, fecha=self.dia)
+            self.mep_valor, _ = market_logic.ultimo_mep(self.mep_serie)
+        self._etapa('mep', _mep)
+
+        def _indicadores():
+            df_raw = data_client.unir_historial(self.historial_previo, self.precios_actuales.to_dict(), self.dia)
+            df = intradia.agregar_indicadores(market_logic.calcular_indicadores(df_raw), barras=self.barras, hoy=self.dia)
+            self.screener.aplicar(df, ahora=ahora)
+        self._etapa('indicadores', _indicadores)
+
+        def _portafolio():
+            self.portafolio = market_logic.analizar_portafolio(self.cartera, self.precios_actuales)
+        self._etapa('portafolio', _portafolio)
+
+        def _alertas():
+            # Epoch "local" del registro: el cooldown corre con el reloj del replay
+            self.alertas_estado, disparos = alerts.evaluar_alertas(
+                self.cartera, self.precios_actuales, self.alertas_estado, ahora=ahora.value / 1e9)
+            if not disparos.empty: self.disparos.append(disparos)
+        self._etapa('alertas', _alertas)
+
+    def huella(self):
+        """Resumen reproducible del estado final (screener, MEP, portafolio y disparos)."""
+        h = hashlib.sha1()
+        h.update(self.screener.datos.drop(columns='Actualizado').round(6).to_csv().encode())
+        h.update(f"{self.mep_valor:.6f}".encode() if self.mep_valor else b'-')
+        if not self.portafolio.empty: h.update(self.portafolio['Senal_Venta'].to_csv().encode())
+        for d in self.disparos: h.update(d[['Clave', 'Tipo', 'Timestamp']].to_csv().encode())
+        return h.hexdigest()[:16]
+
+
+# --- DRIVER ---
+def reproducir(registros, pipeline, velocidad=0.0, al_lote=None):
+    """
+    Pasa cada tanda por el pipeline. velocidad = múltiplo del tiempo real (0 = sin esperas).
+    Devuelve las estadísticas: ticks/s, tandas/s y latencias por etapa (ms).
+    """
+    tandas = lotes(registros)
+    t0_reloj, t0_datos = time.perf_counter(), int(registros['ts'][0]) if len(registros) else 0
+    espera_total = 0.0
+    for lote in tandas:
+        if velocidad > 0:
+            objetivo = t0_reloj + (int(lote['ts'][-1]) - t0_datos) / 1e9 / velocidad
+            espera = objetivo - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+                espera_total += espera
+        pipeline.procesar(lote)
+        if al_lote: al_lote(pipeline, lote)
+    total = time.perf_counter() - t0_reloj
+
+    computo = max(total - espera_total, 1e-9)
+    stats = {
+        'ticks': int(len(registros)), 'tandas': len(tandas), 'tickers': int(len(np.unique(registros['ticker']))),
+        'duracion_datos_s': round((int(registros['ts'][-1]) - t0_datos) / 1e9, 1) if len(registros) else 0.0,
+        'duracion_s': round(total, 3), 'velocidad': velocidad,
+        'ticks_por_s': round(len(registros) / total, 1) if total else None,
+        'ticks_por_s_computo': round(len(registros) / computo, 1),
+        'tandas_por_s_computo': round(len(tandas) / computo, 2),
+        'disparos': int(sum(len(d) for d in pipeline.disparos)),
+        'etapas_ms': {},
+    }
+    for etapa in ETAPAS:
+        ms = np.array(pipeline.tiempos.get(etapa, []), dtype=float) * 1000
+        if not len(ms): continue
+        stats['etapas_ms'][etapa] = {'p50': round(float(np.percentile(ms, 50)), 3), 'p95': round(float(np.percentile(ms, 95)), 3),
+                                     'max': round(float(ms.max()), 3), 'total': round(float(ms.sum()), 1)}
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay de cotizaciones intradiarias por el pipeline de la app.")
+    fuente = parser.add_mutually_exclusive_group()
+    fuente.add_argument('--dia', default=None, help="Día grabado en el diario intradiario (YYYY-MM-DD)")
+    fuente.add_argument('--sintetico', action='store_true', help="Rueda sintética (por defecto si no hay --dia)")
+    parser.add_argument('--datos', choices=['sinteticos', 'app'], default='sinteticos', help="Origen del histórico y la cartera")
+    parser.add_argument('--tickers', type=int, default=150, help="Tickers del histórico sintético")
+    parser.add_argument('--intervalo', type=int, default=60, help="Segundos entre pollings sintéticos (60 = autorefresh de home.py)")
+    parser.add_argument('--velocidad', type=float, default=0.0, help="Múltiplo del tiempo real (0 = lo más rápido posible)")
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--directorio', default=None, help="Directorio del diario (por defecto DIR_INTRADIA)")
+    parser.add_argument('--salida', default=None, help="Guardar las estadísticas en este JSON")
+    parser.add_argument('--huella', action='store_true', help="Imprimir la huella del estado final")
+    args = parser.parse_args(argv)
+
+    historial, cartera = datos_app() if args.datos == 'app' else datos_sinteticos(args.tickers, args.semilla)
+    if args.dia:
+        dia = pd.Timestamp(args.dia).normalize()
+        registros = np.sort(intradia.leer_dia(dia, args.directorio), order='ts', kind='stable')
+        if not len(registros): parser.error(f"No hay registros del {dia:%Y-%m-%d} en el diario")
+    else:
+        # La rueda sintética es el día hábil siguiente al último del histórico
+        dia = historial.fechas[-1] + pd.offsets.BDay()
+        ultimos = historial.ffill().ventana(desde=historial.fechas[-1]).a_frame().iloc[-1]
+        registros = ticks_sinteticos(ultimos, dia, args.intervalo, semilla=args.semilla)
+
+    pipeline = Pipeline(historial, cartera, dia)
+    stats = reproducir(registros, pipeline, args.velocidad)
+    stats['dia'] = f"{dia:%Y-%m-%d}"
+    if args.huella: stats['huella'] = pipeline.huella()
+
+    print(f"Replay {stats['dia']}: {stats['ticks']} ticks en {stats['tandas']} tandas ({stats['tickers']} tickers), "
+          f"{stats['duracion_datos_s']:.0f}s de mercado en {stats['duracion_s']:.2f}s")
+    print(f"  {stats['ticks_por_s_computo']:.0f} ticks/s, {stats['tandas_por_s_computo']:.1f} tandas/s de cómputo; {stats['disparos']} alertas")
+    for etapa, ms in stats['etapas_ms'].items():
+        print(f"  {etapa:<12} p50 {ms['p50']:8.2f} ms   p95 {ms['p95']:8.2f} ms   max {ms['max']:8.2f} ms   total {ms['total']:9.1f} ms")
+    if args.huella: print(f"  huella: {stats['huella']}")
+    if args.salida:
+        with open(args.salida, 'w') as f: json.dump(stats, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import tablas
+
+# Estado del screener de la sesión: una fila por ticker del universo (config.TICKERS), con la
+# hora de la última actualización de cada fila. Cada refresco aplica solo las filas que cambiaron
+# (asignación alineada por columna) y la vista ordenada se arma recién cuando alguien la pide.
+COLS_SCREENER = ['Precio', 'RSI', 'Caida_30d', 'Caida_5d', 'Var_Ayer', 'Suma_Caidas', 'Senal', 'RSI_Intradia', 'Caida_Intradia']
+COLS_VACIAS = ['RSI_Intradia', 'Caida_Intradia']  # Sin velas del día quedan vacías, no en 0
+COL_ACTUALIZADO = 'Actualizado'
+ORDEN = (['Senal', 'Suma_Caidas'], [True, False])
+
+
+class EstadoScreener:
+    def __init__(self, tickers, columnas=COLS_SCREENER):
+        datos = {col: (np.full(len(tickers), 'PENDIENTE', dtype=object) if col == 'Senal'
+                       else np.full(len(tickers), np.nan) if col in COLS_VACIAS else np.zeros(len(tickers)))
+                 for col in columnas}
+        datos[COL_ACTUALIZADO] = np.full(len(tickers), np.datetime64('NaT'), dtype='datetime64[ns]')
+        self._datos = pd.DataFrame(datos, index=pd.Index(list(tickers)))
+        self._columnas = list(columnas)
+        self._vista = None
+
+    def aplicar(self, df_nuevo, ahora=None):
+        """
+        Aplica un lote de filas recalculadas (índice = ticker). Solo se tocan los tickers del
+        universo que vienen en el lote; devuelve cuántos se actualizaron.
+        """
+        if df_nuevo is None or df_nuevo.empty: return 0
+        # Posiciones de las filas del lote (get_indexer usa el hash del índice: no recorre el universo)
+        pos = self._datos.index.get_indexer(df_nuevo.index)
+        dentro = pos >= 0
+        if not dentro.any(): return 0
+        pos, nuevo = pos[dentro], df_nuevo[dentro]
+
+        ahora = pd.Timestamp.now() if ahora is None else pd.Timestamp(ahora)
+        # Escritura en el lugar, solo en esas filas: las numéricas en un bloque (con el dtype del estado)
+        cols = [c for c in self._columnas if c in nuevo.columns]
+        numericas = [c for c in cols if pd.api.types.is_numeric_dtype(self._datos[c])]
+        if numericas: self._datos.iloc[pos, self._datos.columns.get_indexer(numericas)] = nuevo[numericas].to_numpy(dtype=float)
+        for col in cols:
+            if col not in numericas: self._datos.iloc[pos, self._datos.columns.get_loc(col)] = nuevo[col].to_numpy()
+        self._datos.iloc[pos, self._datos.columns.get_loc(COL_ACTUALIZADO)] = ahora
+        self._vista = None
+        return len(pos)
+
+    def restaurar(self, df_guardado):
+        """Carga filas de un snapshot conservando su hora de actualización (tickers fuera del universo se ignoran)."""
+        if df_guardado is None or df_guardado.empty: return 0
+        filas = df_guardado.index.intersection(self._datos.index)
+        for col in self._columnas + [COL_ACTUALIZADO]:
+            if col in df_guardado.columns:
+                self._datos.loc[filas, col] = df_guardado.loc[filas, col].to_numpy()
+        self._vista = None
+        return len(filas)
+
+    @property
+    def datos(self):
+        return self._datos
+
+    def vista(self):
+        """
+        DataFrame ordenado por señal y caídas, con la señal ya como categórica ('Estado') para la
+        grilla. Se rearma solo si hubo cambios desde la última vez.
+        """
+        if self._vista is None:
+            vista = self._datos.sort_values(by=ORDEN[0], ascending=ORDEN[1], na_position='last')
+            vista['Estado'] = tablas.senal_categorica(vista['Senal'])
+            self._vista = vista
+        return self._vista
+
@@ -0,0 +1,264 @@
+"""
+Libro de Google Sheets en memoria con la misma superficie de gspread que usa database.py
+(para pruebas de carga y concurrencia sin tocar la planilla real):
+
+    python sheets_simulado.py --generar fixtures_sheets --lotes 10000 --dias 5000 --tickers 500
+    SHEETS_SIMULADO=fixtures_sheets streamlit run home.py
+
+Cada CSV del directorio es una pestaña (nombre del archivo sin extensión); Portafolio va primero
+porque database lo busca con get_worksheet(0). Las celdas se guardan como texto, igual que los
+valores formateados que devuelve la API, y get_all_records las numeriza como gspread.
+Opcionalmente cada llamada suma latencia y respeta una cuota de lecturas/escrituras por minuto:
+pasada la cuota se lanza APIError 429 (RESOURCE_EXHAUSTED) como la API real.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+import requests
+from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range, numericise_all
+
+ORDEN_HOJAS = ['Portafolio', 'Historial', 'Historial_Yahoo', 'Historial_Cedears_Ext']
+
+
+def _api_error(codigo, estado, mensaje):
+    r = requests.Response()
+    r.status_code = codigo
+    r._content = json.dumps({'error': {'code': codigo, 'message': mensaje, 'status': estado}}).encode()
+    return APIError(r)
+
+
+def _celda(valor):
+    return '' if valor is None else str(valor)
+
+
+# --- LATENCIA Y CUOTAS ---
+class Limites:
+    """Latencia por llamada y cuotas por minuto (0 = sin límite), compartidas por todo el libro."""
+    def __init__(self, latencia_ms=0, jitter_ms=0, lecturas_min=0, escrituras_min=0, prob_error=0.0, semilla=0):
+        self.latencia_ms, self.jitter_ms = latencia_ms, jitter_ms
+        self.cuotas = {'lectura': lecturas_min, 'escritura': escrituras_min}
+        self.prob_error = prob_error
+        self.rng = random.Random(semilla)
+        self.lock = threading.Lock()
+        self.ventanas = {'lectura': deque(), 'escritura': deque()}
+        self.stats = {'lectura': 0, 'escritura': 0, '429': 0, '5xx': 0}
+
+    def llamada(self, tipo):
+        with self.lock:
+            self.stats[tipo] += 1
+            demora = (self.latencia_ms + self.rng.uniform(0, self.jitter_ms)) / 1000
+            falla = self.rng.random() < self.prob_error
+            ahora, ventana, cuota = time.monotonic(), self.ventanas[tipo], self.cuotas[tipo]
+            while ventana and ahora - ventana[0] >= 60: ventana.popleft()
+            excedida = bool(cuota) and len(ventana) >= cuota
+            if not excedida: ventana.append(ahora)
+            if excedida: self.stats['429'] += 1
+            elif falla: self.stats['5xx'] += 1
+        if demora: time.sleep(demora)
+        if excedida:
+            raise _api_error(429, 'RESOURCE_EXHAUSTED', f"Quota exceeded for quota metric '{tipo}' (simulado)")
+        if falla: raise _api_error(503, 'UNAVAILABLE', "The service is currently unavailable (simulado)")
+
+
+# --- HOJA / LIBRO / CLIENTE ---
+class HojaSimulada:
+    def __init__(self, libro, titulo, filas, indice):
+        self.libro, self.title, self.id, self.index = libro, titulo, indice, indice
+        self._filas = [[_celda(v) for v in fila] for fila in filas]
+
+    def __repr__(self):
+        return f"<HojaSimulada {self.title!r} filas={len(self._filas)}>"
+
+    def _leer(self):
+        self.libro.limites.llamada('lectura')
+
+    def _escribir(self):
+        self.libro.limites.llamada('escritura')
+
+    def get_all_values(self):
+        self._leer()
+        with self.libro.lock: return [list(f) for f in self._filas]
+
+    def get_all_records(self, head=1, default_blank='', empty2zero=False, **kwargs):
+        self._leer()
+        with self.libro.lock:
+            if len(self._filas) < head: return []
+            encabezados = self._filas[head - 1]
+            datos = [list(f) for f in self._filas[head:]]
+        n = len(encabezados)
+        return [dict(zip(encabezados, numericise_all((f + [''] * n)[:n], empty2zero=empty2zero, default_blank=default_blank)))
+                for f in datos]
+
+    def row_values(self, fila, **kwargs):
+        self._leer()
+        with self.libro.lock:
+            valores = list(self._filas[fila - 1]) if 0 < fila <= len(self._filas) else []
+        while valores and valores[-1] == '': valores.pop()
+        return valores
+
+    def col_values(self, col, **kwargs):
+        self._leer()
+        with self.libro.lock: valores = [f[col - 1] if len(f) >= col else '' for f in self._filas]
+        while valores and valores[-1] == '': valores.pop()
+        return valores
+
+    def _poner(self, fila, col, valor):
+        """Fila y columna base 1; crece la grilla si hace falta (con el lock tomado)."""
+        while len(self._filas) < fila: self._filas.append([])
+        f = self._filas[fila - 1]
+        if len(f) < col: f.extend([''] * (col - len(f)))
+        f[col - 1] = _celda(valor)
+
+    def append_row(self, values, value_input_option='RAW', **kwargs):
+        self._escribir()
+        with self.libro.lock:
+            # La API agrega después de la última fila con datos
+            while self._filas and not any(self._filas[-1]): self._filas.pop()
+            self._filas.append([_celda(v) for v in values])
+        return {'updates': {'updatedRows': 1}}
+
+    def append_rows(self, values, value_input_option='RAW', **kwargs):
+        self._escribir()
+        with self.libro.lock:
+            while self._filas and not any(self._filas[-1]): self._filas.pop()
+            self._filas.extend([_celda(v) for v in fila] for fila in values)
+        return {'updates': {'updatedRows': len(values)}}
+
+    def update_cell(self, row, col, value):
+        self._escribir()
+        with self.libro.lock: self._poner(row, col, value)
+        return {'updatedCells': 1}
+
+    def batch_update(self, data, **kwargs):
+        self._escribir()
+        celdas = 0
+        with self.libro.lock:
+            for bloque in data:
+                rango = a1_range_to_grid_range(bloque['range'])
+                fila0, col0 = rango.get('startRowIndex', 0), rango.get('startColumnIndex', 0)
+                for i, fila in enumerate(bloque['values']):
+                    for j, valor in enumerate(fila):
+                        self._poner(fila0 + i + 1, col0 + j + 1, valor)
+                        celdas += 1
+        return {'totalUpdatedCells': celdas}
+
+    def delete_rows(self, start_index, end_index=None):
+        self._escribir()
+        fin = end_index or start_index
+        with self.libro.lock: del self._filas[start_index - 1:fin]
+        return {}
+
+
+class LibroSimulado:
+    def __init__(self, titulo='simulado', limites=None):
+        self.title = titulo
+        self.limites = limites or Limites()
+        self.lock = threading.RLock()
+        self._hojas = []
+
+    def agregar_hoja(self, titulo, filas):
+        with self.lock:
+            hoja = HojaSimulada(self, titulo, filas, len(self._hojas))
+            self._hojas.append(hoja)
+        return hoja
+
+    def add_worksheet(self, title, rows=0, cols=0, **kwargs):
+        self.limites.llamada('escritura')
+        return self.agregar_hoja(title, [])
+
+    def worksheets(self, **kwargs):
+        self.limites.llamada('lectura')
+        with self.lock: return list(self._hojas)
+
+    def worksheet(self, title):
+        self.limites.llamada('lectura')
+        with self.lock:
+            for hoja in self._hojas:
+                if hoja.title == title: return hoja
+        raise WorksheetNotFound(title)
+
+    def get_worksheet(self, index):
+        self.limites.llamada('lectura')
+        with self.lock:
+            if 0 <= index < len(self._hojas): return self._hojas[index]
+        raise WorksheetNotFound(f"index {index} not found")
+
+
+class ClienteSimulado:
+    """Equivalente a gspread.Client: open(nombre) devuelve el libro registrado con ese nombre."""
+    def __init__(self, libros=None):
+        self.libros = dict(libros or {})
+
+    def open(self, title, **kwargs):
+        if title not in self.libros: raise SpreadsheetNotFound(title)
+        return self.libros[title]
+
+
+# --- CSV ---
+def desde_directorio(directorio, titulo='simulado', limites=None):
+    """Un libro con una pestaña por CSV; ORDEN_HOJAS primero y el resto por nombre."""
+    nombres = [os.path.splitext(a)[0] for a in os.listdir(directorio) if a.lower().endswith('.csv')]
+    nombres = [n for n in ORDEN_HOJAS if n in nombres] + sorted(n for n in nombres if n not in ORDEN_HOJAS)
+    libro = LibroSimulado(titulo, limites)
+    for nombre in nombres:
+        with open(os.path.join(directorio, f"{nombre}.csv"), newline='', encoding='utf-8') as f:
+            libro.agregar_hoja(nombre, list(csv.reader(f)))
+    return libro
+
+
+def _escribir_csv(ruta, filas):
+    with open(ruta, 'w', newline='', encoding='utf-8') as f: csv.writer(f).writerows(filas)
+
+
+def generar_fixtures(directorio, lotes=10000, dias=5000, tickers=500, semilla=None):
+    """CSV sintéticos a escala (portafolio, ventas e históricos de precios) para sembrar el libro."""
+    import numpy as np
+    import benchmarks
+
+    semilla = benchmarks.SEMILLA if semilla is None else semilla
+    os.makedirs(directorio, exist_ok=True)
+    df = benchmarks.matriz_sintetica(tickers, max(1, -(-dias // 252)), semilla=semilla).iloc[-dias:]
+
+    historico = [['Date'] + list(df.columns)]
+    valores = np.where(np.isnan(df.values), 0, df.values)  # El bot escribe 0 donde no hay precio
+    historico += [[f"{fecha:%Y-%m-%d}"] + [f"{v:.2f}" for v in fila] for fecha, fila in zip(df.index, valores)]
+    _escribir_csv(os.path.join(directorio, 'Historial_Yahoo.csv'), historico)
+    _escribir_csv(os.path.join(directorio, 'Historial_Cedears_Ext.csv'), historico)
+
+    port = benchmarks.portafolio_sintetico(df, lotes, semilla=semilla)
+    port['Ticker'] = port['Ticker'].str.replace('.BA', '', regex=False)
+    # Mezcla de formatos como en la planilla real (1.234,56 / número)
+    formateado = port['Precio_Compra'].map(lambda v: f"{v:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+    port['Precio_Compra'] = port['Precio_Compra'].astype(str).where(np.arange(lotes) % 2 == 0, formateado)
+    _escribir_csv(os.path.join(directorio, 'Portafolio.csv'), [list(port.columns)] + port.astype(str).values.tolist())
+
+    _escribir_csv(os.path.join(directorio, 'Historial.csv'), [[
+        'Ticker', 'Fecha_Compra', 'Precio_Compra', 'Fecha_Venta', 'Precio_Venta', 'Cantidad',
+        'Costo_Total_Origen', 'Ingreso_Total_Venta', 'Resultado_Neto', 'Broker', 'Alerta_Alta', 'Alerta_Baja']])
+    return directorio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fixtures CSV para el libro de Sheets simulado.")
+    parser.add_argument('--generar', required=True, help="Directorio donde escribir los CSV")
+    parser.add_argument('--lotes', type=int, default=10000)
+    parser.add_argument('--dias', type=int, default=5000)
+    parser.add_argument('--tickers', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    generar_fixtures(args.generar, args.lotes, args.dias, args.tickers)
+    print(f"Fixtures en {args.generar} ({time.perf_counter() - t0:.1f}s)")
+    for archivo in sorted(os.listdir(args.generar)):
+        print(f"  {archivo}: {os.path.getsize(os.path.join(args.generar, archivo)) / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+import os
+import pickle
+import tempfile
+
+try:
+    from config import DIR_COMPARTIDO
+except ImportError:
+    DIR_COMPARTIDO = os.path.join(tempfile.gettempdir(), 'bot_inversiones')
+
+# Último estado calculado (screener, precios, MEP) en disco para que una sesión nueva lo muestre
+# al instante. Pickle de pandas: unas decenas de KB que se leen en milisegundos. Se escribe a un
+# temporal y se reemplaza con os.replace, así nunca se lee un archivo a medio escribir.
+# api.py sirve este mismo archivo (más el estado de alertas y la valuación) a clientes externos.
+FORMATO = 1
+CLAVES = ['screener', 'precios_actuales', 'mep_valor', 'mep_var', 'mep_serie', 'last_update', 'alertas_estado', 'portafolio']
+
+
+def _ruta(directorio=None):
+    return os.path.join(directorio or DIR_COMPARTIDO, 'snapshot.pkl')
+
+
+def guardar(datos, directorio=None):
+    """Persiste el snapshot (dict con CLAVES). Un error de disco no debe cortar el refresco."""
+    ruta = _ruta(directorio)
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            pickle.dump({'formato': FORMATO, **{k: datos.get(k) for k in CLAVES}}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, ruta)
+        return True
+    except Exception as e:
+        print(f"WARN: no se pudo guardar el snapshot: {e}")
+        return False
+
+
+def cargar(directorio=None):
+    """Devuelve el último snapshot o None si no hay (o es de un formato anterior)."""
+    try:
+        with open(_ruta(directorio), 'rb') as f: datos = pickle.load(f)
+    except Exception: return None
+    if not isinstance(datos, dict) or datos.get('formato') != FORMATO: return None
+    return datos
+
+
+def version(directorio=None):
+    """mtime (ns) del snapshot en disco o None: cambia con cada guardar()."""
+    try: return os.stat(_ruta(directorio)).st_mtime_ns
+    except OSError: return None
@@ -0,0 +1,98 @@
+import threading
+import time
+from functools import wraps
+import tracing
+
+# Caché stale-while-revalidate para lecturas de Sheets, compartida por todas las sesiones del
+# proceso. Mientras la entrada es fresca se devuelve tal cual; vencida (pero dentro de max_edad)
+# se devuelve igual y se lanza UN refresco en segundo plano por clave (single-flight). Solo se
+# bloquea en la primera carga o si la entrada superó max_edad. Si la lectura falla se espera
+# un backoff exponencial antes de reintentar y se sigue sirviendo el valor anterior. Los
+# reintentos con espera (reintentar) corren solo en el refresco de fondo: nunca bloquean a quien lee.
+_CACHES = []
+
+
+class _Entrada:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.valor = None
+        self.leido = 0.0       # epoch de la última lectura exitosa (0 = nunca)
+        self.fallos = 0
+        self.reintento = 0.0   # no reintentar antes de este epoch
+        self.refrescando = False
+
+
+def cache_swr(ttl, max_edad, backoff=30, backoff_max=600, copiar=None, reintentar=None):
+    """
+    Decorador. La función decorada debe lanzar excepción si la lectura falla (no devolver vacío).
+    Sin un valor de menos de max_edad seg se lanza LookupError. copiar(valor) se aplica a cada
+    hit para que quien llama no modifique el valor compartido. reintentar(func) envuelve solo la
+    lectura de fondo (p. ej. database.retry_api_call). Expone .clear() como st.cache_data.
+    """
+    def deco(func):
+        func_fondo = reintentar(func) if reintentar else func
+        entradas = {}
+        lock_entradas = threading.Lock()
+
+        def _entrada(clave):
+            with lock_entradas:
+                if clave not in entradas: entradas[clave] = _Entrada()
+                return entradas[clave]
+
+        def _leer(e, args, kwargs, lectura=func):
+            try:
+                valor = lectura(*args, **kwargs)
+            except Exception as ex:
+                e.fallos += 1
+                e.reintento = time.time() + min(backoff * 2 ** (e.fallos - 1), backoff_max)
+                print(f"WARN: falló la lectura de {func.__name__} ({e.fallos} seguidas): {ex}")
+                return False
+            e.valor, e.leido, e.fallos, e.reintento = valor, time.time(), 0, 0.0
+            return True
+
+        def _refrescar_fondo(e, args, kwargs):
+            try:
+                with e.lock: _leer(e, args, kwargs, func_fondo)
+            finally:
+                e.refrescando = False
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            clave = (args, tuple(sorted(kwargs.items())))
+            e = _entrada(clave)
+            ahora = time.time()
+            edad = ahora - e.leido
+
+            nombre = f"cache.{func.__name__}"
+            if not e.leido or edad >= max_edad:
+                tracing.contar(nombre, 'miss')
+                # Sin valor utilizable: lectura sincrónica, una sola por clave aunque llamen varias sesiones
+                with e.lock:
+                    vencida = not e.leido or time.time() - e.leido >= max_edad
+                    if vencida and time.time() >= e.reintento: _leer(e, args, kwargs)
+                if not e.leido or time.time() - e.leido >= max_edad:
+                    raise LookupError(f"{func.__name__}: sin datos de menos de {max_edad} seg")
+            elif edad >= ttl and ahora >= e.reintento:
+                tracing.contar(nombre, 'vencido')
+                with lock_entradas:
+                    lanzar = not e.refrescando
+                    e.refrescando = True
+                if lanzar:
+                    threading.Thread(target=_refrescar_fondo, args=(e, args, kwargs), daemon=True).start()
+
+            else:
+                tracing.contar(nombre, 'hit')
+
+            return copiar(e.valor) if copiar else e.valor
+
+        def clear():
+            with lock_entradas: entradas.clear()
+
+        wrapper.clear = clear
+        _CACHES.append(wrapper)
+        return wrapper
+    return deco
+
+
+def limpiar_todo():
+    for cache in _CACHES: cache.clear()
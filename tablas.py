@@ -0,0 +1,61 @@
+import pandas as pd
+import streamlit as st
+
+# Grillas sin Styler: la señal va como columna categórica con ícono (se mapean las pocas
+# categorías, no cada celda) y el formato numérico lo hace el front con st.column_config.
+# Así se envía un DataFrame plano a Arrow y el costo de un rerun casi no depende de las filas.
+ICONOS_SENAL = {
+    'COMPRAR': '🟢 COMPRAR',
+    'TAKE PROFIT': '🟢 TAKE PROFIT',
+    'STOP LOSS': '🔴 STOP LOSS',
+    'VENDER (Obj)': '🟡 VENDER (Obj)',
+    'PRECIO FALTANTE': '⚠️ PRECIO FALTANTE',
+    'NEUTRO': '⚪ NEUTRO',
+    'PENDIENTE': '⏳ PENDIENTE',
+}
+
+
+def senal_categorica(senal):
+    """Señal -> categórica con ícono, en el orden de ICONOS_SENAL (los valores desconocidos van al final)."""
+    senal = senal.astype(str)
+    categorias = list(ICONOS_SENAL) + sorted(set(senal.unique()) - set(ICONOS_SENAL))
+    cat = pd.Categorical(senal, categories=categorias)
+    return pd.Series(cat.rename_categories([ICONOS_SENAL.get(c, c) for c in categorias]), index=senal.index)
+
+
+def _moneda(moneda, label=None):
+    return st.column_config.NumberColumn(label=label, format="US$%.2f" if moneda == 'USD' else "$%.2f")
+
+
+def config_screener(moneda='ARS'):
+    return {
+        'Precio': _moneda(moneda),
+        'Cantidad_Total': st.column_config.NumberColumn("Cantidad", format="%.0f"),
+        'RSI': st.column_config.ProgressColumn("RSI", format="%.1f", min_value=0, max_value=100),
+        'Caida_30d': st.column_config.NumberColumn("Caída 30d", format="percent"),
+        'Caida_5d': st.column_config.NumberColumn("Caída 5d", format="percent"),
+        'Var_Ayer': st.column_config.NumberColumn("Var. Ayer", format="percent"),
+        'Suma_Caidas': st.column_config.NumberColumn("Suma Caídas", format="percent"),
+        'RSI_Intradia': st.column_config.NumberColumn("RSI 5m", format="%.1f"),
+        'Caida_Intradia': st.column_config.NumberColumn("Caída hoy", format="percent"),
+        'Estado': st.column_config.TextColumn("Señal"),
+        'Actualizado': st.column_config.DatetimeColumn("Actualizado", format="HH:mm:ss"),
+        'Broker_Principal': st.column_config.TextColumn("Broker"),
+    }
+
+
+def config_portafolio(moneda='ARS'):
+    return {
+        'Cantidad': st.column_config.NumberColumn(format="%.0f"),
+        'P.Compra': _moneda(moneda), 'P.Actual': _moneda(moneda), 'Inv.Total': _moneda(moneda),
+        'GB': _moneda(moneda), 'GN': _moneda(moneda),
+        '%GB': st.column_config.NumberColumn(format="percent"),
+        '%GN': st.column_config.NumberColumn(format="percent"),
+        'A.Alta': _moneda(moneda), 'A.Baja': _moneda(moneda),
+        'Estado': st.column_config.TextColumn("Señal"),
+    }
+
+
+def sin_ceros(serie):
+    """Precios en 0 (sin cotización) como vacíos: el front los muestra en blanco en vez de 0,00."""
+    return serie.where(serie != 0)
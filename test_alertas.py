@@ -0,0 +1,73 @@
+import pandas as pd
+import alerts
+
+T0 = 1_700_000_000.0
+COOLDOWN = 3600
+
+
+def _cartera(**extra):
+    df = pd.DataFrame({'Ticker': ['GGAL.BA', 'YPFD.BA'], 'Fecha_Compra': ['2024-01-02', '2024-01-03'],
+                       'Precio_Compra': [1000.0, 20000.0], 'Alerta_Alta': [1500.0, 0.0], 'Alerta_Baja': [0.0, 18000.0]})
+    return df.assign(**extra)
+
+
+def _evaluar(precios, estado=None, ahora=T0, cartera=None):
+    return alerts.evaluar_alertas(_cartera() if cartera is None else cartera, pd.Series(precios), estado, ahora=ahora, cooldown_seg=COOLDOWN)
+
+
+def test_clave_lote():
+    assert alerts.clave_lote(_cartera()).tolist() == ['GGAL.BA|2024-01-02|1000.0', 'YPFD.BA|2024-01-03|20000.0']
+
+
+def test_dispara_solo_en_el_flanco():
+    estado, disparos = _evaluar({'GGAL.BA': 1600.0, 'YPFD.BA': 19000.0})
+    assert disparos[['Ticker', 'Tipo']].values.tolist() == [['GGAL.BA', 'TAKE PROFIT']]
+    assert disparos['Timestamp'].tolist() == [T0]
+
+    # Sigue arriba del umbral: la condición está activa, no hay flanco nuevo
+    estado, disparos = _evaluar({'GGAL.BA': 1700.0, 'YPFD.BA': 19000.0}, estado, T0 + 60)
+    assert disparos.empty
+    assert bool(estado.loc['GGAL.BA|2024-01-02|1000.0', 'Activa_Alta'])
+
+
+def test_cooldown_silencia_el_rearme():
+    estado, _ = _evaluar({'GGAL.BA': 1600.0})
+    estado, _ = _evaluar({'GGAL.BA': 1400.0}, estado, T0 + 60)   # se desarma
+    estado, disparos = _evaluar({'GGAL.BA': 1600.0}, estado, T0 + 120)
+    assert disparos.empty                                          # flanco nuevo, pero dentro del cooldown
+    estado, _ = _evaluar({'GGAL.BA': 1400.0}, estado, T0 + 180)
+    _, disparos = _evaluar({'GGAL.BA': 1600.0}, estado, T0 + COOLDOWN + 200)
+    assert disparos['Tipo'].tolist() == ['TAKE PROFIT']
+
+
+def test_cooldown_persistido_en_la_hoja():
+    # Otra sesión ya registró el disparo: la sesión nueva (sin estado) no lo repite
+    cartera = _cartera(CoolDown_Alta=[T0 - 60, 0.0], CoolDown_Baja=[0.0, 0.0])
+    _, disparos = _evaluar({'GGAL.BA': 1600.0, 'YPFD.BA': 17000.0}, cartera=cartera)
+    assert disparos[['Ticker', 'Tipo']].values.tolist() == [['YPFD.BA', 'STOP LOSS']]
+
+
+def test_sin_precio_no_dispara():
+    estado, disparos = _evaluar({'OTRO.BA': 1.0})
+    assert disparos.empty
+    assert not estado[['Activa_Alta', 'Activa_Baja']].to_numpy().any()
+
+
+def test_acumular_y_persistir():
+    _, d1 = _evaluar({'GGAL.BA': 1600.0})
+    d2 = d1.assign(Timestamp=T0 + 10)
+    pendientes = alerts.acumular_disparos(alerts.acumular_disparos(alerts.disparos_vacios(), d1), d2)
+    assert len(pendientes) == 1 and pendientes['Timestamp'].iloc[0] == T0 + 10
+
+    assert not alerts.debe_persistir(alerts.disparos_vacios(), 0, ahora=T0)
+    assert alerts.debe_persistir(pendientes, 0, ahora=T0, forzar=True)
+    assert alerts.debe_persistir(pendientes, T0 - alerts.ALERTAS_FLUSH_SEG, ahora=T0)
+    assert not alerts.debe_persistir(pendientes, T0 - 1, ahora=T0)
+    muchos = pd.concat([pendientes.assign(Clave=f"L{i}") for i in range(alerts.ALERTAS_FLUSH_LOTE)], ignore_index=True)
+    assert alerts.debe_persistir(muchos, T0, ahora=T0)
+
+
+def test_estado_ignora_lotes_duplicados():
+    cartera = pd.concat([_cartera(), _cartera()], ignore_index=True)
+    estado, _ = _evaluar({'GGAL.BA': 1600.0}, cartera=cartera)
+    assert estado.index.is_unique and len(estado) == 2
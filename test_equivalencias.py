@@ -0,0 +1,10 @@
+import pytest
+import benchmarks
+
+# Las versiones vectorizadas contra sus referencias fila a fila (python benchmarks.py --equivalencias)
+_CASOS = benchmarks.equivalencias('chico')
+
+
+@pytest.mark.parametrize('caso', sorted(_CASOS))
+def test_equivalencia(caso):
+    assert not _CASOS[caso], _CASOS[caso]
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+import indicators
+
+
+def _matriz(filas=700, columnas=6, seed=3):
+    """Precios empaquetados: cada columna empieza en un día distinto (NaN solo al principio)."""
+    rng = np.random.default_rng(seed)
+    m = 100 * np.cumprod(1 + rng.normal(0, 0.02, (filas, columnas)), axis=0)
+    for j, inicio in enumerate([0, 1, 13, 14, 300, filas - 5][:columnas]):
+        m[:inicio, j] = np.nan
+    return m
+
+
+@pytest.mark.parametrize('n', [1, 2, 14, 200])
+def test_rma_igual_a_ewm(n):
+    # 700 filas con n=200 cruzan varios bloques de la recurrencia
+    m = _matriz()
+    esperado = pd.DataFrame(m).ewm(alpha=1 / n, min_periods=n, adjust=True).mean().to_numpy()
+    np.testing.assert_allclose(indicators._rma(m, n), esperado, rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('n', [2, 14, 200])
+def test_rma_final_es_la_ultima_fila(n):
+    m = _matriz()
+    np.testing.assert_allclose(indicators._rma_final(m, n), indicators._rma(m, n)[-1], rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('n', [1, 5, 50])
+def test_sma_igual_a_rolling(n):
+    m = _matriz()
+    esperado = pd.DataFrame(m).rolling(n).mean().to_numpy()
+    np.testing.assert_allclose(indicators._sma(m, n), esperado, rtol=1e-9, equal_nan=True)
+
+
+def test_rsi_igual_a_la_formula_de_wilder():
+    m = _matriz(columnas=4)
+    delta = pd.DataFrame(m).diff()
+    prom_g = delta.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    prom_p = delta.clip(upper=0).abs().ewm(alpha=1 / 14, min_periods=14).mean()
+    esperado = (100 * prom_g / (prom_g + prom_p)).to_numpy()
+    d = np.diff(m, axis=0, prepend=np.nan)
+    np.testing.assert_allclose(indicators._rsi(indicators._ganancia(d), indicators._perdida(d), 14), esperado, rtol=1e-9, equal_nan=True)
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ledger
+import market_logic
+
+
+def _portafolio():
+    return pd.DataFrame({
+        'Ticker': ['GGAL', 'GGAL', 'ypfd', 'AL30'],
+        'Fecha_Compra': ['2024-01-02', '2024-02-01', '2024-01-10', '2024-01-05'],
+        'Precio_Compra': [1000.0, 1200.0, 20000.0, 50000.0],
+        'Cantidad': [5.0, 10.0, 2.0, 100.0],
+        'Broker': ['IOL', 'IOL', 'veta', 'IOL'],
+    })
+
+
+def _historial():
+    # Ventas de lotes ya cerrados (entran como lote original en su Fecha_Compra)
+    return pd.DataFrame({
+        'Ticker': ['GGAL', 'GGAL', 'YPFD', 'GGAL'],
+        'Fecha_Compra': ['2024-01-02', '2024-02-01', '2024-01-10', '2024-01-02'],
+        'Precio_Compra': [1000.0, 1200.0, 20000.0, 1000.0],
+        'Fecha_Venta': ['2024-03-01', '2024-03-05', '2024-02-20', '2024-04-02'],
+        'Precio_Venta': [1500.0, 1400.0, 25000.0, 1600.0],
+        'Cantidad': [8.0, 4.0, 1.0, 3.0],
+        'Resultado_Neto': [3900.0, 700.0, 4800.0, 1750.0],
+        'Broker': ['IOL', 'IOL', 'VETA', 'IOL'],
+    })
+
+
+def _fifo_y_promedio(lotes, ventas):
+    """Referencia con loops: cola FIFO y costo promedio por (Ticker, Broker), compras del día primero."""
+    fifo, prom = {}, {}
+    eventos = [(r.Fecha, 0, i, r) for i, r in enumerate(lotes.itertuples())] + \
+              [(r.Fecha, 1, i, r) for i, r in enumerate(ventas.itertuples())]
+    cola, pos = {}, {}
+    for fecha, tipo, i, r in sorted(eventos, key=lambda e: (e[0], e[1], e[2])):
+        k = (r.Ticker, r.Broker)
+        if tipo == 0:
+            cola.setdefault(k, []).append([r.Cantidad, r.Costo / r.Cantidad])
+            q, c = pos.get(k, (0.0, 0.0))
+            pos[k] = (q + r.Cantidad, c + r.Costo)
+            continue
+        falta, costo = r.Cantidad, 0.0
+        for lote in cola.get(k, []):
+            usar = min(falta, lote[0])
+            costo += usar * lote[1]
+            lote[0] -= usar
+            falta -= usar
+            if not falta: break
+        fifo[i] = costo
+        q, c = pos[k]
+        unit = c / q if q > 0 else 0.0
+        prom[i] = unit * r.Cantidad
+        pos[k] = (q - r.Cantidad, c - unit * r.Cantidad)
+    return np.array([fifo[i] for i in range(len(ventas))]), np.array([prom[i] for i in range(len(ventas))])
+
+
+def test_lotes_originales():
+    lotes = ledger.reconstruir_lotes(_portafolio(), _historial())
+    ggal = lotes[lotes['Ticker'] == 'GGAL.BA'].set_index('Fecha')['Cantidad']
+    # Abierto + vendido de cada lote
+    assert ggal.to_dict() == {pd.Timestamp('2024-01-02'): 16.0, pd.Timestamp('2024-02-01'): 14.0}
+    assert set(lotes['Broker']) == {'IOL', 'VETA'}
+
+    bono = lotes[lotes['Ticker'] == 'AL30.BA'].iloc[0]
+    bruto = 100 * 50000.0 / 100
+    assert bono['Costo'] == pytest.approx(bruto + market_logic.calcular_comision_real(bruto, 'IOL', True))
+
+
+def test_fifo_y_promedio_contra_referencia():
+    libro = ledger.construir_ledger(_portafolio(), _historial())
+    ventas = libro['ventas']
+    fifo, prom = _fifo_y_promedio(libro['lotes'], ventas)
+    np.testing.assert_allclose(ventas['Costo_FIFO'], fifo, rtol=1e-9)
+    np.testing.assert_allclose(ventas['Costo_Promedio'], prom, rtol=1e-9)
+    np.testing.assert_allclose(ventas['Resultado_FIFO'], ventas['Ingreso'] - fifo, rtol=1e-9)
+
+    # La primera venta de GGAL (8 nominales) sale entera del lote del 2 de enero
+    primera = ventas[(ventas['Ticker'] == 'GGAL.BA')].iloc[0]
+    lote = libro['lotes'][(libro['lotes']['Ticker'] == 'GGAL.BA')].iloc[0]
+    assert primera['Costo_FIFO'] == pytest.approx(lote['Costo'] * 8 / 16)
+
+
+def test_agregados():
+    libro = ledger.construir_ledger(_portafolio(), _historial())
+    por_ticker = libro['agregados']['Ticker']
+    assert por_ticker.loc['GGAL.BA', 'Operaciones'] == 3
+    assert por_ticker.loc['GGAL.BA', 'Resultado_Lote'] == pytest.approx(3900.0 + 700.0 + 1750.0)
+    assert por_ticker['Resultado_FIFO'].sum() == pytest.approx(libro['ventas']['Resultado_FIFO'].sum())
+    tabla = ledger.resumen(libro, 'Mes', 'Promedio')
+    assert list(tabla.index) == sorted(tabla.index, reverse=True)
+
+
+def test_actualizacion_incremental_igual_a_reconstruir():
+    historial = _historial()
+    # Antes de la última venta el lote del 2 de enero tenía 3 nominales más abiertos (abierto + vendido no cambia)
+    previo = ledger.actualizar_ledger(None, _portafolio().assign(Cantidad=[8.0, 10.0, 2.0, 100.0]), historial.iloc[:3])
+    incremental = ledger.actualizar_ledger(previo, _portafolio(), historial)
+    completo = ledger.construir_ledger(_portafolio(), historial)
+    assert incremental['lotes'] is previo['lotes']                # no reconstruyó
+    # La versión incremental agrega al final; la completa ordena por grupo
+    orden = ['Ticker', 'Broker', 'Fecha']
+    cols = orden + ['Costo_FIFO', 'Costo_Promedio', 'Resultado_FIFO', 'Resultado_Promedio']
+    pd.testing.assert_frame_equal(incremental['ventas'][cols].sort_values(orden, kind='stable').reset_index(drop=True),
+                                  completo['ventas'][cols].sort_values(orden, kind='stable').reset_index(drop=True))
+    for dim in ledger.DIMENSIONES:
+        pd.testing.assert_frame_equal(incremental['agregados'][dim].sort_index(), completo['agregados'][dim].sort_index(), check_dtype=False)
+
+
+def test_venta_fuera_de_orden_reconstruye():
+    libro = ledger.construir_ledger(_portafolio(), _historial())
+    vieja = _historial().iloc[[0]].assign(Fecha_Venta='2024-01-15', Cantidad=1.0)
+    with pytest.raises(ValueError):
+        ledger.agregar_ventas(libro, vieja)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+import market_logic
+
+
+def _historial():
+    fechas = pd.bdate_range('2024-03-01', periods=4)
+    return pd.DataFrame({
+        'AL30.BA': [60000.0, 61000.0, np.nan, 63000.0],
+        'AL30D.BA': [50.0, 50.0, 51.0, 0.0],                         # 0: cotización inválida
+        'GD30.BA': [62000.0, 62500.0, np.nan, 64000.0],
+        'GD30D.BA': [50.0, 49.0, 51.0, 50.0],
+        'GD35.BA': [30000.0, 30000.0, 30000.0, 30000.0],             # sin par en dólares
+        'GGAL.BA': [1000.0, 1010.0, 1020.0, 1030.0],
+    }, index=fechas)
+
+
+def test_pares_fx():
+    cols = _historial().columns
+    assert market_logic.pares_fx(cols) == [('AL30.BA', 'AL30D.BA'), ('GD30.BA', 'GD30D.BA')]
+    assert market_logic.pares_fx(cols, 'C') == []
+
+
+def test_serie_mep_es_la_mediana_de_los_pares():
+    df = _historial()
+    mep = market_logic.calcular_serie_mep(df)
+    assert list(mep.columns) == ['AL30', 'GD30', 'MEP']
+    # La fila sin ningún par válido (día 3) se descarta
+    assert list(mep.index) == [df.index[0], df.index[1], df.index[3]]
+    assert mep['MEP'].iloc[0] == pytest.approx(np.median([1200.0, 1240.0]))
+    assert np.isnan(mep['AL30'].iloc[2]) and mep['MEP'].iloc[2] == pytest.approx(1280.0)
+
+    ultimo, variacion = market_logic.ultimo_mep(mep)
+    assert ultimo == pytest.approx(1280.0)
+    assert variacion == pytest.approx(1280.0 / mep['MEP'].iloc[1] - 1)
+    assert market_logic.ultimo_mep(pd.DataFrame()) == (None, None)
+
+
+def test_mep_incremental_igual_a_la_serie_completa():
+    df = _historial()
+    hoy = pd.Timestamp('2024-03-07')
+    precios_hoy = {'AL30.BA': 64000.0, 'AL30D.BA': 50.0, 'GD30.BA': 65000.0, 'GD30D.BA': 50.0}
+    incremental = market_logic.actualizar_mep_incremental(market_logic.calcular_serie_mep(df), precios_hoy, hoy)
+    completo = market_logic.calcular_serie_mep(pd.concat([df, pd.DataFrame([precios_hoy], index=[hoy])]))
+    pd.testing.assert_frame_equal(incremental, completo, check_freq=False)
+
+    # Un par sin cotización hoy mantiene su último valor
+    parcial = market_logic.actualizar_mep_incremental(completo, {'GD30.BA': 66000.0, 'GD30D.BA': 50.0}, hoy)
+    assert len(parcial) == len(completo)
+    assert parcial.loc[hoy, 'AL30'] == pytest.approx(1280.0) and parcial.loc[hoy, 'GD30'] == pytest.approx(1320.0)
+
+
+def test_convertir_montos_al_mep_de_su_fecha():
+    mep = market_logic.calcular_serie_mep(_historial())
+    montos = pd.Series([1200.0, 2560.0, 1000.0])
+    # Antes del inicio usa el primer valor; un día sin MEP usa el último conocido; sin fecha, el último
+    fechas = ['2024-02-01', '2024-03-05', None]
+    usd = market_logic.convertir_montos_a_usd(montos, fechas, mep)
+    esperado = [1200.0 / mep['MEP'].iloc[0], 2560.0 / mep['MEP'].iloc[1], 1000.0 / 1280.0]
+    np.testing.assert_allclose(usd, esperado)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+import nav
+
+
+def _operaciones():
+    portafolio = pd.DataFrame({
+        'Ticker': ['GGAL', 'AL30', 'YPFD'],
+        'Fecha_Compra': ['2024-01-03', '2024-01-06', '2024-02-10'],   # sábado: cuenta desde el lunes
+        'Precio_Compra': [1000.0, 50000.0, 20000.0],
+        'Cantidad': [10.0, 200.0, 3.0],
+        'Broker': ['IOL', 'IOL', 'VETA'],
+    })
+    historial = pd.DataFrame({
+        'Ticker': ['GGAL'], 'Fecha_Compra': ['2024-01-03'], 'Fecha_Venta': ['2024-03-01'],
+        'Cantidad': [4.0], 'Costo_Total_Origen': [4030.0], 'Resultado_Neto': [1500.0],
+    })
+    return portafolio, historial
+
+
+def _precios(dias=80):
+    fechas = pd.bdate_range('2024-01-02', periods=dias)
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        'GGAL.BA': 1000 * np.cumprod(1 + rng.normal(0, 0.02, dias)),
+        'YPFD.BA': 20000 * np.cumprod(1 + rng.normal(0, 0.02, dias)),
+        'AL30.BA': 50000 * np.cumprod(1 + rng.normal(0, 0.01, dias)),
+    }, index=fechas)
+    df.iloc[10:14, 0] = np.nan                                      # hueco de una semana
+    return df
+
+
+def _nav_con_loop(portafolio, historial, precios):
+    """Referencia día por día: tenencia = movimientos con fecha <= día, precio = último conocido."""
+    mov = nav.construir_movimientos(portafolio, historial)
+    mov = mov[mov['Ticker'].isin(precios.columns)]
+    precios = precios.ffill().fillna(0)
+    divisor = pd.Series([100.0 if t.startswith('AL') else 1.0 for t in precios.columns], index=precios.columns)
+    filas = []
+    for dia, fila in precios.iterrows():
+        hasta = mov[mov['Fecha'].dt.normalize() <= dia]
+        tenencia = hasta.groupby('Ticker')['Cantidad'].sum().reindex(precios.columns, fill_value=0.0)
+        filas.append({'Valor_Mercado': float((tenencia * fila / divisor).sum()),
+                      'Capital_Invertido': hasta['Costo'].sum(), 'Ganancia_Realizada': hasta['Realizado'].sum()})
+    return pd.DataFrame(filas, index=precios.index)
+
+
+def test_nav_contra_loop_diario():
+    portafolio, historial = _operaciones()
+    precios = _precios()
+    serie, _ = nav.calcular_nav(portafolio, historial, precios)
+    esperado = _nav_con_loop(portafolio, historial, precios)
+    assert list(serie.columns) == nav.COLS_NAV
+    for col in esperado.columns:
+        np.testing.assert_allclose(serie[col], esperado[col], rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(serie['Resultado_Total'], serie['Valor_Mercado'] - serie['Capital_Invertido'] + serie['Ganancia_Realizada'])
+    assert (serie['Drawdown'] <= 0).all()
+
+
+def test_hueco_de_precios_usa_el_ultimo_cierre():
+    portafolio, historial = _operaciones()
+    precios = _precios()
+    serie, _ = nav.calcular_nav(portafolio, historial, precios)
+    # En el hueco GGAL vale el cierre anterior, no 0: el valor no cae de golpe
+    sin_hueco, _ = nav.calcular_nav(portafolio, historial, precios.fillna({'GGAL.BA': precios['GGAL.BA'].ffill()}))
+    pd.testing.assert_frame_equal(serie, sin_hueco)
+
+
+def test_incremental_igual_a_recalcular(monkeypatch):
+    portafolio, historial = _operaciones()
+    precios = _precios()
+    _, estado = nav.calcular_nav(portafolio, historial, precios.iloc[:-5])
+    # Llegan días nuevos y cambia el precio en vivo de la última fila conocida
+    nuevos = precios.copy()
+    nuevos.iloc[-6, 1] *= 1.03
+    tramos = []
+    original = nav._calcular_tramo
+    monkeypatch.setattr(nav, '_calcular_tramo', lambda mov, df, desde, *a: tramos.append(desde) or original(mov, df, desde, *a))
+    incremental, _ = nav.calcular_nav(portafolio, historial, nuevos, estado)
+    completo, _ = nav.calcular_nav(portafolio, historial, nuevos)
+    assert tramos == [len(precios) - 6, 0]                           # solo la última fila conocida y los días nuevos
+    pd.testing.assert_frame_equal(incremental, completo, rtol=1e-12)
+
+
+def test_precio_pasado_reescrito_recalcula_todo():
+    portafolio, historial = _operaciones()
+    precios = _precios()
+    _, estado = nav.calcular_nav(portafolio, historial, precios)
+    ajustado = precios.copy()
+    ajustado.iloc[5, 0] *= 0.5                                       # ajuste de calidad en el pasado
+    incremental, _ = nav.calcular_nav(portafolio, historial, ajustado, estado)
+    completo, _ = nav.calcular_nav(portafolio, historial, ajustado)
+    pd.testing.assert_frame_equal(incremental, completo)
+    assert incremental['Valor_Mercado'].iloc[5] != pytest.approx(_nav_con_loop(portafolio, historial, precios)['Valor_Mercado'].iloc[5])
+
+
+def test_precios_de_hoy_reemplazan_la_fila():
+    precios = _precios(5)
+    hoy = precios.index[-1]
+    con_hoy = nav.agregar_precios_hoy(precios, pd.Series({'GGAL.BA': 1.0}), hoy)
+    assert len(con_hoy) == 5 and con_hoy.loc[hoy, 'GGAL.BA'] == 1.0
+    assert con_hoy.loc[hoy, 'YPFD.BA'] == precios['YPFD.BA'].iloc[-2]
@@ -0,0 +1,42 @@
+"""
+Humo de las páginas: cada una se ejecuta con AppTest contra Sheets e IOL simulados (los fixtures
+chicos de benchmarks) y no puede terminar con una excepción ni mostrar un st.error (las páginas
+atrapan sus errores y los muestran así, p. ej. "Error cargando módulo").
+"""
+import json
+import subprocess
+import sys
+import pytest
+import benchmarks
+
+# En un intérprete nuevo (config lee el entorno al importarse): la sesión arranca en home.py, se
+# siembran precios con la última fila del historial simulado y se navega a la página.
+_CORRER_PAGINA = """
+import json, logging, os, sys
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+from streamlit.testing.v1 import AppTest
+import database
+
+at = AppTest.from_file(os.path.join(os.getcwd(), 'home.py'), default_timeout=120)
+at.secrets['gcp_service_account'] = {'tipo': 'simulado'}
+at.secrets['IOL_USER'], at.secrets['IOL_PASSWORD'], at.secrets['SHEET_NAME'] = 'simulado', 'simulado', 'simulado'
+at.run()
+if sys.argv[1] != 'home.py':
+    if at.session_state['precios_actuales'].empty:
+        at.session_state['precios_actuales'] = database.get_historical_matrix().a_frame().iloc[-1].dropna()
+    at.switch_page(sys.argv[1]).run()
+print(json.dumps({'excepciones': [str(e.value) for e in at.exception], 'errores': [str(e.value) for e in at.error]}))
+"""
+
+
+@pytest.fixture(scope='module')
+def entorno(tmp_path_factory):
+    return benchmarks._entorno_arranque(str(tmp_path_factory.mktemp('paginas')))
+
+
+@pytest.mark.parametrize('pagina', benchmarks.PAGINAS)
+def test_pagina_sin_errores(pagina, entorno):
+    r = subprocess.run([sys.executable, '-c', _CORRER_PAGINA, pagina], cwd=benchmarks.RAIZ, env=entorno,
+                       capture_output=True, text=True, timeout=300)
+    assert r.returncode == 0, r.stderr[-2000:]
+    assert json.loads(r.stdout.strip().splitlines()[-1]) == {'excepciones': [], 'errores': []}
@@ -0,0 +1,81 @@
+import glob
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import price_matrix
+from price_matrix import MatrizPrecios
+
+
+def _frame(dias=10):
+    fechas = pd.bdate_range('2024-01-02', periods=dias)
+    df = pd.DataFrame({'GGAL.BA': np.arange(dias, dtype=float) + 100, 'YPFD.BA': np.arange(dias, dtype=float) * 2 + 50,
+                       'AL30.BA': np.nan}, index=fechas)
+    df.iloc[3:5, 0] = np.nan
+    df.iloc[7:, 2] = 60000.0
+    return df
+
+
+@pytest.fixture
+def directorio(tmp_path, monkeypatch):
+    # Estado de mapeos propio por prueba (el módulo lo comparte por proceso)
+    monkeypatch.setattr(price_matrix, '_MAPEADAS', {})
+    return str(tmp_path)
+
+
+def test_ida_y_vuelta_y_vistas():
+    df = _frame()
+    m = MatrizPrecios.desde_frame(df)
+    pd.testing.assert_frame_equal(m.a_frame(float), df, check_freq=False)
+    v = m.ventana(desde='2024-01-05', hasta='2024-01-10')
+    assert list(v.fechas) == list(df.loc['2024-01-05':'2024-01-09'].index)
+    assert np.shares_memory(v.valores, m.valores)
+    sel = m.seleccionar(['YPFD.BA', 'NO_EXISTE', 'GGAL.BA'])
+    assert sel.tickers == ['GGAL.BA', 'YPFD.BA']                     # orden de la matriz
+    pd.testing.assert_frame_equal(m.ffill().a_frame(float), df.ffill(), check_freq=False)
+
+
+def test_con_fila_reemplaza_y_agrega_tickers():
+    m = MatrizPrecios.desde_frame(_frame())
+    ultima = m.fechas[-1]
+    nueva = m.con_fila(ultima, {'GGAL.BA': 1.0, 'NUEVO.BA': 2.0})
+    assert nueva.shape == (10, 4) and nueva.tickers[-1] == 'NUEVO.BA'
+    fila = nueva.a_frame(float).iloc[-1]
+    assert fila['GGAL.BA'] == 1.0 and fila['NUEVO.BA'] == 2.0 and np.isnan(fila['YPFD.BA'])
+    assert m.con_fila(ultima + pd.offsets.BDay(), {'GGAL.BA': 1.0}).shape == (11, 3)
+
+
+def test_publicar_y_abrir(directorio):
+    assert price_matrix.abrir('historial', directorio) == (None, 0)
+    df = _frame()
+    publicada = price_matrix.publicar(MatrizPrecios.desde_frame(df), 'historial', directorio)
+    assert isinstance(publicada.valores, np.memmap) and not publicada.valores.flags.writeable
+    # El encabezado guarda las fechas en ns
+    pd.testing.assert_frame_equal(publicada.a_frame(float), df.set_axis(df.index.as_unit('ns')), check_freq=False)
+
+    # Sin cambios en disco el mismo mapeo se reutiliza
+    matriz, publicado = price_matrix.abrir('historial', directorio)
+    assert matriz is publicada and publicado > 0
+
+
+def test_otro_proceso_ve_la_generacion_nueva(directorio, monkeypatch):
+    price_matrix.publicar(MatrizPrecios.desde_frame(_frame()), 'historial', directorio)
+    monkeypatch.setattr(price_matrix, '_MAPEADAS', {})                # lector de otro proceso
+    vieja, _ = price_matrix.abrir('historial', directorio)
+    price_matrix.publicar(MatrizPrecios.desde_frame(_frame(12)), 'historial', directorio)
+    price_matrix.publicar(MatrizPrecios.desde_frame(_frame(13)), 'historial', directorio)
+    nueva, _ = price_matrix.abrir('historial', directorio)
+    assert nueva.shape == (13, 3) and vieja.shape == (10, 3)
+    # Se conservan las dos últimas generaciones
+    assert len(glob.glob(os.path.join(directorio, 'historial.*.npy'))) == price_matrix._GENERACIONES_CONSERVADAS
+
+
+def test_invalidar(directorio):
+    price_matrix.publicar(MatrizPrecios.desde_frame(_frame()), 'historial', directorio)
+    price_matrix.publicar(MatrizPrecios.desde_frame(_frame()), 'indicadores', directorio)
+    price_matrix.invalidar('historial', directorio)
+    assert price_matrix.abrir('historial', directorio)[1] == 0
+    assert price_matrix.abrir('indicadores', directorio)[1] > 0
+    price_matrix.invalidar(directorio=directorio)
+    matriz, publicado = price_matrix.abrir('indicadores', directorio)
+    assert publicado == 0 and matriz.shape == (10, 3)                 # vencida, pero sigue legible
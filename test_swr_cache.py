@@ -0,0 +1,99 @@
+import threading
+import types
+import pytest
+import swr_cache
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """Reloj manual para el módulo: reloj[0] es el epoch actual."""
+    ahora = [1000.0]
+    monkeypatch.setattr(swr_cache, 'time', types.SimpleNamespace(time=lambda: ahora[0]))
+    return ahora
+
+
+def _lector(valores):
+    """Función de lectura que devuelve valores.pop(0) (o lanza si es una excepción) y cuenta llamadas."""
+    llamadas = []
+
+    def leer(clave):
+        llamadas.append(clave)
+        valor = valores.pop(0)
+        if isinstance(valor, Exception): raise valor
+        return valor
+    return leer, llamadas
+
+
+def _esperar_refrescos():
+    for hilo in threading.enumerate():
+        if '_refrescar_fondo' in hilo.name: hilo.join(5)
+
+
+def test_fresco_no_relee_y_copia(reloj):
+    leer, llamadas = _lector([[1, 2]])
+    cache = swr_cache.cache_swr(ttl=60, max_edad=600, copiar=list)(leer)
+    a = cache('x')
+    a.append(3)
+    reloj[0] += 59
+    assert cache('x') == [1, 2]
+    assert llamadas == ['x']
+
+
+def test_single_flight_en_segundo_plano(reloj):
+    liberar = threading.Event()
+    valores = ['v1', 'v2']
+    llamadas = []
+
+    def leer(clave):
+        llamadas.append(clave)
+        if len(llamadas) > 1: liberar.wait(5)
+        return valores.pop(0)
+
+    cache = swr_cache.cache_swr(ttl=60, max_edad=600)(leer)
+    assert cache('x') == 'v1'
+    reloj[0] += 120
+    # Varias lecturas con la entrada vencida: todas reciben el valor viejo y se lanza un solo refresco
+    assert [cache('x') for _ in range(5)] == ['v1'] * 5
+    liberar.set()
+    _esperar_refrescos()
+    assert llamadas == ['x', 'x']
+    assert cache('x') == 'v2'
+
+
+def test_sin_datos_recientes_lanza_lookup_y_respeta_el_backoff(reloj):
+    leer, llamadas = _lector([RuntimeError('429'), 'v1'])
+    cache = swr_cache.cache_swr(ttl=60, max_edad=600, backoff=30)(leer)
+    with pytest.raises(LookupError):
+        cache('x')
+    reloj[0] += 10
+    with pytest.raises(LookupError):
+        cache('x')                                                   # dentro del backoff: no reintenta
+    assert len(llamadas) == 1
+    reloj[0] += 30
+    assert cache('x') == 'v1'
+
+
+def test_reintentar_solo_en_el_fondo(reloj):
+    envueltas = []
+
+    def reintentar(func):
+        def con_reintento(*args):
+            envueltas.append(args)
+            return func(*args)
+        return con_reintento
+
+    leer, llamadas = _lector(['v1', 'v2'])
+    cache = swr_cache.cache_swr(ttl=60, max_edad=600, reintentar=reintentar)(leer)
+    assert cache('x') == 'v1' and envueltas == []                    # la carga inicial no se envuelve
+    reloj[0] += 120
+    cache('x')
+    _esperar_refrescos()
+    assert envueltas == [('x',)] and cache('x') == 'v2'
+
+
+def test_clear(reloj):
+    leer, llamadas = _lector(['v1', 'v2'])
+    cache = swr_cache.cache_swr(ttl=60, max_edad=600)(leer)
+    cache('x')
+    cache.clear()
+    assert cache('x') == 'v2' and llamadas == ['x', 'x']
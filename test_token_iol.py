@@ -0,0 +1,34 @@
+import time
+import pytest
+import data_client
+import intradia
+import iol_simulado
+
+TICKERS = ['GGAL.BA', 'YPFD.BA', 'AL30.BA', 'PAMP.BA', 'BMA.BA', 'TXAR.BA']
+
+
+@pytest.fixture
+def simulador(monkeypatch, tmp_path):
+    """IOL simulado con tokens de 1 seg y un token compartido nuevo para la prueba."""
+    servidor, sim, url = iol_simulado.iniciar(token_ttl=1)
+    monkeypatch.setattr(data_client, 'IOL_BASE_URL', url)
+    monkeypatch.setattr(data_client, 'IOL_TOKEN_URL', f"{url}/token")
+    monkeypatch.setattr(data_client, '_credenciales_iol', lambda: ('simulado', 'simulado'))
+    monkeypatch.setattr(data_client, '_TOKEN', data_client._Token())
+    monkeypatch.setattr(intradia, 'DIARIO', intradia.Diario(str(tmp_path)))
+    yield sim
+    servidor.shutdown()
+
+
+def test_token_reutilizado_entre_refrescos(simulador):
+    for _ in range(3):
+        assert len(data_client.get_current_prices_iol(TICKERS)) == len(TICKERS)
+    assert simulador.stats['tokens'] == 1 and simulador.stats['401'] == 0
+
+
+def test_vencido_se_renueva_una_sola_vez(simulador):
+    data_client.get_current_prices_iol(TICKERS)
+    time.sleep(1.5)
+    # Todos los hilos reciben 401 con el token viejo; uno solo pide el nuevo y todos reintentan
+    assert len(data_client.get_current_prices_iol(TICKERS)) == len(TICKERS)
+    assert simulador.stats['tokens'] == 2 and simulador.stats['401'] == len(TICKERS)
@@ -0,0 +1,29 @@
+import pytest
+import tracing
+
+
+@pytest.fixture(autouse=True)
+def limpio():
+    tracing.reiniciar()
+    yield
+    tracing.reiniciar()
+
+
+def test_contadores_fuera_de_los_percentiles():
+    for _ in range(10): tracing.registrar('cache.historial', 'lectura', 0.2)
+    for _ in range(500): tracing.contar('cache.historial', 'hit')
+    tracing.contar('cache.historial', 'miss')
+
+    fila = tracing.resumen().loc['cache.historial']
+    assert fila['N'] == 10 and fila['p50_ms'] == pytest.approx(200.0)
+    assert tracing.por_etiqueta('cache.')['Etiqueta'].tolist() == ['lectura']
+    eventos = tracing.eventos('cache.').set_index('Etiqueta')['N'].to_dict()
+    assert eventos == {'hit': 500, 'miss': 1}
+    assert '"hit"' not in tracing.exportar_jsonl()
+
+
+def test_solo_contadores():
+    tracing.contar('cache.memo', 'serie_fx miss')
+    assert tracing.resumen().empty and tracing.por_etiqueta().empty
+    tracing.reiniciar()
+    assert tracing.eventos().empty
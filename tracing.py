@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+import numpy as np
+import pandas as pd
+
+# Trazas en proceso: cada span guarda (nombre, etiqueta, duración, error) en buffers acotados.
+# Registrar cuesta un perf_counter y un append bajo lock; los percentiles se calculan recién al
+# pedir el resumen (página Rendimiento). Nombres con prefijo por origen: iol.*, sheets.*,
+# cache.*, calc.*, render.*; la etiqueta es el ticker, la hoja o el tipo de hit. Los eventos
+# sin duración (contar) van a contadores aparte: no entran en los percentiles de los spans.
+MUESTRAS_MAX = 2000   # duraciones por nombre para los percentiles
+RECIENTES_MAX = 5000  # spans completos para exportar a JSONL
+
+_lock = threading.Lock()
+_duraciones = defaultdict(lambda: deque(maxlen=MUESTRAS_MAX))
+_conteos = defaultdict(lambda: [0, 0, 0.0, ''])  # (nombre, etiqueta) -> [n, errores, seg_total, último error]
+_recientes = deque(maxlen=RECIENTES_MAX)
+_eventos = defaultdict(int)  # (nombre, etiqueta) -> n
+
+
+def registrar(nombre, etiqueta, duracion, error=None):
+    with _lock:
+        _duraciones[nombre].append(duracion)
+        c = _conteos[(nombre, etiqueta)]
+        c[0] += 1
+        c[2] += duracion
+        if error:
+            c[1] += 1
+            c[3] = error
+        _recientes.append((time.time(), nombre, etiqueta, duracion, error))
+
+
+@contextmanager
+def span(nombre, etiqueta=''):
+    """Mide el bloque; una excepción se registra como error y se vuelve a lanzar."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        registrar(nombre, etiqueta, time.perf_counter() - t0, f"{type(e).__name__}: {e}"[:200])
+        raise
+    registrar(nombre, etiqueta, time.perf_counter() - t0)
+
+
+def trazar(nombre, etiqueta=None):
+    """Decorador de span. etiqueta es fija o una función (*args, **kwargs) -> etiqueta."""
+    def deco(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(nombre, etiqueta(*args, **kwargs) if callable(etiqueta) else (etiqueta or '')):
+                return func(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def contar(nombre, etiqueta=''):
+    """Evento sin duración (hit / miss de caché): solo suma al contador."""
+    with _lock: _eventos[(nombre, etiqueta)] += 1
+
+
+# --- AGREGADOS ---
+def resumen():
+    """Una fila por nombre: cantidad, errores y percentiles en ms."""
+    with _lock:
+        muestras = {n: np.fromiter(d, dtype=float) for n, d in _duraciones.items()}
+        conteos = dict(_conteos)
+    filas = []
+    for nombre, dur in muestras.items():
+        n = sum(c[0] for (nom, _), c in conteos.items() if nom == nombre)
+        errores = sum(c[1] for (nom, _), c in conteos.items() if nom == nombre)
+        p50, p95, p99 = np.percentile(dur, [50, 95, 99]) * 1000 if len(dur) else (np.nan,) * 3
+        filas.append({'Nombre': nombre, 'N': n, 'Errores': errores, 'p50_ms': p50, 'p95_ms': p95,
+                      'p99_ms': p99, 'Max_ms': dur.max() * 1000 if len(dur) else np.nan})
+    if not filas: return pd.DataFrame(columns=['N', 'Errores', 'p50_ms', 'p95_ms', 'p99_ms', 'Max_ms'])
+    return pd.DataFrame(filas).set_index('Nombre').sort_values('p95_ms', ascending=False)
+
+
+def por_etiqueta(prefijo=''):
+    """Cantidad, errores, promedio y último error por (nombre, etiqueta): tickers lentos, hojas, hits."""
+    with _lock:
+        conteos = {k: list(v) for k, v in _conteos.items() if k[0].startswith(prefijo)}
+    if not conteos: return pd.DataFrame(columns=['Nombre', 'Etiqueta', 'N', 'Errores', 'Prom_ms', 'Ultimo_Error'])
+    df = pd.DataFrame([{'Nombre': n, 'Etiqueta': e, 'N': c[0], 'Errores': c[1],
+                        'Prom_ms': c[2] / c[0] * 1000 if c[0] else np.nan, 'Ultimo_Error': c[3]}
+                       for (n, e), c in conteos.items()])
+    return df.sort_values(['Errores', 'Prom_ms'], ascending=False).reset_index(drop=True)
+
+
+def eventos(prefijo=''):
+    """Contadores de contar() por (nombre, etiqueta)."""
+    with _lock:
+        conteos = {k: n for k, n in _eventos.items() if k[0].startswith(prefijo)}
+    if not conteos: return pd.DataFrame(columns=['Nombre', 'Etiqueta', 'N'])
+    return pd.DataFrame([{'Nombre': n, 'Etiqueta': e, 'N': c} for (n, e), c in conteos.items()])
+
+
+def exportar_jsonl(ruta=None):
+    """Spans recientes como JSON lines (un objeto por línea); con ruta además se agregan al archivo."""
+    with _lock: recientes = list(_recientes)
+    texto = "\n".join(json.dumps({'ts': ts, 'nombre': n, 'etiqueta': e, 'ms': round(d * 1000, 3), 'error': err})
+                      for ts, n, e, d, err in recientes)
+    if ruta and texto:
+        with open(ruta, 'a', encoding='utf-8') as f: f.write(texto + "\n")
+    return texto
+
+
+def reiniciar():
+    with _lock:
+        _duraciones.clear()
+        _conteos.clear()
+        _recientes.clear()
+        _eventos.clear()